@@ -0,0 +1,162 @@
+"""Agregados derivados por empresa-mês e o worker que os recalcula fora da requisição.
+
+Cada agregado fica em `agg_cache` junto com a versão de `data_versions` usada
+no cálculo. Leitores só aceitam o payload se a versão ainda for a atual; caso
+contrário calculam na hora (e gravam). As gravações avisam o worker com
+notify(); avisos repetidos do mesmo mês são agrupados (debounce).
+"""
+import sqlite3
+import os
+import json
+import time
+import calendar
+import threading
+import datetime as dt
+import metrics
+from kpi import month_kpis
+
+DB_PATH            = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+RECOMPUTE_DEBOUNCE = float(os.environ.get("RECOMPUTE_DEBOUNCE_S", "2"))
+RECOMPUTE_MAX_WAIT = float(os.environ.get("RECOMPUTE_MAX_WAIT_S", "20"))
+
+# ==============================
+# CÁLCULO
+# ==============================
+def month_payload(conn, company_id: int, ym: str) -> dict:
+    """Totais do mês para o Painel: receita, quantidades por categoria, dias e totais por dia."""
+    start = f"{ym}-01"
+    end   = f"{ym}-{calendar.monthrange(int(ym[:4]), int(ym[5:]))[1]:02d}"
+    rows  = conn.execute("""
+        SELECT e.entry_date, st.category, SUM(e.quantity), SUM(e.revenue_cents)
+        FROM entries e JOIN service_types st ON st.id = e.service_type_id
+        WHERE e.company_id=? AND e.entry_date BETWEEN ? AND ?
+        GROUP BY e.entry_date, st.category""", (company_id, start, end)).fetchall()
+    out, cents, por_dia = {"qtd": 0.0, "por_categoria": {}}, 0, {}
+    for day, category, qtd, receita in rows:     # receita em centavos: somas inteiras, reais só no fim
+        qtd, receita = float(qtd or 0), int(receita or 0)
+        cents      += receita
+        out["qtd"] += qtd
+        out["por_categoria"][category] = out["por_categoria"].get(category, 0.0) + qtd
+        d = por_dia.setdefault(day, [0.0, 0])
+        d[0] += qtd; d[1] += receita
+    out["receita"] = cents / 100
+    out["por_dia"] = {day: [qtd, c / 100] for day, (qtd, c) in por_dia.items()}
+    out["dias"]    = len(por_dia)
+    return out
+
+KINDS = {
+    "dashboard": month_payload,
+    "kpis":      month_kpis,
+}
+
+# ==============================
+# CACHE PERSISTENTE
+# ==============================
+def current_version(conn, company_id: int, ym: str) -> int:
+    row = conn.execute("SELECT version FROM data_versions WHERE company_id=? AND ym=?", (company_id, ym)).fetchone()
+    return int(row[0]) if row else 0
+
+def store(conn, company_id, ym, kind, version, payload):
+    conn.execute("""INSERT INTO agg_cache(company_id, ym, kind, version, payload, computed_at) VALUES (?,?,?,?,?,?)
+                    ON CONFLICT(company_id, ym, kind) DO UPDATE SET version=excluded.version,
+                        payload=excluded.payload, computed_at=excluded.computed_at""",
+                 (company_id, ym, kind, version, json.dumps(payload), dt.datetime.utcnow().isoformat()))
+
+def get_aggregate(conn, company_id: int, ym: str, kind: str, misses: list = None):
+    """Payload atual do agregado; recalcula e grava se o cache estiver desatualizado.
+
+    Com `misses` (conexões somente leitura) não grava: anota o mês para o chamador avisar o RecomputeWorker.
+    """
+    version = current_version(conn, company_id, ym)
+    row = conn.execute("SELECT version, payload FROM agg_cache WHERE company_id=? AND ym=? AND kind=?",
+                       (company_id, ym, kind)).fetchone()
+    hit = bool(row) and int(row[0]) == version
+    metrics.cache_lookup("agregados", hit)
+    if hit: return json.loads(row[1])
+    payload = KINDS[kind](conn, company_id, ym)
+    if misses is not None:
+        misses.append(ym); return payload
+    store(conn, company_id, ym, kind, version, payload)
+    conn.commit()
+    return payload
+
+def invalidate(conn, company_id: int, kind: str):
+    """Descarta o agregado em todos os meses (ex.: regras de meta mudaram); recalculado na próxima leitura."""
+    conn.execute("DELETE FROM agg_cache WHERE company_id=? AND kind=?", (company_id, kind))
+
+def recompute(conn, company_id: int, ym: str) -> float:
+    """Recalcula todos os agregados do mês; a versão é lida antes, então um write concorrente invalida o resultado."""
+    t0 = time.perf_counter()
+    version = current_version(conn, company_id, ym)
+    for kind, fn in KINDS.items():
+        store(conn, company_id, ym, kind, version, fn(conn, company_id, ym))
+    conn.commit()
+    return time.perf_counter() - t0
+
+# ==============================
+# WORKER
+# ==============================
+class RecomputeWorker(threading.Thread):
+    """Consome avisos (empresa, mês) e recalcula os agregados depois de `debounce_s` sem novos avisos.
+
+    Um mês que não para de receber avisos é recalculado no máximo a cada `max_wait_s`.
+    """
+
+    def __init__(self, db_path=DB_PATH, debounce_s=RECOMPUTE_DEBOUNCE, max_wait_s=RECOMPUTE_MAX_WAIT):
+        super().__init__(name="technoops-recompute", daemon=True)
+        self.db_path, self.debounce_s, self.max_wait_s = db_path, debounce_s, max_wait_s
+        self.processed  = 0
+        self.notified   = 0
+        self.last_error = None
+        self.last_run   = None
+        self._pending   = {}
+        self._cv        = threading.Condition()
+        self._halt      = False
+
+    def notify(self, company_id: int, yms):
+        with self._cv:
+            now = time.monotonic()
+            for ym in yms:
+                first = self._pending.get((company_id, ym), (now, now))[0]
+                self._pending[(company_id, ym)] = (first, now)
+                self.notified += 1
+            self._cv.notify()
+
+    def pending(self) -> list:
+        with self._cv: return sorted(self._pending)
+
+    def _next_batch(self) -> list:
+        with self._cv:
+            while not self._halt:
+                if not self._pending:
+                    self._cv.wait(); continue
+                now = time.monotonic()
+                due = [k for k, (first, last) in self._pending.items()
+                       if now - last >= self.debounce_s or now - first >= self.max_wait_s]
+                if due:
+                    for k in due: del self._pending[k]
+                    return due
+                wake = min(min(last + self.debounce_s, first + self.max_wait_s)
+                           for first, last in self._pending.values())
+                self._cv.wait(max(wake - now, 0.01))
+            return []
+
+    def run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        while not self._halt:
+            for company_id, ym in self._next_batch():
+                try:
+                    took = recompute(conn, company_id, ym)
+                    self.processed += 1
+                    self.last_run   = (company_id, ym, took)
+                    self.last_error = None
+                except Exception as exc:
+                    conn.rollback()
+                    self.last_error = f"{company_id}/{ym}: {type(exc).__name__}: {exc}"
+        conn.close()
+
+    def stop(self):
+        with self._cv:
+            self._halt = True
+            self._cv.notify()
@@ -0,0 +1,144 @@
+"""Sinalização de lançamentos fora do padrão no momento da gravação.
+
+Para cada (técnico, serviço) guardamos em `entry_stats` a contagem, média e
+M2 (Welford) da quantidade e do valor unitário. Checar e atualizar custa uma
+leitura e uma escrita de linha, sem varrer o histórico. Valores com |z| acima
+de ANOMALY_Z viram uma linha `pendente` em `entry_flags` (fila de revisão na
+Administração) e não entram nas estatísticas até serem aceitos.
+"""
+import os
+import math
+import datetime as dt
+
+ANOMALY_Z     = float(os.environ.get("ANOMALY_Z", "4"))
+ANOMALY_MIN_N = int(os.environ.get("ANOMALY_MIN_N", "8"))   # histórico mínimo antes de julgar
+
+FIELDS = {"quantity": "Quantidade", "unit_value": "Valor unitário"}
+STATUS = {"pendente": "Pendente", "ok": "Aceito", "excluido": "Lançamento excluído"}
+
+# Desvio mínimo: séries constantes (sempre 1 unidade, sempre R$ 135) teriam desvio 0
+_STD_FLOOR = {"quantity": lambda mean: max(0.5, 0.1 * abs(mean)),
+              "unit_value": lambda mean: max(1.0, 0.05 * abs(mean))}
+
+# ==============================
+# WELFORD
+# ==============================
+def _add(n, mean, m2, x):
+    n += 1
+    d = x - mean
+    mean += d / n
+    return n, mean, m2 + d * (x - mean)
+
+def _remove(n, mean, m2, x):
+    if n <= 1: return 0, 0.0, 0.0
+    old = (n * mean - x) / (n - 1)
+    return n - 1, old, max(m2 - (x - old) * (x - mean), 0.0)
+
+def _load(conn, company_id, tech_id, svc_id):
+    row = conn.execute("""SELECT n, mean_q, m2_q, mean_v, m2_v FROM entry_stats
+                          WHERE company_id=? AND technician_id=? AND service_type_id=?""",
+                       (company_id, tech_id, svc_id)).fetchone()
+    return tuple(row) if row else (0, 0.0, 0.0, 0.0, 0.0)
+
+def _save(conn, company_id, tech_id, svc_id, s):
+    conn.execute("""INSERT INTO entry_stats(company_id, technician_id, service_type_id, n, mean_q, m2_q, mean_v, m2_v)
+                    VALUES (?,?,?,?,?,?,?,?)
+                    ON CONFLICT(company_id, technician_id, service_type_id) DO UPDATE SET
+                        n=excluded.n, mean_q=excluded.mean_q, m2_q=excluded.m2_q,
+                        mean_v=excluded.mean_v, m2_v=excluded.m2_v""", (company_id, tech_id, svc_id) + tuple(s))
+
+def _include(conn, company_id, tech_id, svc_id, qty, unit, sign=1):
+    n, mq, m2q, mv, m2v = _load(conn, company_id, tech_id, svc_id)
+    step = _add if sign > 0 else _remove
+    nq, mq, m2q = step(n, mq, m2q, qty)
+    _,  mv, m2v = step(n, mv, m2v, unit)
+    _save(conn, company_id, tech_id, svc_id, (nq, mq, m2q, mv, m2v))
+
+# ==============================
+# CHECAGEM
+# ==============================
+def check(conn, company_id, tech_id, svc_id, qty, unit) -> list:
+    """Campos fora do padrão: [(campo, valor, média, desvio, z)]. Vazio se o histórico ainda é curto."""
+    n, mq, m2q, mv, m2v = _load(conn, company_id, tech_id, svc_id)
+    if n < ANOMALY_MIN_N: return []
+    out = []
+    for field, x, mean, m2 in (("quantity", qty, mq, m2q), ("unit_value", unit, mv, m2v)):
+        std = max(math.sqrt(m2 / (n - 1)), _STD_FLOOR[field](mean))
+        z   = (x - mean) / std
+        if abs(z) > ANOMALY_Z: out.append((field, x, mean, std, z))
+    return out
+
+def _counted(conn, entry_id) -> bool:
+    return conn.execute("SELECT 1 FROM entry_flags WHERE entry_id=? AND status='pendente'", (entry_id,)).fetchone() is None
+
+def record(conn, company_id, entry_id, tech_id, svc_id, qty, unit) -> list:
+    """Chamar na mesma transação do INSERT: sinaliza ou soma às estatísticas. Devolve os sinais criados."""
+    flags = check(conn, company_id, tech_id, svc_id, qty, unit)
+    if not flags:
+        _include(conn, company_id, tech_id, svc_id, qty, unit)
+        return []
+    now = dt.datetime.utcnow().isoformat()
+    conn.executemany("""INSERT INTO entry_flags(company_id, entry_id, field, value, mean, std, z, status, created_at)
+                        VALUES (?,?,?,?,?,?,?,'pendente',?)""",
+                     [(company_id, entry_id, f, x, mean, std, z, now) for f, x, mean, std, z in flags])
+    return flags
+
+def forget(conn, company_id, entry_id, tech_id, svc_id, qty, unit):
+    """Antes de editar/excluir: tira os valores antigos das estatísticas (se contavam) e limpa a fila."""
+    if _counted(conn, entry_id):
+        _include(conn, company_id, tech_id, svc_id, qty, unit, sign=-1)
+    conn.execute("DELETE FROM entry_flags WHERE entry_id=? AND status='pendente'", (entry_id,))
+
+def accept(conn, company_id, entry_id, user):
+    """Revisor confirmou que o valor está certo: passa a contar nas estatísticas."""
+    e = conn.execute("SELECT technician_id, service_type_id, quantity, unit_cents / 100.0 FROM entries WHERE id=? AND company_id=?",
+                     (entry_id, company_id)).fetchone()
+    if e and not _counted(conn, entry_id): _include(conn, company_id, *tuple(e))
+    conn.execute("""UPDATE entry_flags SET status='ok', reviewed_by=?, reviewed_at=?
+                    WHERE company_id=? AND entry_id=? AND status='pendente'""",
+                 (user, dt.datetime.utcnow().isoformat(), company_id, entry_id))
+
+def discard(conn, company_id, entry_id, user):
+    """Revisor vai excluir o lançamento: os sinais ficam no histórico como 'excluido' (valor nunca contou)."""
+    conn.execute("""UPDATE entry_flags SET status='excluido', reviewed_by=?, reviewed_at=?
+                    WHERE company_id=? AND entry_id=? AND status='pendente'""",
+                 (user, dt.datetime.utcnow().isoformat(), company_id, entry_id))
+
+def describe(flags) -> str:
+    return "; ".join(f"{FIELDS[f]} {x:g} (média {mean:.1f} ± {std:.1f})" for f, x, mean, std, z in flags)
+
+# ==============================
+# CARGA INICIAL
+# ==============================
+def rebuild(conn, company_id=None, pairs=None):
+    """Recalcula entry_stats a partir do histórico (uma vez, na migração). Lançamentos pendentes ficam de fora.
+
+    `pairs` [(técnico, serviço)] limita a esses pares da empresa (correções em lote, ver corrections.py).
+    """
+    if pairs is not None:
+        for i in range(0, len(pairs), 400):
+            part = pairs[i:i + 400]
+            keys = f"(technician_id, service_type_id) IN (VALUES {','.join(['(?,?)'] * len(part))})"
+            flat = [v for p in part for v in p]
+            conn.execute(f"DELETE FROM entry_stats WHERE company_id=? AND {keys}", [company_id] + flat)
+            _rebuild(conn, f"WHERE e.company_id=? AND {keys}", [company_id] + flat)
+        return
+    where = "WHERE e.company_id=?" if company_id else ""
+    conn.execute(f"DELETE FROM entry_stats {'WHERE company_id=?' if company_id else ''}", (company_id,) if company_id else ())
+    _rebuild(conn, where, (company_id,) if company_id else ())
+
+def _rebuild(conn, where, args):
+    """Welford (a mesma _add da gravação) sobre o histórico na ordem dos ids: add/remove seguem do mesmo estado."""
+    stats = {}
+    for cid, tech, svc, q, v in conn.execute(f"""
+            WITH e AS (SELECT id, company_id, technician_id, service_type_id, quantity, unit_cents / 100.0 AS unit_value FROM entries)
+            SELECT e.company_id, e.technician_id, e.service_type_id, e.quantity, e.unit_value
+            FROM e
+            {where} {"AND" if where else "WHERE"} NOT EXISTS (SELECT 1 FROM entry_flags f WHERE f.entry_id=e.id AND f.status='pendente')
+            ORDER BY e.id""", args).fetchall():
+        n, mq, m2q, mv, m2v = stats.get((cid, tech, svc), (0, 0.0, 0.0, 0.0, 0.0))
+        _, mq, m2q = _add(n, mq, m2q, q)
+        n, mv, m2v = _add(n, mv, m2v, v)
+        stats[(cid, tech, svc)] = (n, mq, m2q, mv, m2v)
+    conn.executemany("""INSERT INTO entry_stats(company_id, technician_id, service_type_id, n, mean_q, m2_q, mean_v, m2_v)
+                        VALUES (?,?,?,?,?,?,?,?)""", [k + s for k, s in stats.items()])
@@ -0,0 +1,387 @@
+"""API HTTP/JSON (asyncio) ao lado da interface Streamlit, para o app de campo e ferramentas de BI.
+
+O laço asyncio só lê e escreve sockets; autenticação e banco rodam num pool
+de API_WORKERS threads (cada uma com sua conexão), com no máximo API_QUEUE
+pedidos esperando — acima disso a resposta é 503 com Retry-After.
+
+  POST   /api/v1/token         {"empresa", "usuario", "senha"} → {"token", "expira_em"}
+  DELETE /api/v1/token         encerra o token atual
+  POST   /api/v1/lancamentos   {"lancamentos": [...]} — lote gravado numa transação (tudo ou nada)
+  GET    /api/v1/totais        ?data=AAAA-MM-DD — totais do dia e do mês
+  GET    /api/v1/kpis          ?mes=AAAA-MM — indicadores por técnico (técnico: só os próprios, sem receita)
+
+Token: Authorization: Bearer <token>; só o hash SHA-256 fica no banco
+(api_tokens), e cada pedido confere se o usuário continua ativo. Respostas
+GET levam ETag calculado antes da resposta, a partir das versões do mês
+(data_versions e mês em memória) e do que mais a rota usa: If-None-Match igual
+devolve 304 sem montar o corpo.
+
+API_PORT liga o servidor junto com o app (core.get_api_server); sozinho:
+
+    python api.py --port 8502
+"""
+import os
+import json
+import math
+import time
+import asyncio
+import hashlib
+import secrets
+import threading
+import datetime as dt
+from http import HTTPStatus
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+import anomaly
+import hotstore
+import metrics
+from aggregates import get_aggregate
+from core import SessionUser, get_conn, get_hot_store, notify_dirty, to_cents, verify_password
+from queries import dims_stamp, mark_dirty, period_version
+
+API_HOST      = os.environ.get("API_HOST", "127.0.0.1")      # 0.0.0.0 expõe fora da máquina
+API_PORT      = int(os.environ.get("API_PORT", "0") or 0)           # 0 = desligada
+API_WORKERS   = int(os.environ.get("API_WORKERS", "4"))
+API_QUEUE     = int(os.environ.get("API_QUEUE", "64"))
+API_TOKEN_TTL = float(os.environ.get("API_TOKEN_TTL_H", "12"))
+API_MAX_BODY  = int(os.environ.get("API_MAX_BODY", str(1 << 20)))
+API_MAX_BATCH = int(os.environ.get("API_MAX_BATCH", "500"))
+KEEPALIVE_S   = 15
+MAX_HEADERS   = 100
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str, detail=None):
+        super().__init__(message)
+        self.status, self.message, self.detail = status, message, detail
+
+# ==============================
+# BANCO (uma conexão por thread do pool)
+# ==============================
+_local = threading.local()
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None: conn = _local.conn = get_conn()
+    return conn
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _now() -> str:
+    return dt.datetime.utcnow().isoformat()
+
+def _bearer(headers) -> str:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise ApiError(401, "Token ausente (Authorization: Bearer <token>).")
+    return token.strip()
+
+def authenticate(conn, headers) -> SessionUser:
+    token = _bearer(headers)
+    row = conn.execute("""
+        SELECT c.id, c.name, u.username, u.role
+        FROM api_tokens t
+        JOIN users u     ON u.company_id = t.company_id AND u.username = t.username AND u.is_active = 1
+        JOIN companies c ON c.id = t.company_id
+        WHERE t.token_hash=? AND t.expires_at > ?""", (_token_hash(token), _now())).fetchone()
+    if not row: raise ApiError(401, "Token inválido ou expirado.")
+    return SessionUser(company_id=row[0], company_name=row[1], username=row[2], role=row[3])
+
+def _require(user: SessionUser, roles):
+    if user.role not in roles: raise ApiError(403, "Acesso não permitido.")
+
+def _parse_date(value, field):
+    try: return dt.date.fromisoformat(str(value))
+    except ValueError: raise ApiError(400, f"{field}: data inválida (use AAAA-MM-DD).") from None
+
+# ==============================
+# ROTAS (rodam no pool; recebem conn, usuário, query, corpo JSON e cabeçalhos; devolvem (status, payload))
+# ==============================
+def login(conn, user, query, body, headers):
+    body = body or {}
+    comp = conn.execute("SELECT id FROM companies WHERE name=?", (str(body.get("empresa", "")).strip(),)).fetchone()
+    if not comp:
+        metrics.LOGINS.inc("empresa"); raise ApiError(401, "Empresa não encontrada.")
+    row = conn.execute("SELECT username, password_hash FROM users WHERE company_id=? AND username=? AND is_active=1",
+                       (comp[0], str(body.get("usuario", "")).strip())).fetchone()
+    if not row or not verify_password(row[1], str(body.get("senha", ""))):
+        metrics.LOGINS.inc("invalido"); raise ApiError(401, "Usuário ou senha inválidos.")
+    metrics.LOGINS.inc("ok")
+    token   = secrets.token_urlsafe(32)
+    expires = (dt.datetime.utcnow() + dt.timedelta(hours=API_TOKEN_TTL)).isoformat()
+    conn.execute("DELETE FROM api_tokens WHERE company_id=? AND username=? AND expires_at <= ?", (comp[0], row[0], _now()))
+    conn.execute("INSERT INTO api_tokens(token_hash, company_id, username, created_at, expires_at) VALUES (?,?,?,?,?)",
+                 (_token_hash(token), comp[0], row[0], _now(), expires))
+    conn.commit()
+    return 201, {"token": token, "expira_em": expires + "Z"}
+
+def logout(conn, user, query, body, headers):
+    conn.execute("DELETE FROM api_tokens WHERE token_hash=?", (_token_hash(_bearer(headers)),))
+    conn.commit()
+    return 200, {"ok": True}
+
+def submit_entries(conn, user, query, body, headers):
+    """Valida o lote inteiro antes de gravar; qualquer erro devolve 422 com a lista, sem gravar nada."""
+    _require(user, {"admin", "operator"})
+    items = (body or {}).get("lancamentos")
+    if not isinstance(items, list) or not items: raise ApiError(400, "Envie {\"lancamentos\": [...]} com ao menos 1 item.")
+    if len(items) > API_MAX_BATCH: raise ApiError(413, f"Máximo de {API_MAX_BATCH} lançamentos por lote.")
+    cid    = user.company_id
+    lookup = lambda table, extra="": {r[0]: tuple(r)[1:] for r in conn.execute(
+        f"SELECT name, id{extra} FROM {table} WHERE company_id=? AND is_active=1", (cid,))}
+    techs, teams, regions = lookup("technicians"), lookup("teams"), lookup("regions")
+    svcs = lookup("service_types", ", default_unit_cents")
+
+    rows, errors = [], []
+    for i, it in enumerate(items):
+        try:
+            if not isinstance(it, dict): raise ApiError(400, "item deve ser um objeto")
+            day = _parse_date(it.get("data", dt.date.today().isoformat()), "data")
+            ref = {}
+            for field, table, required in (("tecnico", techs, True), ("servico", svcs, True),
+                                           ("equipe", teams, False), ("regiao", regions, False)):
+                name = it.get(field)
+                if name is None and not required: ref[field] = None; continue
+                if name not in table: raise ApiError(400, f"{field} desconhecido ou inativo: {name!r}")
+                ref[field] = table[name]
+            qty = float(it.get("quantidade", 1))
+            if not (math.isfinite(qty) and qty >= 0): raise ApiError(400, "quantidade deve ser um número >= 0")
+            unit = to_cents(it["valor_unitario"]) if it.get("valor_unitario") is not None else ref["servico"][1]
+            if unit < 0: raise ApiError(400, "valor_unitario deve ser >= 0")
+            notes = str(it.get("observacao") or "").strip() or None
+        except (ApiError, TypeError, ValueError, ArithmeticError) as exc:
+            errors.append({"indice": i, "erro": exc.message if isinstance(exc, ApiError) else f"valor inválido: {exc}"})
+            continue
+        rows.append((day, ref["tecnico"][0], ref["equipe"] and ref["equipe"][0], ref["regiao"] and ref["regiao"][0],
+                     ref["servico"][0], qty, unit, notes))
+    if errors: raise ApiError(422, "Lote rejeitado; nada foi gravado.", errors)
+
+    ids, revisao, now = [], [], _now()
+    try:
+        for i, (day, tech, team, region, svc, qty, unit, notes) in enumerate(rows):
+            cur = conn.execute("""INSERT INTO entries(company_id, entry_date, technician_id, team_id, region_id,
+                                      service_type_id, quantity, unit_cents, notes, created_at)
+                                  VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                               (cid, day.isoformat(), tech, team, region, svc, qty, unit, notes, now))
+            ids.append(cur.lastrowid)
+            flags = anomaly.record(conn, cid, cur.lastrowid, tech, svc, qty, unit / 100)
+            if flags: revisao.append({"indice": i, "id": cur.lastrowid, "motivo": anomaly.describe(flags)})
+        yms    = mark_dirty(conn, cid, [r[0] for r in rows])
+        change = hotstore.stage(conn, cid, ids, yms)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    notify_dirty(cid, yms, change)
+    return 201, {"ids": ids, "revisao": revisao}
+
+TOTALS_ROLES = {"admin", "operator", "viewer"}
+
+def _month_tag(conn, company_id, ym) -> tuple:
+    """Versão do mês no banco e no mês em memória (o ETag muda a cada gravação)."""
+    first, hot = dt.date.fromisoformat(f"{ym}-01"), get_hot_store()
+    return period_version(conn, company_id, first, first), hot.version(company_id) if hot.is_open(ym) else None
+
+def _totals_day(query):
+    return _parse_date(query.get("data", dt.date.today().isoformat()), "data")
+
+def totals_tag(conn, user, query):
+    _require(user, TOTALS_ROLES)                       # antes do 304: sem perfil não há o que revalidar
+    day = _totals_day(query)
+    return (day.isoformat(), _month_tag(conn, user.company_id, day.isoformat()[:7]),
+            tuple(conn.execute("SELECT goal_value FROM monthly_goals WHERE company_id=? AND year=? AND month=?",
+                               (user.company_id, day.year, day.month)).fetchone() or ()))
+
+def totals(conn, user, query, body, headers):
+    _require(user, TOTALS_ROLES)
+    day  = _totals_day(query)
+    ym   = day.isoformat()[:7]
+    hot  = get_hot_store()
+    agg  = hot.dashboard(user.company_id) if hot.is_open(ym) else get_aggregate(conn, user.company_id, ym, "dashboard")
+    goal = conn.execute("SELECT goal_value FROM monthly_goals WHERE company_id=? AND year=? AND month=?",
+                        (user.company_id, day.year, day.month)).fetchone()
+    qtd, receita = agg["por_dia"].get(day.isoformat(), [0.0, 0.0])
+    return 200, {"data": day.isoformat(), "dia": {"qtd": qtd, "receita": receita},
+                 "mes": {"mes": ym, "qtd": agg["qtd"], "receita": agg["receita"], "dias": agg["dias"],
+                         "por_categoria": agg["por_categoria"]},
+                 "meta_mes": float(goal[0]) if goal else 0.0}
+
+def _kpis_month(query) -> str:
+    ym = query.get("mes", dt.date.today().isoformat()[:7])
+    try: dt.date.fromisoformat(f"{ym}-01")
+    except ValueError: raise ApiError(400, "mes: mês inválido (use AAAA-MM).") from None
+    return ym
+
+def kpis_tag(conn, user, query):
+    ym = _kpis_month(query)
+    return (ym, _month_tag(conn, user.company_id, ym), dims_stamp(conn, user.company_id), user.role, user.username,
+            tuple(conn.execute("SELECT weekmask, version FROM company_calendar WHERE company_id=?",
+                               (user.company_id,)).fetchone() or ()))
+
+def kpis(conn, user, query, body, headers):
+    ym  = _kpis_month(query)
+    hot = get_hot_store()
+    if user.role == "technician":                      # mesma regra de Meus Indicadores: nome = usuário
+        tech = conn.execute("SELECT name FROM technicians WHERE company_id=? AND LOWER(name)=LOWER(?)",
+                            (user.company_id, user.username)).fetchone()
+        if not tech: raise ApiError(404, f"Nenhum técnico com o nome '{user.username}'.")
+        perf = [{k: v for k, v in p.items() if k != "ReceitaGerada"} for p in hot.kpis(conn, user.company_id, ym, tech[0])]
+    else:
+        perf = hot.kpis(conn, user.company_id, ym) if hot.is_open(ym) else get_aggregate(conn, user.company_id, ym, "kpis")
+    return 200, {"mes": ym, "tecnicos": perf}
+
+# (método, caminho) → (função, exige token, entradas do ETag — só GET)
+ROUTES = {
+    ("POST",   "/api/v1/token"):       (login,          False, None),
+    ("DELETE", "/api/v1/token"):       (logout,         True,  None),
+    ("POST",   "/api/v1/lancamentos"): (submit_entries, True,  None),
+    ("GET",    "/api/v1/totais"):      (totals,         True,  totals_tag),
+    ("GET",    "/api/v1/kpis"):        (kpis,           True,  kpis_tag),
+}
+
+def _reject_constant(name):
+    raise ValueError(f"{name} não é um número JSON")
+
+def _etag(path, user, inputs) -> str:
+    data = json.dumps([path, user.company_id, inputs], default=str).encode()
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+def _not_modified(headers, etag) -> bool:
+    tags = [t.strip().removeprefix("W/") for t in headers.get("if-none-match", "").split(",")]
+    return etag in tags or "*" in tags
+
+def handle(route, path, headers, query, raw):
+    """Executado no pool: JSON de entrada, autenticação, ETag, rota e erros → (status, payload, etag)."""
+    fn, needs_auth, tag = route
+    conn = _conn()
+    try:
+        body = json.loads(raw, parse_constant=_reject_constant) if raw else None   # sem NaN/Infinity
+    except ValueError:
+        return 400, {"erro": "Corpo não é JSON válido."}, None
+    try:
+        user = authenticate(conn, headers) if needs_auth else None
+        etag = _etag(path, user, tag(conn, user, query)) if tag else None
+        if etag and _not_modified(headers, etag): return 304, None, etag
+        status, payload = fn(conn, user, query, body, headers)
+        return status, payload, etag if status == 200 else None
+    except ApiError as exc:
+        out = {"erro": exc.message}
+        if exc.detail is not None: out["detalhes"] = exc.detail
+        return exc.status, out, None
+    except Exception as exc:
+        conn.rollback()
+        if metrics.is_locked(exc): metrics.DB_LOCKED.inc("api")
+        return 500, {"erro": f"{type(exc).__name__}: {exc}"}, None
+
+# ==============================
+# HTTP (asyncio)
+# ==============================
+def _response(status, body=b"", extra=None, keep=True) -> bytes:
+    head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep else 'close'}"]
+    if body: head.append("Content-Type: application/json; charset=utf-8")
+    head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+class ApiServer(threading.Thread):
+    """Servidor HTTP/1.1 com keep-alive num laço asyncio próprio (thread daemon)."""
+
+    def __init__(self, host=API_HOST, port=API_PORT, workers=API_WORKERS, queue=API_QUEUE):
+        super().__init__(name="technoops-api", daemon=True)
+        self.host, self.port, self.queue = host, port, queue
+        self.pool       = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="technoops-api-db")
+        self.inflight   = 0                            # só alterado no laço: sem lock
+        self.last_error = None
+        self.ready      = threading.Event()
+        self._loop      = None
+        self._halt      = None
+
+    def run(self):
+        try: asyncio.run(self._serve())
+        except OSError as exc:                         # porta ocupada (outro processo do app)
+            self.last_error = f"porta {self.port}: {exc}"
+            self.ready.set()
+
+    async def _serve(self):
+        self._loop, self._halt = asyncio.get_running_loop(), asyncio.Event()
+        server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        async with server:
+            await self._halt.wait()
+
+    def stop(self):
+        if self._loop: self._loop.call_soon_threadsafe(self._halt.set)
+        self.pool.shutdown(wait=False)
+
+    async def _client(self, reader, writer):
+        try:
+            while True:
+                try: line = await asyncio.wait_for(reader.readline(), KEEPALIVE_S)
+                except asyncio.TimeoutError: break
+                if not line.strip(): break
+                parts = line.decode("latin-1").split()
+                if len(parts) != 3:
+                    writer.write(_response(400, keep=False)); break
+                method, target, version = parts
+                headers = {}
+                for _ in range(MAX_HEADERS):
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""): break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if "transfer-encoding" in headers:
+                    writer.write(_response(411, keep=False)); break
+                size = int(headers.get("content-length") or 0)
+                if size > API_MAX_BODY:
+                    writer.write(_response(413, keep=False)); break
+                raw = await reader.readexactly(size) if size else b""
+                writer.write(await self._dispatch(method, target, headers, raw, keep))
+                await writer.drain()
+                if not keep: break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, headers, raw, keep) -> bytes:
+        t0   = time.perf_counter()
+        path, _, qs = target.partition("?")
+        route = ROUTES.get((method, path))
+        name  = path if route else "outra"
+        etag  = None
+        if not route:
+            allowed = [m for m, p in ROUTES if p == path]
+            status, payload = (405, {"erro": "Método não permitido."}) if allowed else (404, {"erro": "Rota desconhecida."})
+        elif self.inflight >= self.queue:
+            status, payload = 503, {"erro": "Servidor ocupado, tente novamente."}
+        else:
+            query = {k: v[-1] for k, v in parse_qs(qs).items()}
+            self.inflight += 1
+            try: status, payload, etag = await self._loop.run_in_executor(self.pool, handle, route, path, headers, query, raw)
+            finally: self.inflight -= 1
+        body  = b"" if status == 304 else json.dumps(payload, ensure_ascii=False, default=str).encode()
+        extra = {"Cache-Control": "private, no-cache"}
+        if status == 401: extra["WWW-Authenticate"] = "Bearer"
+        if status == 503: extra["Retry-After"] = "1"
+        if etag: extra["ETag"] = etag
+        metrics.API_REQUESTS.inc(name, str(status))
+        metrics.API_SECONDS.observe(name, value=time.perf_counter() - t0)
+        return _response(status, body, extra, keep)
+
+if __name__ == "__main__":
+    import argparse
+    from core import init_db
+    ap = argparse.ArgumentParser(description="API JSON do TechnoOps")
+    ap.add_argument("--host", default=API_HOST)
+    ap.add_argument("--port", type=int, default=API_PORT or 8502)
+    ap.add_argument("--workers", type=int, default=API_WORKERS)
+    a = ap.parse_args()
+    init_db()
+    server = ApiServer(a.host, a.port, a.workers)
+    server.start(); server.ready.wait()
+    if server.last_error: raise SystemExit(server.last_error)
+    print(f"API em http://{a.host}:{server.port}/api/v1", flush=True)
+    try: server.join()
+    except KeyboardInterrupt: server.stop()
@@ -0,0 +1,157 @@
+"""Backup online do banco SQLite via API de backup do sqlite3.
+
+Copia o banco em lotes de páginas, dormindo entre os passos para não travar
+as sessões que estão gravando. Uma gravação de outra conexão faz o SQLite
+recomeçar a cópia; depois de BACKUP_RESTARTS recomeços a cópia é refeita com
+lotes 4× maiores e, na última tentativa, num passo só (lê um instantâneo — em
+WAL não bloqueia os escritores). Cada cópia passa por integrity_check e os
+arquivos antigos são rotacionados. Pode rodar headless:
+
+    python backup.py --once
+    python backup.py --interval 6
+"""
+import sqlite3
+import os
+import time
+import threading
+import datetime as dt
+
+DB_PATH         = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+BACKUP_DIR      = os.environ.get("BACKUP_DIR", os.path.join(os.path.dirname(DB_PATH), "backups"))
+BACKUP_KEEP     = int(os.environ.get("BACKUP_KEEP", "7"))
+BACKUP_PAGES    = int(os.environ.get("BACKUP_PAGES", "256"))
+BACKUP_SLEEP    = float(os.environ.get("BACKUP_SLEEP", "0.02"))
+BACKUP_INTERVAL = float(os.environ.get("BACKUP_INTERVAL_H", "24"))
+BACKUP_RESTARTS = int(os.environ.get("BACKUP_RESTARTS", "3"))
+BACKUP_ATTEMPTS = 3                 # lotes de `pages`, 4 × `pages`, passo único
+
+PREFIX = "technoops-"
+
+# ==============================
+# BACKUP
+# ==============================
+def list_backups(dest_dir=BACKUP_DIR) -> list:
+    """Backups existentes, do mais novo para o mais antigo."""
+    if not os.path.isdir(dest_dir): return []
+    names = [n for n in os.listdir(dest_dir) if n.startswith(PREFIX) and n.endswith(".db")]
+    return [os.path.join(dest_dir, n) for n in sorted(names, reverse=True)]
+
+def rotate_backups(dest_dir=BACKUP_DIR, keep=BACKUP_KEEP) -> list:
+    removed = []
+    for path in list_backups(dest_dir)[max(keep, 1):]:
+        os.remove(path); removed.append(path)
+    return removed
+
+class _Restarted(Exception):
+    pass
+
+def run_backup(db_path=DB_PATH, dest_dir=BACKUP_DIR, pages=BACKUP_PAGES,
+               step_sleep=BACKUP_SLEEP, keep=BACKUP_KEEP, max_restarts=BACKUP_RESTARTS) -> dict:
+    """Faz um backup online e retorna o relatório (duração, tamanho, vazão, integridade)."""
+    os.makedirs(dest_dir, exist_ok=True)
+    now   = dt.datetime.now()
+    stamp = f"{now:%Y%m%d-%H%M%S}-{now.microsecond // 1000:03d}"
+    final = os.path.join(dest_dir, f"{PREFIX}{stamp}.db")
+    tmp   = final + ".part"
+    steps, restarts = [0], [0]
+    last, tries     = [float("inf")], [0]           # páginas restantes no passo anterior; recomeços nesta tentativa
+
+    def progress(status, remaining, total):
+        steps[0] += 1
+        # Outra conexão gravou na origem: o SQLite recomeça a cópia do zero
+        if remaining > last[0]:
+            restarts[0] += 1; tries[0] += 1
+            if tries[0] > max_restarts: raise _Restarted()
+        last[0] = remaining
+        # Libera o banco entre lotes para os escritores seguirem sem espera
+        if remaining and step_sleep > 0: time.sleep(step_sleep)
+
+    t0 = time.perf_counter()
+    try:
+        for attempt in range(BACKUP_ATTEMPTS):
+            last[0], tries[0] = float("inf"), 0
+            step = -1 if attempt == BACKUP_ATTEMPTS - 1 else pages * 4 ** attempt
+            src  = sqlite3.connect(db_path, timeout=30)
+            dst  = sqlite3.connect(tmp)
+            try:
+                src.backup(dst, pages=step, progress=progress)
+                break
+            except _Restarted:
+                continue
+            finally:
+                dst.close(); src.close()
+        duration = time.perf_counter() - t0
+
+        chk = sqlite3.connect(tmp)
+        try:
+            integrity = chk.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            chk.close()
+        if integrity != "ok":
+            raise sqlite3.DatabaseError(f"Backup corrompido: {integrity}")
+        os.replace(tmp, final)
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)      # cópia interrompida ou reprovada não fica para trás
+    size    = os.path.getsize(final)
+    removed = rotate_backups(dest_dir, keep)
+    return {
+        "path": final, "started_at": stamp, "duration_s": duration, "bytes": size,
+        "mb_per_s": (size / 1_048_576) / duration if duration > 0 else 0.0,
+        "steps": steps[0], "restarts": restarts[0], "integrity": integrity, "removed": removed,
+    }
+
+# ==============================
+# AGENDADOR
+# ==============================
+class BackupScheduler(threading.Thread):
+    """Thread daemon que roda run_backup a cada `interval_h` horas."""
+
+    def __init__(self, db_path=DB_PATH, dest_dir=BACKUP_DIR, interval_h=BACKUP_INTERVAL, **opts):
+        super().__init__(name="technoops-backup", daemon=True)
+        self.db_path, self.dest_dir, self.interval_h, self.opts = db_path, dest_dir, interval_h, opts
+        self.last_report = None
+        self.last_error  = None
+        self._lock       = threading.Lock()
+        self._halt       = threading.Event()
+
+    def run_now(self) -> dict:
+        # Serializa execuções manuais (admin) e agendadas
+        with self._lock:
+            try:
+                self.last_report = run_backup(self.db_path, self.dest_dir, **self.opts)
+                self.last_error  = None
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                raise
+            return self.last_report
+
+    def run(self):
+        while not self._halt.wait(self.interval_h * 3600):
+            try: self.run_now()
+            except Exception: pass
+
+    def stop(self): self._halt.set()
+
+def format_report(r: dict) -> str:
+    return (f"{os.path.basename(r['path'])}: {r['bytes']/1_048_576:.1f} MB em {r['duration_s']:.2f}s "
+            f"({r['mb_per_s']:.1f} MB/s, {r['steps']} passos, {r.get('restarts', 0)} recomeços, integridade={r['integrity']})")
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Backup online do TechnoOps")
+    ap.add_argument("--db", default=DB_PATH)
+    ap.add_argument("--dest", default=BACKUP_DIR)
+    ap.add_argument("--keep", type=int, default=BACKUP_KEEP)
+    ap.add_argument("--pages", type=int, default=BACKUP_PAGES)
+    ap.add_argument("--sleep", type=float, default=BACKUP_SLEEP)
+    ap.add_argument("--interval", type=float, default=None, help="horas entre backups (omitido = uma vez)")
+    ap.add_argument("--once", action="store_true")
+    a = ap.parse_args()
+    opts = dict(pages=a.pages, step_sleep=a.sleep, keep=a.keep)
+    if a.interval is None or a.once:
+        print(format_report(run_backup(a.db, a.dest, **opts)))
+    else:
+        while True:
+            try: print(format_report(run_backup(a.db, a.dest, **opts)), flush=True)
+            except Exception as exc: print(f"Falha no backup: {exc}", flush=True)
+            time.sleep(a.interval * 3600)
@@ -0,0 +1,64 @@
+"""Mede a abertura da tela de login e o tamanho do payload por rerun (AppTest).
+
+Cada medição de "primeira execução" roda num interpretador novo, para incluir
+imports e inicialização do banco. O payload é a soma dos protos enviados ao
+navegador no rerun (elementos + blocos).
+
+    python bench/cold_start.py
+    python bench/cold_start.py --app /caminho/para/outra/versao/app.py
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import os, sys, time, json
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_import = time.perf_counter() - t0
+
+def payload(at):
+    def walk(n):
+        yield n
+        for c in getattr(n, "children", {}).values():
+            yield from walk(c)
+    return sum(n.proto.ByteSize() for n in walk(at._tree) if getattr(n, "proto", None) is not None)
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t1 = time.perf_counter(); at.run(); first = time.perf_counter() - t1
+out = {"streamlit_import_s": t_import, "login_first_run_s": first,
+       "login_payload_bytes": payload(at), "pandas_loaded_on_login": "pandas" in sys.modules}
+t1 = time.perf_counter(); at.run(); out["login_rerun_s"] = time.perf_counter() - t1
+at.text_input[1].input("admin"); at.text_input[2].input("admin123"); at.button[0].click(); at.run()
+t1 = time.perf_counter(); at.run(); out["dashboard_rerun_s"] = time.perf_counter() - t1
+out["dashboard_payload_bytes"] = payload(at)
+print("RESULT" + json.dumps(out))
+"""
+
+def measure(app, runs):
+    results = []
+    for i in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DB_PATH=os.path.join(tmp, "bench.db"), BACKUP_DIR=os.path.join(tmp, "bk"))
+            p = subprocess.run([sys.executable, "-c", CHILD, app], env=env, capture_output=True, text=True)
+            line = next((l for l in p.stdout.splitlines() if l.startswith("RESULT")), None)
+            if line is None: sys.exit(p.stderr[-2000:])
+            results.append(json.loads(line[6:]))
+    return results
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    ap.add_argument("--runs", type=int, default=3)
+    a = ap.parse_args()
+    res = measure(a.app, a.runs)
+    print(f"app: {a.app} ({a.runs} execuções, mediana)")
+    for k in res[0]:
+        vals = sorted(r[k] for r in res)
+        v = vals[len(vals) // 2]
+        print(f"  {k:<26} {v:.3f}" if isinstance(v, float) else f"  {k:<26} {v}")
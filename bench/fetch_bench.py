@@ -0,0 +1,69 @@
+"""Compara fetch_df com o antigo df_from_rows (list-of-dicts): tempo e pico de memória.
+
+    python bench/fetch_bench.py --rows 500000
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tracemalloc
+import datetime as dt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd
+from frames import fetch_df
+
+SQL = """SELECT e.id, e.entry_date, t.name AS Tecnico, st.name AS Servico, st.category,
+                e.technician_id, e.team_id, e.quantity, e.unit_value
+         FROM entries e JOIN technicians t ON t.id=e.technician_id
+         JOIN service_types st ON st.id=e.service_type_id"""
+
+def df_from_rows(rows):
+    """Helper antigo, mantido aqui só como referência."""
+    if not rows: return pd.DataFrame()
+    return pd.DataFrame([dict(r) for r in rows])
+
+def seed(n_rows, n_techs=200):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE technicians(id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE service_types(id INTEGER PRIMARY KEY, name TEXT, category TEXT);
+        CREATE TABLE entries(id INTEGER PRIMARY KEY, entry_date TEXT, technician_id INTEGER,
+                             team_id INTEGER, service_type_id INTEGER, quantity REAL, unit_value REAL);""")
+    conn.executemany("INSERT INTO technicians VALUES (?,?)", [(i, f"Tecnico {i:03d}") for i in range(1, n_techs + 1)])
+    conn.executemany("INSERT INTO service_types VALUES (?,?,?)",
+                     [(1, "Ativação", "ativacao"), (2, "Manutenção", "manutencao"), (3, "Vistoria", "outros")])
+    rnd, start = random.Random(42), dt.date(2023, 1, 1)
+    conn.executemany("INSERT INTO entries VALUES (NULL,?,?,?,?,?,?)", (
+        ((start + dt.timedelta(days=rnd.randrange(1000))).isoformat(), rnd.randint(1, n_techs),
+         rnd.choice([1, 2, None]), rnd.randint(1, 3), float(rnd.randint(1, 6)), 135.0)
+        for _ in range(n_rows)))
+    conn.commit()
+    return conn
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, int(df.memory_usage(deep=True).sum())
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=500_000)
+    a = ap.parse_args()
+    conn = seed(a.rows)
+    runs = {
+        "df_from_rows": lambda: df_from_rows(conn.execute(SQL).fetchall()),
+        "fetch_df":     lambda: fetch_df(conn, SQL),
+    }
+    print(f"{a.rows:,} linhas")
+    print(f"{'helper':<14}{'tempo (s)':>12}{'pico (MB)':>12}{'DataFrame (MB)':>16}")
+    for name, fn in runs.items():
+        t, peak, size = measure(fn)
+        print(f"{name:<14}{t:>12.3f}{peak/1_048_576:>12.1f}{size/1_048_576:>16.1f}")
@@ -0,0 +1,249 @@
+"""Teste de carga: várias sessões AppTest simultâneas contra um banco semeado.
+
+Cada sessão roda num processo próprio (o AppTest usa um Runtime global e não
+aceita execuções paralelas no mesmo processo) e segue um perfil de uso:
+operador lança serviços, gestor abre Painel/Indicadores, técnico consulta os
+próprios indicadores. Todas começam juntas depois do aquecimento; ao fim,
+latência por ação (p50/p90/p95/p99), vazão e erros de bloqueio do SQLite
+("database is locked") vão para um relatório comparável entre execuções.
+
+    python bench/load_test.py --duration 60
+    python bench/load_test.py --mix operador=4,gestor=4 --out antes.json
+    python bench/load_test.py --mix operador=4,gestor=4 --compare antes.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import platform
+import tempfile
+import subprocess
+import datetime as dt
+import multiprocessing as mp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP  = os.path.join(ROOT, "app.py")
+SENHA = "carga123"
+
+# Perfil → usuário (role) e peso de cada ação no laço da sessão
+PERSONAS = {
+    "operador": {"role": "operator",   "actions": {"lancamento": 4, "painel": 2, "indicadores": 1, "login": 1}},
+    "gestor":   {"role": "viewer",     "actions": {"painel": 4, "indicadores": 3, "login": 1}},
+    "tecnico":  {"role": "technician", "actions": {"meus_indicadores": 5, "login": 1}},
+}
+PAGES = {"painel": "Painel", "indicadores": "Indicadores", "lancamento": "Lançamento Diário"}
+
+# ==============================
+# BANCO SEMEADO
+# ==============================
+def seed(db_path, techs=20, days=120, seed_=42):
+    """Schema do app (init_db) + técnicos, equipes, lançamentos e usuários de carga."""
+    os.environ["DB_PATH"] = db_path
+    sys.path.insert(0, ROOT)
+    from core import hash_password, init_db
+    init_db()
+    conn = sqlite3.connect(db_path)
+    cid  = conn.execute("SELECT id FROM companies ORDER BY id LIMIT 1").fetchone()[0]
+    names = [f"Tec{i:02d}" for i in range(1, techs + 1)]
+    conn.executemany("INSERT OR IGNORE INTO technicians(company_id, name, is_active) VALUES (?,?,1)", [(cid, n) for n in names])
+    conn.executemany("INSERT OR IGNORE INTO teams(company_id, name, is_active) VALUES (?,?,1)", [(cid, "Equipe A"), (cid, "Equipe B")])
+    tech_ids = [r[0] for r in conn.execute("SELECT id FROM technicians WHERE company_id=?", (cid,))]
+    team_ids = [r[0] for r in conn.execute("SELECT id FROM teams WHERE company_id=?", (cid,))]
+    svcs     = conn.execute("SELECT id, default_unit_cents FROM service_types WHERE company_id=?", (cid,)).fetchall()
+    region   = conn.execute("SELECT id FROM regions WHERE company_id=? LIMIT 1", (cid,)).fetchone()[0]
+    rnd, today, now = random.Random(seed_), dt.date.today(), dt.datetime.utcnow().isoformat()
+    rows = []
+    for d in range(days):
+        day = today - dt.timedelta(days=d)
+        if day.weekday() == 6: continue
+        for t in tech_ids:
+            team = rnd.choice(team_ids)
+            for svc, unit in rnd.sample(svcs, len(svcs)):
+                rows.append((cid, day.isoformat(), t, team, region, svc, float(rnd.randint(1, 5)), unit, None, now))
+    conn.executemany("""INSERT INTO entries(company_id, entry_date, technician_id, team_id, region_id,
+                            service_type_id, quantity, unit_cents, notes, created_at) VALUES (?,?,?,?,?,?,?,?,?,?)""", rows)
+    conn.execute("""INSERT OR REPLACE INTO monthly_goals(company_id, year, month, goal_value, goal_ativ_day, goal_manu_day)
+                    VALUES (?,?,?,?,?,?)""", (cid, today.year, today.month, 250000, 60, 80))
+    pw = hash_password(SENHA)
+    conn.executemany("INSERT OR IGNORE INTO users(company_id, username, password_hash, role, is_active, created_at) VALUES (?,?,?,?,1,?)",
+                     [(cid, "carga_operator", pw, "operator", now), (cid, "carga_viewer", pw, "viewer", now)]
+                     + [(cid, n.lower(), pw, "technician", now) for n in names])
+    conn.commit(); conn.close()
+    return {"entries": len(rows), "technicians": techs, "days": days}
+
+# ==============================
+# SESSÃO (processo filho)
+# ==============================
+def _errors(at):
+    return [f"{e.message}" for e in at.exception]
+
+def _timed(at, out, action, fn=None):
+    if fn: fn()
+    t0 = time.perf_counter()
+    try:
+        at.run()
+        errs = _errors(at)
+    except Exception as exc:
+        errs = [f"{type(exc).__name__}: {exc}"]
+    took = time.perf_counter() - t0
+    locked = any("locked" in e or "busy" in e for e in errs)
+    out.append((action, took, "lock" if locked else "erro" if errs else "ok", errs[0][:200] if errs else None))
+
+def _login(app, username, out, record=True):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(app, default_timeout=300)
+    at.run()
+    def fill():
+        at.text_input[1].input(username); at.text_input[2].input(SENHA); at.button[0].click()
+    if record: _timed(at, out, "login", fill)
+    else: fill(); at.run()
+    return at
+
+def session(idx, persona, app, barrier, duration, think, techs, queue):
+    import logging
+    from streamlit.testing.v1 import AppTest  # noqa: F401 — import fora da medição
+    logging.getLogger("streamlit.deprecation_util").disabled = True   # um aviso por rerun polui a saída
+    rnd  = random.Random(idx)
+    p    = PERSONAS[persona]
+    user = {"operator": "carga_operator", "viewer": "carga_viewer"}.get(p["role"]) or f"tec{rnd.randint(1, techs):02d}"
+    out  = []
+    # Aquecimento: primeira execução (imports, bootstrap, cache) fora da janela medida
+    t0 = time.perf_counter()
+    at = _login(app, user, out, record=False)
+    warm = time.perf_counter() - t0
+    barrier.wait()
+    started = time.time()
+    deadline = time.monotonic() + duration
+    actions, weights = zip(*p["actions"].items())
+    current = None
+    while time.monotonic() < deadline:
+        if think > 0: time.sleep(rnd.expovariate(1 / think))
+        action = rnd.choices(actions, weights)[0]
+        if action == "login":
+            at, current = _login(app, user, out), None
+        elif action == "meus_indicadores":
+            _timed(at, out, action)
+        elif action == "lancamento":
+            if current != "lancamento":
+                _timed(at, out, "abrir_lancamento", lambda: at.sidebar.radio[0].set_value(PAGES[action]))
+                current = action
+            def fill():
+                at.selectbox[0].set_value(f"Tec{rnd.randint(1, techs):02d}")
+                at.number_input[0].set_value(float(rnd.randint(1, 4)))
+                next(b for b in at.button if b.label == "Salvar").click()
+            try:
+                _timed(at, out, action, fill)
+            except (IndexError, StopIteration, ValueError) as exc:
+                out.append((action, 0.0, "erro", f"formulário indisponível: {exc}"[:200])); current = None
+        else:
+            _timed(at, out, action, lambda: at.sidebar.radio[0].set_value(PAGES[action]))
+            current = action
+    queue.put({"idx": idx, "persona": persona, "user": user, "warmup_s": warm,
+               "started": started, "finished": time.time(), "samples": out})
+
+# ==============================
+# RELATÓRIO
+# ==============================
+def _pct(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(q / 100 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+def summarize(results, meta):
+    wall = max(r["finished"] for r in results) - min(r["started"] for r in results)
+    by_action, first_err = {}, {}
+    for r in results:
+        for action, took, status, err in r["samples"]:
+            a = by_action.setdefault(action, {"lat": [], "ok": 0, "erro": 0, "lock": 0})
+            a["lat"].append(took); a[status] += 1
+            if err and action not in first_err: first_err[action] = err
+    actions = {}
+    for name, a in sorted(by_action.items()):
+        lat = sorted(a["lat"])
+        actions[name] = {"n": len(lat), "ok": a["ok"], "erros": a["erro"], "locks": a["lock"],
+                         "por_s": len(lat) / wall if wall else 0.0,
+                         **{f"p{q}_ms": _pct(lat, q) * 1000 for q in (50, 90, 95, 99)},
+                         "max_ms": lat[-1] * 1000 if lat else 0.0}
+    total = sum(a["n"] for a in actions.values())
+    return {**meta, "wall_s": wall, "acoes": total, "acoes_por_s": total / wall if wall else 0.0,
+            "locks": sum(a["locks"] for a in actions.values()), "erros": sum(a["erros"] for a in actions.values()),
+            "aquecimento_s": sorted(r["warmup_s"] for r in results)[len(results) // 2],
+            "por_acao": actions, "primeiro_erro": first_err}
+
+def print_report(rep, base=None):
+    print(f"{rep['sessions']} sessões ({rep['mix']}) • {rep['wall_s']:.1f}s • think {rep['think_s']:g}s • "
+          f"SQLite {rep['sqlite']} journal={rep['journal_mode']} • git {rep['git']}")
+    print(f"{rep['acoes']} ações • {rep['acoes_por_s']:.2f} ações/s • {rep['locks']} bloqueios • {rep['erros']} outros erros • "
+          f"aquecimento mediano {rep['aquecimento_s']:.2f}s")
+    cols = ("n", "por_s", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms", "locks", "erros")
+    print(f"{'ação':<18}" + "".join(f"{c:>10}" for c in cols))
+    for name, a in rep["por_acao"].items():
+        line = f"{name:<18}" + "".join(f"{a[c]:>10.1f}" if isinstance(a[c], float) else f"{a[c]:>10}" for c in cols)
+        print(line)
+        b = (base or {}).get("por_acao", {}).get(name)
+        if b:
+            print(f"{'  vs base':<18}" + "".join(
+                f"{(a[c] - b[c]) / b[c] * 100:>+9.0f}%" if c != "n" and b[c] else f"{'':>10}" for c in cols))
+    for name, err in rep["primeiro_erro"].items():
+        print(f"  {name}: {err}")
+
+def _git_rev():
+    try: return subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError: return "?"
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, n = part.partition("=")
+        if name.strip() not in PERSONAS: sys.exit(f"perfil desconhecido: {name} (use {', '.join(PERSONAS)})")
+        mix[name.strip()] = int(n or 1)
+    return mix
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Teste de carga com sessões AppTest concorrentes")
+    ap.add_argument("--app", default=APP)
+    ap.add_argument("--mix", default="operador=3,gestor=4,tecnico=1", help="perfil=sessões,...")
+    ap.add_argument("--duration", type=float, default=30, help="segundos de carga após o aquecimento")
+    ap.add_argument("--think", type=float, default=0.5, help="pausa média entre ações (s, exponencial)")
+    ap.add_argument("--techs", type=int, default=20)
+    ap.add_argument("--days", type=int, default=120)
+    ap.add_argument("--db", help="usar uma cópia deste banco (só os usuários de carga são criados)")
+    ap.add_argument("--out", help="grava o relatório em JSON")
+    ap.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    a = ap.parse_args()
+
+    mix = parse_mix(a.mix)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "carga.db")
+        os.environ["BACKUP_DIR"] = os.path.join(tmp, "bk")
+        if a.db:
+            src = sqlite3.connect(a.db); dst = sqlite3.connect(db); src.backup(dst); dst.close(); src.close()
+        info = seed(db, a.techs, 0 if a.db else a.days)
+        print(f"banco semeado: {info['entries']:,} lançamentos, {info['technicians']} técnicos")
+        conn = sqlite3.connect(db)
+        journal = conn.execute("PRAGMA journal_mode").fetchone()[0]; conn.close()
+
+        personas = [p for p, n in mix.items() for _ in range(n)]
+        ctx      = mp.get_context("spawn")
+        barrier  = ctx.Barrier(len(personas))
+        queue    = ctx.Queue()
+        procs    = [ctx.Process(target=session, args=(i, p, a.app, barrier, a.duration, a.think, a.techs, queue))
+                    for i, p in enumerate(personas)]
+        for p in procs: p.start()
+        results = [queue.get() for _ in procs]
+        for p in procs: p.join()
+        conn = sqlite3.connect(db)
+        inserted = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - info["entries"]; conn.close()
+
+    rep = summarize(results, {"sessions": len(personas), "mix": a.mix, "duration_s": a.duration, "think_s": a.think,
+                              "sqlite": sqlite3.sqlite_version, "journal_mode": journal, "git": _git_rev(),
+                              "python": platform.python_version(), "cpus": os.cpu_count(),
+                              "lancamentos_gravados": inserted})
+    base = json.load(open(a.compare)) if a.compare else None
+    print_report(rep, base)
+    print(f"lançamentos gravados: {inserted} (ok no relatório: {rep['por_acao'].get('lancamento', {}).get('ok', 0)})")
+    if a.out:
+        with open(a.out, "w") as f: json.dump(rep, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,140 @@
+"""Compara SQLite e o espelho DuckDB (olap.py) nas consultas de relatório, sobre um banco sintético grande.
+
+Semeia o schema do app (init_db) com N lançamentos espalhados por vários
+meses e empresas, gera o espelho e mede cada serviço nos dois motores
+(mediana de --runs execuções), conferindo que os resultados são iguais.
+
+    python bench/olap_bench.py --rows 1000000
+    python bench/olap_bench.py --db /tmp/olap_bench.db --runs 10      # reaproveita o banco semeado
+"""
+import os
+import sys
+import math
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import statistics
+import datetime as dt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def seed(db_path, rows, techs, companies, months, seed_=42):
+    """Schema do app + técnicos/equipes/regiões por empresa e `rows` lançamentos nos últimos `months` meses."""
+    from core import init_db
+    init_db()
+    conn  = sqlite3.connect(db_path)
+    now   = dt.datetime.utcnow().isoformat()
+    rnd   = random.Random(seed_)
+    today = dt.date.today()
+    first = (today.replace(day=1) - dt.timedelta(days=31 * (months - 1))).replace(day=1)
+    span  = (today - first).days + 1
+    dims  = {}
+    for c in range(companies):
+        name = f"Empresa Bench {c + 1}"
+        conn.execute("INSERT OR IGNORE INTO companies(name, created_at) VALUES (?,?)", (name, now))
+        cid = conn.execute("SELECT id FROM companies WHERE name=?", (name,)).fetchone()[0]
+        conn.executemany("INSERT OR IGNORE INTO technicians(company_id, name, is_active) VALUES (?,?,1)",
+                         [(cid, f"Tec{i:03d}") for i in range(techs)])
+        conn.executemany("INSERT OR IGNORE INTO teams(company_id, name, is_active, is_solo) VALUES (?,?,1,?)",
+                         [(cid, "Solo", 1), (cid, "Equipe A", 0), (cid, "Equipe B", 0)])
+        conn.executemany("INSERT OR IGNORE INTO regions(company_id, name, is_active) VALUES (?,?,1)",
+                         [(cid, r) for r in ("Norte", "Sul", "Leste", "Oeste")])
+        conn.executemany("INSERT OR IGNORE INTO service_types(company_id, name, category, default_unit_cents, is_active) VALUES (?,?,?,?,1)",
+                         [(cid, "Ativação", "ativacao", 21000), (cid, "Manutenção", "manutencao", 13500), (cid, "Vistoria", "outros", 5000)])
+        ids = lambda t: [r[0] for r in conn.execute(f"SELECT id FROM {t} WHERE company_id=?", (cid,))]
+        dims[cid] = (ids("technicians"), ids("teams"), ids("regions"),
+                     conn.execute("SELECT id, default_unit_cents FROM service_types WHERE company_id=?", (cid,)).fetchall())
+    cids = list(dims)
+
+    def gen(n):
+        for _ in range(n):
+            cid = rnd.choice(cids)
+            t, tm, rg, svc = dims[cid]
+            sid, cents = rnd.choice(svc)
+            yield (cid, (first + dt.timedelta(days=rnd.randrange(span))).isoformat(), rnd.choice(t), rnd.choice(tm),
+                   rnd.choice(rg), sid, float(rnd.randint(1, 6)), cents, now)
+    for done in range(0, rows, 100_000):
+        conn.executemany("""INSERT INTO entries(company_id, entry_date, technician_id, team_id, region_id,
+                                service_type_id, quantity, unit_cents, created_at) VALUES (?,?,?,?,?,?,?,?,?)""",
+                         gen(min(100_000, rows - done)))
+        conn.commit()
+        print(f"  {min(done + 100_000, rows):,} lançamentos", flush=True)
+    from queries import mark_dirty                       # o espelho só responde para meses com versão igual
+    for cid in cids:
+        mark_dirty(conn, cid, [r[0] for r in conn.execute("SELECT DISTINCT substr(entry_date,1,7) || '-01' FROM entries WHERE company_id=?", (cid,))])
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return cids[0]
+
+def same(a, b):
+    """Resultados equivalentes (floats com tolerância; DataFrames sem depender da ordem das linhas)."""
+    import pandas as pd
+    if isinstance(a, pd.DataFrame):
+        keys = [c for c in a.columns if a[c].dtype == object or str(a[c].dtype) == "category"]
+        a, b = (x.astype({k: str for k in keys}).sort_values(keys + list(x.columns.difference(keys))).reset_index(drop=True) for x in (a, b))
+        try: pd.testing.assert_frame_equal(a, b, check_dtype=False, check_categorical=False, rtol=1e-9); return True
+        except AssertionError: return False
+    if isinstance(a, dict): return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list): return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float): return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+def timed(fn, runs):
+    out, times = None, []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, statistics.median(times)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--techs", type=int, default=200, help="técnicos por empresa")
+    ap.add_argument("--companies", type=int, default=4)
+    ap.add_argument("--months", type=int, default=24)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--db", default=None, help="banco já semeado (ou onde semear)")
+    a = ap.parse_args()
+
+    db = a.db or os.path.join(tempfile.mkdtemp(prefix="olap_bench_"), "bench.db")
+    os.environ["DB_PATH"], os.environ["ANALYTICS_ENGINE"] = db, "duckdb"
+    os.environ.setdefault("OLAP_DIR", os.path.join(os.path.dirname(db), "olap"))
+    sys.path.insert(0, ROOT)
+    fresh = not os.path.exists(db)
+    if fresh:
+        print(f"Semeando {a.rows:,} lançamentos em {db}")
+        seed(db, a.rows, a.techs, a.companies, a.months)
+    import olap
+    from kpi import month_kpis
+    from queries import cube, period_summary, technician_trend, trend_bounds
+    if olap.duckdb is None: sys.exit("duckdb não instalado: pip install duckdb")
+
+    r = olap.build_mirror(db, olap.OLAP_DIR)
+    print(f"Espelho: {r['rows']['entries']:,} lançamentos, {r['bytes']/1_048_576:.1f} MB em {r['duration_s']:.2f}s")
+
+    conn  = sqlite3.connect(db); conn.row_factory = sqlite3.Row
+    cid   = conn.execute("SELECT company_id FROM entries GROUP BY company_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+    today = dt.date.today()
+    ano   = (today.replace(day=1) - dt.timedelta(days=365)).replace(day=1)
+    prev  = (today.replace(day=1) - dt.timedelta(days=1)).isoformat()[:7]
+    t_ini, t_fim, _ = trend_bounds(today.year, today.month, 12)
+    cases = {
+        "resumo 12 meses por mês":   (ano, today, lambda c: period_summary(c, cid, ano, today, "mes")),
+        "resumo 12 meses por dia":   (ano, today, lambda c: period_summary(c, cid, ano, today, "dia")),
+        "resumo 12 meses p/ semana": (ano, today, lambda c: period_summary(c, cid, ano, today, "semana")),
+        "cubo 12 meses":             (ano, today, lambda c: cube(c, cid, ano, today)),
+        "ranking 12 meses":          (t_ini, t_fim, lambda c: technician_trend(c, cid, today.year, today.month, 12)),
+        "KPIs mês anterior":         (dt.date.fromisoformat(prev + "-01"), today, lambda c: month_kpis(c, cid, prev)),
+    }
+    print(f"\nEmpresa {cid} • mediana de {a.runs} execuções • SQLite {sqlite3.sqlite_version} × DuckDB {olap.duckdb.__version__}")
+    print(f"{'consulta':<28}{'SQLite (ms)':>13}{'DuckDB (ms)':>13}{'ganho':>8}  iguais")
+    for name, (ini, fim, fn) in cases.items():
+        duck = olap.reader(conn, cid, ini, fim)
+        if not isinstance(duck, olap.DuckConn): sys.exit(f"{name}: espelho desatualizado para o intervalo")
+        res_s, t_s = timed(lambda: fn(conn), a.runs)
+        res_d, t_d = timed(lambda: fn(duck), a.runs)
+        print(f"{name:<28}{t_s*1000:>13.1f}{t_d*1000:>13.1f}{t_s/t_d:>7.1f}x  {'sim' if same(res_s, res_d) else 'NÃO'}")
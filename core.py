@@ -0,0 +1,363 @@
+import sqlite3
+import os
+import datetime as dt
+import time
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+import streamlit as st
+import aggregates
+import anomaly
+import backup
+import forecast
+import goals
+import hotstore
+import maintenance
+import metrics
+import olap
+import pageload
+import profiling
+from passwords import hash_password, verify_password  # noqa: F401 — reexportado para app/admin
+
+# ==============================
+# CONFIG
+# ==============================
+DB_PATH   = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+PRIMARY   = "#7E2D7F"
+SECONDARY = "#F2B233"
+BG        = "#0F0F0F"
+CARD      = "#151515"
+TEXT      = "#FFFFFF"
+MUTED     = "#CFCFCF"
+
+# Observações: sem acento/caixa ("instalação" = "INSTALACAO") e códigos inteiros ("CTO-12/3", "ONT_45")
+NOTES_TOKENIZER = "unicode61 remove_diacritics 2 tokenchars '-_/'"
+
+# ==============================
+# SENHA (hash em passwords.py — sem Streamlit, usado também pelos processos de provisionamento)
+# ==============================
+def update_user_password(company_id: int, username: str, new_password: str):
+    conn = get_conn()
+    conn.execute("UPDATE users SET password_hash=? WHERE company_id=? AND username=?",
+                 (hash_password(new_password), company_id, username))
+    conn.commit()
+
+# ==============================
+# BANCO DE DADOS
+# ==============================
+class _Connection(sqlite3.Connection):
+    """Conexão do app: conta comandos SQL e mede o commit (espera pelo lock de escrita)."""
+
+    def commit(self):
+        t0 = time.perf_counter()
+        try:
+            super().commit()
+        except sqlite3.OperationalError as exc:
+            if metrics.is_locked(exc): metrics.DB_LOCKED.inc("commit")
+            raise
+        finally:
+            metrics.DB_COMMIT.observe(value=time.perf_counter() - t0)
+
+def get_conn():
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, factory=_Connection)
+    conn.row_factory = sqlite3.Row
+    conn.set_trace_callback(metrics.sql_statement)
+    return conn
+
+# Valores em centavos inteiros; a receita de cada lançamento é gravada (STORED) e entra nos índices
+ENTRIES_DDL = """CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, entry_date TEXT NOT NULL,
+        technician_id INTEGER NOT NULL, team_id INTEGER, region_id INTEGER,
+        service_type_id INTEGER NOT NULL, quantity REAL NOT NULL, unit_cents INTEGER NOT NULL,
+        revenue_cents INTEGER GENERATED ALWAYS AS (CAST(round(quantity * unit_cents) AS INTEGER)) STORED,
+        notes TEXT, created_at TEXT NOT NULL,
+        FOREIGN KEY(company_id) REFERENCES companies(id),
+        FOREIGN KEY(technician_id) REFERENCES technicians(id),
+        FOREIGN KEY(team_id) REFERENCES teams(id),
+        FOREIGN KEY(region_id) REFERENCES regions(id),
+        FOREIGN KEY(service_type_id) REFERENCES service_types(id));"""
+MIGRATE_CHUNK = int(os.environ.get("MIGRATE_CHUNK", "5000"))
+
+def to_cents(reais) -> int:
+    """Valor digitado em reais → centavos inteiros (arredonda meio centavo para cima)."""
+    return int(Decimal(str(reais)).scaleb(2).quantize(Decimal(1), ROUND_HALF_UP))
+
+def _migrate_entries_cents(conn, chunk=MIGRATE_CHUNK):
+    """entries.unit_value (REAL) → unit_cents + revenue_cents STORED, sem travar o banco.
+
+    SQLite não cria coluna STORED com ALTER TABLE: os dados são copiados para
+    entries_cents em lotes, um commit por lote (outros processos gravam entre
+    eles). Triggers espelham na cópia o que for gravado durante a migração; a
+    troca final (DROP + RENAME) é uma transação curta. Interrompida, recomeça
+    de onde parou.
+    """
+    cols = "id, company_id, entry_date, technician_id, team_id, region_id, service_type_id, quantity"
+    vals = lambda r: (f"{r}.id, {r}.company_id, {r}.entry_date, {r}.technician_id, {r}.team_id, {r}.region_id, "
+                      f"{r}.service_type_id, {r}.quantity, CAST(round({r}.unit_value * 100) AS INTEGER), "
+                      f"{r}.notes, {r}.created_at")
+    conn.commit()
+    conn.execute(ENTRIES_DDL.format(table="entries_cents"))
+    conn.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS entries_mig_ai AFTER INSERT ON entries BEGIN
+            INSERT OR REPLACE INTO entries_cents({cols}, unit_cents, notes, created_at) SELECT {vals("new")};
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_mig_au AFTER UPDATE ON entries BEGIN
+            INSERT OR REPLACE INTO entries_cents({cols}, unit_cents, notes, created_at) SELECT {vals("new")};
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_mig_ad AFTER DELETE ON entries BEGIN
+            DELETE FROM entries_cents WHERE id = old.id;
+        END;""")
+    copy = f"""INSERT OR IGNORE INTO entries_cents({cols}, unit_cents, notes, created_at)
+               SELECT {vals("e")} FROM entries e WHERE e.id > ? AND e.id <= ?"""
+    last = 0
+    while True:
+        hi = conn.execute("SELECT MAX(id) FROM (SELECT id FROM entries WHERE id > ? ORDER BY id LIMIT ?)", (last, chunk)).fetchone()[0]
+        if hi is None: break
+        conn.execute(copy, (last, hi)); conn.commit()
+        last = hi
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(copy, (last, 2 ** 62))
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='entries'").fetchone()
+    conn.execute("DROP TABLE entries")                     # leva junto os triggers de espelho e do FTS
+    conn.execute("ALTER TABLE entries_cents RENAME TO entries")
+    if seq:                                                # ids de lançamentos excluídos não são reaproveitados
+        conn.execute("UPDATE sqlite_sequence SET seq=max(seq, ?) WHERE name='entries'", (seq[0],))
+    conn.commit()
+
+def init_db():
+    conn = get_conn()
+    # auto_vacuum incremental: imediato em banco novo; bancos antigos são convertidos pela manutenção
+    maintenance.enable_incremental_vacuum(conn)
+    # WAL: leituras (seções do Painel, API, espelho) não esperam gravações
+    conn.execute("PRAGMA journal_mode=WAL")
+    cur  = conn.cursor()
+    cur.execute("""CREATE TABLE IF NOT EXISTS companies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        theme_primary TEXT, theme_secondary TEXT, created_at TEXT NOT NULL);""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, username TEXT NOT NULL, password_hash TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin','operator','viewer','technician')),
+        is_active INTEGER NOT NULL DEFAULT 1, created_at TEXT NOT NULL,
+        UNIQUE(company_id, username), FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS technicians (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, name TEXT NOT NULL, is_active INTEGER NOT NULL DEFAULT 1,
+        UNIQUE(company_id, name), FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS teams (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, name TEXT NOT NULL, is_active INTEGER NOT NULL DEFAULT 1,
+        UNIQUE(company_id, name), FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS regions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, name TEXT NOT NULL, is_active INTEGER NOT NULL DEFAULT 1,
+        UNIQUE(company_id, name), FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS service_types (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, name TEXT NOT NULL,
+        category TEXT NOT NULL CHECK(category IN ('ativacao','manutencao','outros')),
+        default_unit_cents INTEGER NOT NULL DEFAULT 0, is_active INTEGER NOT NULL DEFAULT 1,
+        UNIQUE(company_id, name), FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS monthly_goals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, year INTEGER NOT NULL, month INTEGER NOT NULL,
+        goal_value REAL NOT NULL DEFAULT 0,
+        goal_ativ_day REAL NOT NULL DEFAULT 0,
+        goal_manu_day REAL NOT NULL DEFAULT 0,
+        UNIQUE(company_id, year, month), FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    for col, default in [("goal_ativ_day", 0), ("goal_manu_day", 0)]:
+        try: cur.execute(f"ALTER TABLE monthly_goals ADD COLUMN {col} REAL NOT NULL DEFAULT {default}")
+        except: pass
+    # Migração: suporte ao role technician
+    try: cur.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'viewer'")
+    except: pass
+    cur.execute(ENTRIES_DDL.format(table="entries"))
+    if "unit_value" in {r["name"] for r in cur.execute("PRAGMA table_info(entries)")}:
+        _migrate_entries_cents(conn)
+    if "default_unit_value" in {r["name"] for r in cur.execute("PRAGMA table_info(service_types)")}:
+        cur.execute("ALTER TABLE service_types ADD COLUMN default_unit_cents INTEGER NOT NULL DEFAULT 0")
+        cur.execute("UPDATE service_types SET default_unit_cents = CAST(round(default_unit_value * 100) AS INTEGER)")
+        cur.execute("ALTER TABLE service_types DROP COLUMN default_unit_value")
+    # Calendário de dias úteis por empresa
+    cur.execute("""CREATE TABLE IF NOT EXISTS company_calendar (
+        company_id INTEGER PRIMARY KEY, weekmask TEXT NOT NULL DEFAULT '1111110',
+        version INTEGER NOT NULL DEFAULT 1, FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS calendar_holidays (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, day TEXT NOT NULL, name TEXT NOT NULL,
+        kind TEXT NOT NULL CHECK(kind IN ('regional','fechamento')), region_id INTEGER,
+        UNIQUE(company_id, day, region_id),
+        FOREIGN KEY(company_id) REFERENCES companies(id), FOREIGN KEY(region_id) REFERENCES regions(id));""")
+    # O UNIQUE acima não barra datas repetidas da empresa toda (NULLs são distintos): índice com COALESCE
+    if not cur.execute("SELECT 1 FROM sqlite_master WHERE name='ux_calendar_holidays_day'").fetchone():
+        cur.execute("""DELETE FROM calendar_holidays WHERE id NOT IN (
+            SELECT MIN(id) FROM calendar_holidays GROUP BY company_id, day, COALESCE(region_id, 0))""")
+        cur.execute("CREATE UNIQUE INDEX ux_calendar_holidays_day ON calendar_holidays(company_id, day, COALESCE(region_id, 0))")
+    # Versão dos dados por empresa-mês (chave de cache dos agregados)
+    cur.execute("""CREATE TABLE IF NOT EXISTS data_versions (
+        company_id INTEGER NOT NULL, ym TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 1,
+        updated_at TEXT NOT NULL, PRIMARY KEY(company_id, ym));""")
+    # Agregados derivados (Painel, KPIs) com a versão dos dados usada no cálculo
+    cur.execute("""CREATE TABLE IF NOT EXISTS agg_cache (
+        company_id INTEGER NOT NULL, ym TEXT NOT NULL, kind TEXT NOT NULL, version INTEGER NOT NULL,
+        payload TEXT NOT NULL, computed_at TEXT NOT NULL, PRIMARY KEY(company_id, ym, kind));""")
+    # Regras de meta diária por técnico (ver goals.py); equipes individuais marcadas em teams.is_solo
+    cur.execute("""CREATE TABLE IF NOT EXISTS goal_rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL,
+        team_type TEXT NOT NULL DEFAULT '*' CHECK(team_type IN ('*','solo','equipe')),
+        category TEXT NOT NULL CHECK(category IN ('ativacao','manutencao')),
+        region_id INTEGER, valid_from TEXT NOT NULL, valid_to TEXT,
+        daily_target REAL NOT NULL, alert_pct REAL NOT NULL DEFAULT 0.833, updated_at TEXT NOT NULL,
+        FOREIGN KEY(company_id) REFERENCES companies(id), FOREIGN KEY(region_id) REFERENCES regions(id));""")
+    # Estatísticas incrementais por técnico × serviço e fila de lançamentos fora do padrão (ver anomaly.py)
+    cur.execute("""CREATE TABLE IF NOT EXISTS entry_stats (
+        company_id INTEGER NOT NULL, technician_id INTEGER NOT NULL, service_type_id INTEGER NOT NULL,
+        n INTEGER NOT NULL, mean_q REAL NOT NULL, m2_q REAL NOT NULL, mean_v REAL NOT NULL, m2_v REAL NOT NULL,
+        PRIMARY KEY(company_id, technician_id, service_type_id));""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS entry_flags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_id INTEGER NOT NULL, entry_id INTEGER NOT NULL,
+        field TEXT NOT NULL, value REAL NOT NULL, mean REAL NOT NULL, std REAL NOT NULL, z REAL NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pendente' CHECK(status IN ('pendente','ok','excluido')),
+        created_at TEXT NOT NULL, reviewed_by TEXT, reviewed_at TEXT);""")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_entry_flags_queue ON entry_flags(company_id, status, entry_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_entry_flags_entry ON entry_flags(entry_id)")
+    # Tokens da API JSON (api.py): só o SHA-256 do token é guardado
+    cur.execute("""CREATE TABLE IF NOT EXISTS api_tokens (
+        token_hash TEXT PRIMARY KEY, company_id INTEGER NOT NULL, username TEXT NOT NULL,
+        created_at TEXT NOT NULL, expires_at TEXT NOT NULL,
+        FOREIGN KEY(company_id) REFERENCES companies(id));""")
+    if cur.execute("SELECT NOT EXISTS (SELECT 1 FROM entry_stats)").fetchone()[0]:
+        anomaly.rebuild(conn)
+    if "is_solo" not in {r["name"] for r in cur.execute("PRAGMA table_info(teams)")}:
+        cur.execute("ALTER TABLE teams ADD COLUMN is_solo INTEGER NOT NULL DEFAULT 0")
+        cur.execute("UPDATE teams SET is_solo=1 WHERE name='Solo'")
+    # Busca textual nas observações: FTS5 com conteúdo externo (entries), sincronizado por triggers
+    if not cur.execute("SELECT 1 FROM sqlite_master WHERE name='entries_fts'").fetchone():
+        cur.execute(f"""CREATE VIRTUAL TABLE entries_fts USING fts5(notes, content='entries', content_rowid='id',
+                        tokenize="{NOTES_TOKENIZER}", prefix='2 3')""")
+        cur.execute("INSERT INTO entries_fts(entries_fts) VALUES('rebuild')")
+    cur.executescript("""
+        CREATE TRIGGER IF NOT EXISTS entries_fts_ai AFTER INSERT ON entries WHEN new.notes IS NOT NULL BEGIN
+            INSERT INTO entries_fts(rowid, notes) VALUES (new.id, new.notes);
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_fts_ad AFTER DELETE ON entries WHEN old.notes IS NOT NULL BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_fts_au AFTER UPDATE OF notes ON entries BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, notes) SELECT 'delete', old.id, old.notes WHERE old.notes IS NOT NULL;
+            INSERT INTO entries_fts(rowid, notes) SELECT new.id, new.notes WHERE new.notes IS NOT NULL;
+        END;""")
+    # Índice de cobertura para os resumos por intervalo de datas
+    cur.execute("""CREATE INDEX IF NOT EXISTS idx_entries_company_date
+        ON entries(company_id, entry_date, service_type_id, quantity, revenue_cents)""")
+    conn.commit()
+    cur.execute("SELECT COUNT(*) AS n FROM companies;")
+    if cur.fetchone()["n"] == 0:
+        now = dt.datetime.utcnow().isoformat()
+        cur.execute("INSERT INTO companies(name, theme_primary, theme_secondary, created_at) VALUES (?,?,?,?)",
+                    ("Techno Mais", "#7E2D7F", "#F2B233", now))
+        cid = cur.lastrowid
+        cur.executemany("INSERT INTO service_types(company_id, name, category, default_unit_cents, is_active) VALUES (?,?,?,?,1)",
+                        [(cid, "Ativação", "ativacao", 21000), (cid, "Manutenção", "manutencao", 13500)])
+        cur.execute("INSERT INTO regions(company_id, name, is_active) VALUES (?,?,1)", (cid, "Geral"))
+        cur.execute("INSERT INTO teams(company_id, name, is_active, is_solo) VALUES (?,?,1,1)", (cid, "Solo"))
+        cur.execute("INSERT INTO users(company_id, username, password_hash, role, is_active, created_at) VALUES (?,?,?,?,1,?)",
+                    (cid, "admin", hash_password("admin123"), "admin", now))
+        conn.commit()
+    goals.seed_defaults(conn)
+    conn.commit()
+    conn.close()
+
+# ==============================
+# BACKUP / MANUTENÇÃO / AGREGADOS / MÉTRICAS / MÊS CORRENTE / API — 1 por servidor
+# ==============================
+@st.cache_resource
+def get_backup_scheduler():
+    sched = backup.BackupScheduler(db_path=DB_PATH)
+    sched.start()
+    return sched
+
+@st.cache_resource
+def get_maintenance_scheduler():
+    sched = maintenance.MaintenanceScheduler(db_path=DB_PATH)
+    sched.start()
+    return sched
+
+@st.cache_resource
+def get_recompute_worker():
+    worker = aggregates.RecomputeWorker(db_path=DB_PATH)
+    worker.start()
+    return worker
+
+@st.cache_resource
+def get_profiler():
+    return profiling.ProfileStore()
+
+@st.cache_resource
+def get_metrics_exporter():
+    exporter = metrics.MetricsExporter()
+    exporter.start()
+    return exporter
+
+@st.cache_resource
+def get_olap_mirror():
+    """Espelho DuckDB das consultas de relatório; None com ANALYTICS_ENGINE=sqlite (padrão) ou sem duckdb."""
+    if not olap.enabled(): return None
+    sched = olap.MirrorScheduler(db_path=DB_PATH)
+    sched.start()
+    return sched
+
+@st.cache_resource
+def get_hot_store():
+    return hotstore.HotStore(db_path=DB_PATH)
+
+@st.cache_resource
+def get_forecaster():
+    return forecast.Forecaster()
+
+@st.cache_resource
+def get_page_loader():
+    return pageload.PageLoader(db_path=DB_PATH)
+
+@st.cache_resource
+def get_api_server():
+    """API JSON (api.py) na porta API_PORT; None se API_PORT não estiver definida."""
+    import api                                             # api importa core
+    if not api.API_PORT: return None
+    server = api.ApiServer()
+    server.start(); server.ready.wait(5)
+    return server
+
+def notify_dirty(company_id: int, yms, change=None):
+    """Avisa o worker que os agregados desses meses precisam ser recalculados.
+
+    `change` (hotstore.stage, feito antes do commit) atualiza no lugar o mês corrente em memória.
+    """
+    if change: get_hot_store().apply(change)
+    get_recompute_worker().notify(company_id, yms)
+
+# ==============================
+# SESSION
+# ==============================
+@dataclass
+class SessionUser:
+    company_id: int
+    company_name: str
+    username: str
+    role: str
+
+def set_user(user): st.session_state["user"] = user
+def get_user():     return st.session_state.get("user")
+
+def require_login():
+    if not get_user(): st.warning("Faça login para continuar."); st.stop()
+
+def require_role(roles):
+    u = get_user()
+    if not u or u.role not in roles: st.error("Acesso não permitido."); st.stop()
+
+def fetch_all(conn, sql, params=()): return conn.execute(sql, params).fetchall()
+def fetch_one(conn, sql, params=()): return conn.execute(sql, params).fetchone()
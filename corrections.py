@@ -0,0 +1,159 @@
+"""Correções em lote de lançamentos (Administração → Correções).
+
+- preço: novo valor unitário de um serviço num intervalo de datas (reajuste retroativo de contrato);
+- mover: lançamentos de um técnico/equipe/região no intervalo passam para outro técnico, equipe e/ou região.
+
+preview() só lê: linhas afetadas e receita antes/depois por mês e por técnico
+(ou equipe/região). apply() grava em lotes de BULK_CHUNK lançamentos, uma
+transação curta por lote — o lock de escrita é liberado entre lotes para o
+Lançamento Diário e a API. Cada lote refaz o filtro (linhas alteradas por
+outra pessoa no meio do caminho ficam de fora), incrementa a versão só dos
+meses tocados (mark_dirty) e passa as linhas ao mês corrente em memória
+(hotstore.stage). No fim, as estatísticas de anomalia dos pares (técnico,
+serviço) tocados são recalculadas.
+"""
+import os
+import time
+import datetime as dt
+from dataclasses import dataclass
+import anomaly
+import hotstore
+from queries import mark_dirty
+
+BULK_CHUNK  = int(os.environ.get("BULK_CHUNK", "500"))
+SAMPLE_ROWS = 50
+KINDS       = {"preco": "Reajuste de valor unitário", "mover": "Mover lançamentos"}
+_MOVE_COLS  = (("technician_id", "tech_id",   "new_tech_id",   "technicians", "Técnico"),    # coluna, origem, destino
+               ("team_id",       "team_id",   "new_team_id",   "teams",       "Equipe"),
+               ("region_id",     "region_id", "new_region_id", "regions",     "Região"))
+
+@dataclass
+class Correction:
+    kind: str                   # "preco" | "mover"
+    start: dt.date
+    end: dt.date
+    service_id: int = None      # preço: obrigatório; mover: filtro opcional
+    unit_cents: int = None      # preço: novo valor
+    only_cents: int = None      # preço: só lançamentos com este valor atual (None = todos)
+    tech_id: int = None         # mover: origem (ao menos um filtro)
+    team_id: int = None
+    region_id: int = None
+    new_tech_id: int = None     # mover: destino (None = mantém)
+    new_team_id: int = None
+    new_region_id: int = None
+
+    def validate(self):
+        if self.kind not in KINDS: raise ValueError(f"Tipo de correção desconhecido: {self.kind}")
+        if self.end < self.start: raise ValueError("A data final é anterior à inicial.")
+        if self.kind == "preco":
+            if self.service_id is None: raise ValueError("Escolha o serviço.")
+            if self.unit_cents is None or self.unit_cents < 0: raise ValueError("Informe o novo valor unitário.")
+        else:
+            if self.tech_id is None and self.team_id is None and self.region_id is None:
+                raise ValueError("Escolha ao menos um técnico, equipe ou região de origem.")
+            if self.new_tech_id is None and self.new_team_id is None and self.new_region_id is None:
+                raise ValueError("Escolha ao menos um técnico, equipe ou região de destino.")
+
+    def where(self, company_id: int):
+        """Filtro das linhas que mudam de fato (sem as que já estão com o valor/destino)."""
+        sql, args = ["company_id=?", "entry_date BETWEEN ? AND ?"], [company_id, self.start.isoformat(), self.end.isoformat()]
+        if self.service_id is not None: sql.append("service_type_id=?"); args.append(self.service_id)
+        if self.kind == "preco":
+            sql.append("unit_cents<>?"); args.append(self.unit_cents)
+            if self.only_cents is not None: sql.append("unit_cents=?"); args.append(self.only_cents)
+        else:
+            changes, c_args = [], []
+            for col, old, new, _, _ in _MOVE_COLS:
+                if getattr(self, old) is not None: sql.append(f"{col}=?"); args.append(getattr(self, old))
+                if getattr(self, new) is not None: changes.append(f"{col} IS NOT ?"); c_args.append(getattr(self, new))
+            sql.append("(" + " OR ".join(changes) + ")"); args += c_args
+        return " AND ".join(sql), args
+
+    def assignments(self):
+        if self.kind == "preco": return "unit_cents=?", [self.unit_cents]
+        cols = [(col, getattr(self, new)) for col, _, new, _, _ in _MOVE_COLS if getattr(self, new) is not None]
+        return ", ".join(f"{c}=?" for c, _ in cols), [v for _, v in cols]
+
+    def revenue_after(self):
+        """Expressão SQL da receita (centavos) depois da correção — a mesma de revenue_cents em entries."""
+        if self.kind == "preco": return "CAST(round(quantity * ?) AS INTEGER)", [self.unit_cents]
+        return "revenue_cents", []
+
+# ==============================
+# PRÉVIA
+# ==============================
+def preview(conn, company_id: int, c: Correction) -> dict:
+    """Linhas e receita antes/depois por mês e pelo que muda de dono; amostra das primeiras linhas."""
+    c.validate()
+    where, args = c.where(company_id)
+    after, a_args = c.revenue_after()
+    by_month = [{"Mês": ym, "Lançamentos": n, "Receita antes": b / 100, "Receita depois": a / 100, "Diferença": (a - b) / 100}
+                for ym, n, b, a in conn.execute(f"""
+                    SELECT substr(entry_date, 1, 7), COUNT(*), SUM(revenue_cents), SUM({after})
+                    FROM entries WHERE {where} GROUP BY 1 ORDER BY 1""", a_args + args)]
+    owners = {}                                        # dimensão → {id: [lançamentos, variação em centavos]}
+    dims   = _MOVE_COLS[:1] if c.kind == "preco" else [d for d in _MOVE_COLS if getattr(c, d[2]) is not None]
+    for col, _, new, table, label in dims:
+        delta = owners.setdefault(label, {})
+        for oid, n, b, a in conn.execute(f"""SELECT {col}, COUNT(*), SUM(revenue_cents), SUM({after})
+                                             FROM entries WHERE {where} GROUP BY 1""", a_args + args):
+            dest = getattr(c, new) if c.kind == "mover" else oid
+            for key, dn, dc in ((oid, -n, -b), (dest, n, a)):
+                d = delta.setdefault(key, [0, 0]); d[0] += dn; d[1] += dc
+        names = dict(conn.execute(f"SELECT id, name FROM {table} WHERE company_id=?", (company_id,)).fetchall())
+        owners[label] = [{label: names.get(k, "—") if k is not None else "—", "Lançamentos (saldo)": n, "Variação de receita": v / 100}
+                         for k, (n, v) in sorted(delta.items(), key=lambda kv: kv[1][1]) if n or v]
+    sample = conn.execute(f"""
+        SELECT e.id AS ID, e.entry_date AS Data, t.name AS Tecnico, tm.name AS Equipe, r.name AS Regiao,
+               st.name AS Servico, e.quantity AS Qtd, e.unit_cents / 100.0 AS "Valor antes",
+               e.revenue_cents / 100.0 AS "Receita antes", {after} / 100.0 AS "Receita depois"
+        FROM (SELECT * FROM entries WHERE {where} ORDER BY entry_date, id LIMIT {SAMPLE_ROWS}) e
+        JOIN technicians t    ON t.id  = e.technician_id
+        LEFT JOIN teams tm    ON tm.id = e.team_id
+        LEFT JOIN regions r   ON r.id  = e.region_id
+        JOIN service_types st ON st.id = e.service_type_id
+        ORDER BY e.entry_date, e.id""", a_args + args).fetchall()
+    return {"linhas": sum(m["Lançamentos"] for m in by_month),
+            "antes": sum(m["Receita antes"] for m in by_month), "depois": sum(m["Receita depois"] for m in by_month),
+            "por_mes": by_month, "por_dono": owners, "amostra": [dict(r) for r in sample]}
+
+# ==============================
+# GRAVAÇÃO
+# ==============================
+def apply(conn, company_id: int, c: Correction, chunk: int = BULK_CHUNK, notify=None, progress=None) -> dict:
+    """Aplica em lotes; `notify(company_id, yms, change)` após cada commit (core.notify_dirty)."""
+    c.validate()
+    where, args = c.where(company_id)
+    sets, s_args = c.assignments()
+    ids   = [r[0] for r in conn.execute(f"SELECT id FROM entries WHERE {where} ORDER BY id", args)]
+    t0, pairs, meses = time.perf_counter(), set(), {}
+    for i in range(0, len(ids), chunk):
+        part = ids[i:i + chunk]
+        marks = ",".join("?" * len(part))
+        conn.execute("BEGIN IMMEDIATE")                # leitura e escrita do lote sob o mesmo lock
+        try:
+            before = conn.execute(f"""SELECT id, entry_date, technician_id, service_type_id, revenue_cents
+                                      FROM entries WHERE id IN ({marks}) AND {where}""", part + args).fetchall()
+            hit = [r[0] for r in before]
+            if hit:
+                conn.execute(f"UPDATE entries SET {sets} WHERE id IN ({','.join('?' * len(hit))})", s_args + hit)
+                after = dict(conn.execute(f"SELECT id, revenue_cents FROM entries WHERE id IN ({','.join('?' * len(hit))})", hit).fetchall())
+                yms    = mark_dirty(conn, company_id, [r[1] for r in before])
+                change = hotstore.stage(conn, company_id, hit, yms)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if hit:
+            for eid, day, tech, svc, cents in before:
+                m = meses.setdefault(day[:7], [0, 0, 0]); m[0] += 1; m[1] += cents; m[2] += after[eid]
+                pairs.add((tech, svc)); pairs.add((c.new_tech_id or tech, svc))
+            if notify: notify(company_id, yms, change)
+        if progress: progress(min(i + chunk, len(ids)), len(ids))
+    if pairs:                                          # valores mudaram de par ou de preço: estatísticas dos pares tocados
+        anomaly.rebuild(conn, company_id, sorted(pairs))
+        conn.commit()
+    return {"linhas": sum(m[0] for m in meses.values()), "lotes": -(-len(ids) // chunk),
+            "antes": sum(m[1] for m in meses.values()) / 100, "depois": sum(m[2] for m in meses.values()) / 100,
+            "por_mes": {ym: {"linhas": n, "antes": b / 100, "depois": a / 100} for ym, (n, b, a) in sorted(meses.items())},
+            "segundos": time.perf_counter() - t0}
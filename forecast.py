@@ -0,0 +1,122 @@
+"""Projeção da receita de fim de mês com efeitos de dia da semana e de técnicos em campo.
+
+Modelo linear ajustado por mínimos quadrados (numpy.linalg.lstsq) sobre a
+série diária dos últimos FORECAST_MONTHS meses fechados:
+
+    receita do dia = nível do dia da semana (dias úteis do calendário da empresa)
+                   | nível de dia não útil (domingo, feriado, fechamento)
+                   + efeito por técnico em campo + efeito da posição no mês (arrancada/fechamento)
+
+Técnicos em campo nos dias que faltam = média recente do mesmo dia da semana.
+No ajuste já se calculam, para cada dia k do mês aberto, a receita esperada de
+k+1 até o fim e a faixa de 90% (resíduo + incerteza dos coeficientes): cada
+visita ao Painel só indexa dois arrays. O ajuste é refeito quando o mês vira.
+"""
+import os
+import threading
+import datetime as dt
+from dataclasses import dataclass
+import numpy as np
+import metrics
+from workcal import get_calendar
+
+FORECAST_MONTHS   = int(os.environ.get("FORECAST_MONTHS", "12"))
+FORECAST_MIN_DAYS = 28          # abaixo disso (empresa nova) o Painel usa o ritmo médio
+BAND_Z            = 1.645       # faixa de 90%
+RECENT_DAYS       = 56          # janela da média de técnicos em campo por dia da semana
+_P                = 10          # 7 dias da semana + não útil + técnicos + posição no mês
+
+def _features(days, workday, techs) -> np.ndarray:
+    n     = len(days)
+    X     = np.zeros((n, _P))
+    dow   = (days.astype(np.int64) + 3) % 7                    # 1970-01-01 foi quinta; seg = 0
+    first = days.astype("datetime64[M]")
+    size  = ((first + 1).astype("datetime64[D]") - first.astype("datetime64[D]")).astype(np.int64)
+    X[np.flatnonzero(workday), dow[workday]] = 1
+    X[~workday, 7] = 1
+    X[:, 8] = techs
+    X[:, 9] = (days - first.astype("datetime64[D]")).astype(np.int64) / (size - 1)
+    return X
+
+@dataclass
+class Fit:
+    ym: str
+    days: int               # dias de histórico usados no ajuste
+    sigma: float            # desvio dos resíduos (R$/dia)
+    r2: float
+    rest: np.ndarray        # rest[k]: receita esperada do dia k+1 até o fim do mês (R$)
+    band: np.ndarray        # meia-largura da faixa de 90% de rest[k]
+
+    def project(self, m_revenue: float, day: int) -> dict:
+        """Projeção de fim de mês com o dia `day` já fechado em `m_revenue`. O(1)."""
+        rest, band = float(self.rest[day]), float(self.band[day])
+        return {"projecao": m_revenue + rest, "min": m_revenue + max(rest - band, 0.0),
+                "max": m_revenue + rest + band}
+
+def fit(conn, company_id: int, ym: str):
+    """Ajusta o modelo no histórico antes de `ym` e pré-calcula o mês `ym`; None se o histórico é curto."""
+    first = np.datetime64(ym, "M")
+    start = (first - FORECAST_MONTHS).astype("datetime64[D]")
+    rows  = conn.execute("""
+        SELECT entry_date, SUM(revenue_cents), COUNT(DISTINCT technician_id) FROM entries
+        WHERE company_id=? AND entry_date >= ? AND entry_date < ?
+        GROUP BY entry_date ORDER BY entry_date""", (company_id, str(start), f"{ym}-01")).fetchall()
+    if not rows: return None
+    # Série diária densa desde o primeiro mês com lançamentos (dias sem lançamento = 0)
+    start = np.datetime64(rows[0][0][:7], "M").astype("datetime64[D]")
+    days  = np.arange(start, first.astype("datetime64[D]"))
+    if len(days) < FORECAST_MIN_DAYS: return None
+    idx   = (np.array([r[0] for r in rows], dtype="datetime64[D]") - start).astype(np.int64)
+    y     = np.zeros(len(days)); y[idx] = [r[1] / 100 for r in rows]
+    techs = np.zeros(len(days)); techs[idx] = [r[2] for r in rows]
+
+    cal     = get_calendar(conn, company_id)
+    workday = np.is_busday(days, busdaycal=cal.cal)
+    X       = _features(days, workday, techs)
+    coef, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+    resid   = y - X @ coef
+    dof     = max(len(y) - np.linalg.matrix_rank(X), 1)
+    sigma   = float(np.sqrt(resid @ resid / dof))
+    cov     = sigma ** 2 * np.linalg.pinv(X.T @ X)
+    total   = float(((y - y.mean()) ** 2).sum())
+
+    # Técnicos esperados nos dias do mês aberto: média recente do mesmo tipo de dia
+    month   = np.arange(first, first + 1, dtype="datetime64[D]")
+    m_work  = np.is_busday(month, busdaycal=cal.cal)
+    kind    = lambda d, w: np.where(w, (d.astype(np.int64) + 3) % 7, 7)
+    recent  = slice(-RECENT_DAYS, None)
+    h_kind  = kind(days[recent], workday[recent])
+    h_mean  = np.bincount(h_kind, weights=techs[recent], minlength=8) / np.maximum(np.bincount(h_kind, minlength=8), 1)
+    Xm      = _features(month, m_work, h_mean[kind(month, m_work)])
+    pred    = np.maximum(Xm @ coef, 0.0)
+
+    # Sufixos: dias k+1..fim, para k = 0 (nenhum dia fechado) até o último dia do mês
+    n       = len(month)
+    rest    = np.concatenate([np.cumsum(pred[::-1])[::-1], [0.0]])
+    feats   = np.concatenate([np.cumsum(Xm[::-1], axis=0)[::-1], np.zeros((1, _P))])
+    var     = (n - np.arange(n + 1)) * sigma ** 2 + np.einsum("ij,jk,ik->i", feats, cov, feats)
+    return Fit(ym, len(days), sigma, 1 - float(resid @ resid) / total if total else 0.0,
+               rest, BAND_Z * np.sqrt(np.maximum(var, 0.0)))
+
+class Forecaster:
+    """Ajustes por empresa (1 por servidor — core.get_forecaster); refeitos só na virada do mês."""
+
+    def __init__(self):
+        self.refits = 0
+        self._fits  = {}            # empresa → (mês aberto do ajuste, Fit ou None)
+        self._lock  = threading.Lock()
+
+    def get(self, conn, company_id: int, today: dt.date = None):
+        ym  = (today or dt.date.today()).isoformat()[:7]
+        hit = self._fits.get(company_id, (None,))[0] == ym
+        metrics.cache_lookup("projecao", hit)
+        if not hit:
+            with self._lock:
+                if self._fits.get(company_id, (None,))[0] != ym:
+                    self._fits[company_id] = (ym, fit(conn, company_id, ym))
+                    self.refits += 1
+        return self._fits[company_id][1]
+
+    def forget(self, company_id: int):
+        """Descarta o ajuste (ex.: correção em lote em meses fechados); refeito na próxima leitura."""
+        with self._lock: self._fits.pop(company_id, None)
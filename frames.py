@@ -0,0 +1,95 @@
+"""Leitura colunar tipada: cursor sqlite3 → DataFrame sem passar por list-of-dicts.
+
+As linhas são lidas em lotes (fetchmany) e cada lote vira arrays NumPy já no
+tipo declarado: nomes/categorias viram códigos de categoria, ids viram int32,
+centavos viram int64 e entry_date vira datetime64[D]. Só um lote de tuplas
+Python existe por vez.
+"""
+import numpy as np
+import pandas as pd
+
+FETCH_BATCH = 4096
+
+# Tipos padrão por nome de coluna (sobrescritos pelo parâmetro `dtypes`)
+DEFAULT_DTYPES = {
+    "id": "int", "company_id": "int", "technician_id": "int", "team_id": "int",
+    "region_id": "int", "service_type_id": "int", "is_active": "int8",
+    "entry_date": "date",
+    "name": "category", "category": "category", "role": "category",
+    "Tecnico": "category", "Equipe": "category", "Regiao": "category", "Servico": "category",
+    "tech_name": "category", "team_name": "category", "region_name": "category", "service_name": "category",
+    "quantity": "float",
+    "unit_cents": "int64", "revenue_cents": "int64", "default_unit_cents": "int64",   # centavos: INTEGER de 64 bits no SQLite
+}
+
+_INTS = {"int": np.int32, "int8": np.int8, "int64": np.int64}
+
+def _kind(col, dtypes):
+    if dtypes and col in dtypes: return dtypes[col]
+    return DEFAULT_DTYPES.get(col)
+
+class _Column:
+    """Acumula os lotes de uma coluna já convertidos para o tipo final."""
+
+    def __init__(self, kind):
+        self.kind   = kind
+        self.chunks = []
+        self.masks  = []
+        self.cats   = {} if kind == "category" else None
+
+    def add(self, values):
+        k = self.kind
+        if k == "category":
+            cats  = self.cats
+            codes = np.fromiter((-1 if v is None else cats.setdefault(v, len(cats)) for v in values),
+                                dtype=np.int32, count=len(values))
+            self.chunks.append(codes)
+        elif k in _INTS:
+            mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+            dt   = _INTS[k]
+            self.chunks.append(np.fromiter((0 if v is None else v for v in values), dtype=dt, count=len(values)))
+            self.masks.append(mask)
+        elif k == "float":
+            self.chunks.append(np.fromiter((np.nan if v is None else v for v in values),
+                                           dtype=np.float64, count=len(values)))
+        elif k == "date":
+            self.chunks.append(np.array([v[:10] if v else None for v in values], dtype="datetime64[D]"))
+        else:
+            self.chunks.append(values)
+
+    def build(self):
+        k = self.kind
+        if k == "category":
+            codes = np.concatenate(self.chunks) if self.chunks else np.empty(0, np.int32)
+            return pd.Categorical.from_codes(codes, categories=list(self.cats))
+        if k in _INTS:
+            values = np.concatenate(self.chunks)
+            mask   = np.concatenate(self.masks)
+            return pd.arrays.IntegerArray(values, mask) if mask.any() else values
+        if k == "float":
+            return np.concatenate(self.chunks)
+        if k == "date":
+            return np.concatenate(self.chunks).astype("datetime64[ns]")
+        # Sem tipo declarado: mesma inferência do pandas para listas Python
+        out = []
+        for c in self.chunks: out.extend(c)
+        return pd.Series(out)
+
+def fetch_df(conn, sql, params=(), dtypes=None, batch=FETCH_BATCH) -> pd.DataFrame:
+    """Executa `sql` e monta um DataFrame coluna a coluna com os tipos declarados."""
+    cur = conn.cursor()
+    cur.row_factory = None   # tuplas puras: sqlite3.Row aqui só custaria memória
+    cur.execute(sql, params)
+    names = [d[0] for d in cur.description]
+    cols  = [_Column(_kind(n, dtypes)) for n in names]
+    n     = 0
+    while True:
+        rows = cur.fetchmany(batch)
+        if not rows: break
+        n += len(rows)
+        for col, values in zip(cols, zip(*rows)):
+            col.add(values)
+    cur.close()
+    if n == 0:
+        return pd.DataFrame(columns=names)
+    return pd.DataFrame({name: col.build() for name, col in zip(names, cols)}, copy=False)
@@ -0,0 +1,96 @@
+"""Regras de meta diária por técnico (tipo de equipe × categoria × região × vigência).
+
+As regras da empresa são compiladas uma vez em arrays NumPy (por categoria) e
+avaliadas de uma vez sobre todos os técnico-dias do mês: para cada dia vale a
+regra mais específica (região > tipo de equipe > genérica) e, entre regras
+igualmente específicas, a de vigência mais recente — assim uma nova meta a
+partir do dia 15 vale só para os dias seguintes, sem fechar a anterior.
+"""
+import datetime as dt
+import numpy as np
+
+CATEGORIES  = {"ativacao": "Ativação", "manutencao": "Manutenção"}
+TEAM_TYPES  = {"*": "Todas", "solo": "Solo", "equipe": "Equipe"}
+DEFAULT_ALERT_PCT = 0.833
+
+# Metas históricas (antes fixas no código) — semeadas para cada empresa e usadas se nenhuma regra casar
+DEFAULT_TARGETS = {("ativacao", "solo"): 3.0, ("ativacao", "equipe"): 4.0,
+                   ("manutencao", "solo"): 4.0, ("manutencao", "equipe"): 6.0}
+DEFAULT_FROM = "2000-01-01"
+_NO_END      = np.iinfo(np.int64).max
+_SPEC        = 10 ** 7        # prioridade = especificidade * _SPEC + início da vigência (dias desde 1970)
+
+# ==============================
+# REGRAS COMPILADAS
+# ==============================
+def _day(value) -> int:
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+class GoalRules:
+    def __init__(self, rows=()):
+        """rows: (team_type, category, region_id, valid_from, valid_to, daily_target, alert_pct)."""
+        self.rules = {}
+        for cat in CATEGORIES:
+            sel = [r for r in rows if r[1] == cat]
+            team   = np.array([{"solo": 1, "equipe": 0}.get(r[0], -1) for r in sel], dtype=np.int8)
+            region = np.array([-1 if r[2] is None else r[2] for r in sel], dtype=np.int64)
+            frm    = np.array([_day(r[3]) for r in sel], dtype=np.int64)
+            to     = np.array([_NO_END if not r[4] else _day(r[4]) for r in sel], dtype=np.int64)
+            spec   = (region >= 0) * 2 + (team >= 0)
+            self.rules[cat] = {"team": team, "region": region, "from": frm, "to": to,
+                               "prio": spec.astype(np.int64) * _SPEC + frm,
+                               "target": np.array([r[5] for r in sel], dtype=np.float64),
+                               "pct": np.array([r[6] for r in sel], dtype=np.float64)}
+
+    def evaluate(self, category: str, days, solo, region):
+        """Meta diária e limiar do semáforo para cada técnico-dia (arrays do mesmo tamanho).
+
+        days: dias desde 1970 (int), solo: 0/1, region: id ou -1.
+        """
+        days   = np.asarray(days, dtype=np.int64)[:, None]
+        solo   = np.asarray(solo, dtype=np.int8)
+        region = np.asarray(region, dtype=np.int64)[:, None]
+        fallback = np.where(solo == 1, DEFAULT_TARGETS[(category, "solo")], DEFAULT_TARGETS[(category, "equipe")])
+        r = self.rules[category]
+        if not r["target"].size:
+            return fallback, np.full(len(solo), DEFAULT_ALERT_PCT)
+        match = ((days >= r["from"]) & (days <= r["to"])
+                 & ((r["team"] < 0) | (solo[:, None] == r["team"]))
+                 & ((r["region"] < 0) | (region == r["region"])))
+        score = np.where(match, r["prio"], -1)
+        best  = score.argmax(axis=1)
+        found = score[np.arange(len(best)), best] >= 0
+        return (np.where(found, r["target"][best], fallback),
+                np.where(found, r["pct"][best], DEFAULT_ALERT_PCT))
+
+    def describe(self, day: dt.date) -> str:
+        """Metas gerais (sem região) vigentes no dia, para a legenda das páginas."""
+        d, parts = [_day(day)] * 2, []
+        for cat, label in CATEGORIES.items():
+            (solo, equipe), _ = self.evaluate(cat, d, [1, 0], [-1, -1])
+            parts.append(f"{label}: Solo = {solo:g}/dia | Equipe = {equipe:g}/dia")
+        return "    •    ".join(parts)
+
+# ==============================
+# CARGA (cache por empresa até as regras mudarem)
+# ==============================
+_CACHE = {}
+
+def get_rules(conn, company_id: int) -> GoalRules:
+    stamp = tuple(conn.execute("SELECT COUNT(*), MAX(updated_at) FROM goal_rules WHERE company_id=?",
+                               (company_id,)).fetchone())
+    hit = _CACHE.get(company_id)
+    if hit is None or hit[0] != stamp:
+        rows = conn.execute("""SELECT team_type, category, region_id, valid_from, valid_to, daily_target, alert_pct
+                               FROM goal_rules WHERE company_id=?""", (company_id,)).fetchall()
+        hit = _CACHE[company_id] = (stamp, GoalRules([tuple(r) for r in rows]))
+    return hit[1]
+
+def seed_defaults(conn):
+    """Cria as regras históricas (3/4 ativ, 4/6 manu, alerta 83,3%) para empresas sem nenhuma regra."""
+    now = dt.datetime.utcnow().isoformat()
+    for (cid,) in conn.execute("SELECT id FROM companies WHERE id NOT IN (SELECT company_id FROM goal_rules)").fetchall():
+        conn.executemany("""INSERT INTO goal_rules(company_id, team_type, category, region_id, valid_from, valid_to,
+                                daily_target, alert_pct, updated_at) VALUES (?,?,?,NULL,?,NULL,?,?,?)""",
+                         [(cid, team, cat, DEFAULT_FROM, target, DEFAULT_ALERT_PCT, now)
+                          for (cat, team), target in DEFAULT_TARGETS.items()])
@@ -0,0 +1,243 @@
+"""Mês corrente em memória: os lançamentos do mês aberto de cada empresa em colunas NumPy.
+
+Quase todo acesso (Painel, Indicadores, Meus Indicadores) é do mês corrente.
+Cada empresa tem um _Month com uma posição por lançamento (dia, técnico,
+equipe, região, serviço, quantidade, centavos); equipe → solo, serviço →
+categoria e técnico → nome vêm de tabelas de consulta pequenas (_Dims). Totais
+e indicadores saem de bincount/unique sobre as colunas, sem SQL.
+
+Coerência com o banco:
+- as gravações do app chamam stage() antes do commit e HotStore.apply()
+  depois (core.notify_dirty): as linhas mudam no lugar se a versão do mês em
+  data_versions for exatamente a seguinte à que está em memória;
+- commits de qualquer outra conexão (outro processo, CLI) mudam o
+  PRAGMA data_version da conexão do store: as tabelas de consulta são relidas
+  e, se a versão do mês mudou, o mês é recarregado;
+- na virada do mês o mês novo é carregado do zero.
+"""
+import os
+import sqlite3
+import threading
+import datetime as dt
+from dataclasses import dataclass
+import numpy as np
+import metrics
+from aggregates import current_version
+from kpi import kpis_from_days, month_kpis
+
+DB_PATH    = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+CATEGORIES = ("ativacao", "manutencao", "outros")
+_COLS      = {"day": np.int8, "tech": np.int32, "team": np.int32, "region": np.int32,
+              "svc": np.int32, "qty": np.float64, "cents": np.int64}
+_NO_REGION = np.iinfo(np.int64).max
+
+def open_month() -> str:
+    return dt.date.today().isoformat()[:7]
+
+# ==============================
+# GRAVAÇÕES (chamadas pelas páginas)
+# ==============================
+@dataclass
+class Change:
+    company_id: int
+    ym: str               # mês aberto quando a gravação foi feita
+    yms: list             # meses cuja versão a gravação incrementou (mark_dirty)
+    version: int          # versão do mês aberto depois da gravação (0 se não foi tocado)
+    rows: dict            # id → (entry_date, técnico, equipe, região, serviço, qtd, centavos); None = excluído
+
+def stage(conn, company_id: int, entry_ids, yms) -> Change:
+    """Na transação da gravação, depois de mark_dirty: estado final dos lançamentos tocados."""
+    ym   = open_month()
+    ids  = [int(i) for i in entry_ids]
+    rows = dict.fromkeys(ids)
+    for i in range(0, len(ids), 500):
+        part = ids[i:i + 500]
+        for r in conn.execute(f"""SELECT id, entry_date, technician_id, team_id, region_id, service_type_id,
+                                         quantity, revenue_cents
+                                  FROM entries WHERE company_id=? AND id IN ({",".join("?" * len(part))})""",
+                              (company_id, *part)):
+            rows[r[0]] = tuple(r)[1:]
+    version = current_version(conn, company_id, ym) if ym in yms else 0
+    return Change(company_id, ym, list(yms), version, rows)
+
+# ==============================
+# COLUNAS
+# ==============================
+class _Dims:
+    """Tabelas de consulta da empresa. Índice -1 (equipe/região NULL) cai na última posição, que vale 0."""
+
+    def __init__(self, conn, company_id):
+        techs = conn.execute("SELECT id, name FROM technicians WHERE company_id=?", (company_id,)).fetchall()
+        teams = conn.execute("SELECT id, is_solo FROM teams WHERE company_id=?", (company_id,)).fetchall()
+        svcs  = conn.execute("SELECT id, category FROM service_types WHERE company_id=?", (company_id,)).fetchall()
+        self.names    = {int(i): n for i, n in techs}
+        self.tech_id  = {n: i for i, n in self.names.items()}
+        self.solo     = np.zeros(max((i for i, _ in teams), default=0) + 2, dtype=np.int8)
+        self.category = np.full(max((i for i, _ in svcs), default=0) + 2, CATEGORIES.index("outros"), dtype=np.int8)
+        for i, s in teams: self.solo[i] = 1 if s else 0
+        for i, c in svcs:  self.category[i] = CATEGORIES.index(c)
+
+class _Month:
+    """Colunas com folga para crescer; só as n primeiras posições valem. pos: id do lançamento → posição."""
+
+    def __init__(self, ym, version, dv, ids, cols):
+        self.ym, self.version, self.dv, self.stale = ym, version, dv, False
+        self.n    = len(ids)
+        cap       = max(64, 2 * self.n)
+        self.ids  = np.zeros(cap, dtype=np.int64); self.ids[:self.n] = ids
+        self.cols = {}
+        for (k, typ), values in zip(_COLS.items(), cols):
+            self.cols[k] = np.zeros(cap, dtype=typ); self.cols[k][:self.n] = values
+        self.pos  = dict(zip(map(int, ids), range(self.n)))
+
+    @classmethod
+    def load(cls, conn, company_id, ym, version, dv):
+        rows = conn.execute("""
+            SELECT id, CAST(substr(entry_date, 9, 2) AS INTEGER), technician_id,
+                   COALESCE(team_id, -1), COALESCE(region_id, -1), service_type_id, quantity, revenue_cents
+            FROM entries WHERE company_id=? AND entry_date BETWEEN ? AND ?""",
+            (company_id, f"{ym}-01", f"{ym}-31")).fetchall()
+        cols = list(zip(*rows)) or [()] * (len(_COLS) + 1)
+        return cls(ym, version, dv, cols[0], cols[1:])
+
+    def col(self, k):
+        return self.cols[k][:self.n]
+
+    def upsert(self, entry_id, values):
+        i = self.pos.get(entry_id)
+        if i is None:
+            if self.n == len(self.ids):
+                self.ids = np.resize(self.ids, 2 * self.n)
+                self.cols = {k: np.resize(a, 2 * self.n) for k, a in self.cols.items()}
+            i = self.pos[entry_id] = self.n
+            self.ids[i] = entry_id
+            self.n += 1
+        for a, v in zip(self.cols.values(), values): a[i] = v
+
+    def remove(self, entry_id):
+        i = self.pos.pop(entry_id, None)
+        if i is None: return
+        last = self.n - 1
+        if i != last:                                         # a última posição ocupa o buraco
+            self.ids[i] = self.ids[last]
+            for a in self.cols.values(): a[i] = a[last]
+            self.pos[int(self.ids[i])] = i
+        self.n = last
+
+def _values(row) -> tuple:
+    day, tech, team, region, svc, qty, cents = row
+    return (int(day[8:10]), tech, -1 if team is None else team, -1 if region is None else region, svc, qty, cents)
+
+# ==============================
+# STORE (1 por servidor — core.get_hot_store)
+# ==============================
+class HotStore:
+    def __init__(self, db_path=DB_PATH):
+        self.conn     = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.rebuilds = 0
+        self.applied  = 0
+        self._months  = {}
+        self._dims    = {}
+        self._lock    = threading.Lock()
+
+    def is_open(self, ym: str) -> bool:
+        return ym == open_month()
+
+    def _sync(self, company_id) -> _Month:
+        """Mês aberto da empresa em dia com o banco (chamar com o lock)."""
+        ym = open_month()
+        dv = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        m  = self._months.get(company_id)
+        if m and m.ym == ym and not m.stale and m.dv == dv:
+            metrics.cache_lookup("mes_corrente", True)
+            return m
+        self.conn.execute("BEGIN")                            # tabelas de consulta e lançamentos do mesmo instante
+        try:
+            self._dims[company_id] = _Dims(self.conn, company_id)
+            version = current_version(self.conn, company_id, ym)
+            hit     = bool(m) and m.ym == ym and not m.stale and m.version == version
+            if hit: m.dv = dv                                 # commit alheio que não tocou nos lançamentos do mês
+            else:
+                m = self._months[company_id] = _Month.load(self.conn, company_id, ym, version, dv)
+                self.rebuilds += 1
+        finally:
+            self.conn.execute("COMMIT")
+        metrics.cache_lookup("mes_corrente", hit)
+        return m
+
+    def apply(self, change: Change):
+        """Depois do commit: aplica a gravação no lugar, ou marca o mês para recarga se perdeu alguma versão."""
+        with self._lock:
+            m = self._months.get(change.company_id)
+            if not m or m.ym != change.ym or m.ym not in change.yms or m.stale: return
+            if change.version <= m.version: return            # já recarregado com esta gravação
+            if change.version != m.version + 1:
+                m.stale = True; return
+            for entry_id, row in change.rows.items():
+                if row and row[0][:7] == m.ym: m.upsert(entry_id, _values(row))
+                else: m.remove(entry_id)
+            m.version = change.version
+            self.applied += 1
+
+    def version(self, company_id: int) -> tuple:
+        """(mês, versão) do mês aberto em memória, já em dia com o banco — entra no ETag da API."""
+        with self._lock:
+            m = self._sync(company_id)
+            return m.ym, m.version
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"empresas": len(self._months), "lancamentos": sum(m.n for m in self._months.values()),
+                    "recargas": self.rebuilds, "no_lugar": self.applied}
+
+    # ==============================
+    # LEITURAS
+    # ==============================
+    def dashboard(self, company_id: int) -> dict:
+        """Mesmo formato de aggregates.month_payload, para o mês aberto."""
+        with self._lock:
+            m   = self._sync(company_id)
+            day, qty, cents = m.col("day"), m.col("qty"), m.col("cents")
+            cat   = self._dims[company_id].category[m.col("svc")]
+            q_dia = np.bincount(day, weights=qty,   minlength=32)
+            c_dia = np.bincount(day, weights=cents, minlength=32)   # centavos inteiros: exato em float64 até 2**53
+            n_dia = np.bincount(day, minlength=32)
+            q_cat = np.bincount(cat, weights=qty, minlength=len(CATEGORIES))
+            n_cat = np.bincount(cat, minlength=len(CATEGORIES))
+            total = int(cents.sum())
+            ym    = m.ym
+        dias = np.flatnonzero(n_dia)
+        return {"qtd": float(q_dia.sum()), "receita": total / 100,
+                "por_categoria": {CATEGORIES[c]: float(q_cat[c]) for c in np.flatnonzero(n_cat)},
+                "por_dia": {f"{ym}-{d:02d}": [float(q_dia[d]), int(c_dia[d]) / 100] for d in dias},
+                "dias": len(dias)}
+
+    def kpis(self, conn, company_id: int, ym: str, tech_name=None) -> list:
+        """Mesmo resultado de kpi.month_kpis; fora do mês aberto, consulta o banco."""
+        if not self.is_open(ym): return month_kpis(conn, company_id, ym, tech_name)
+        with self._lock:
+            m    = self._sync(company_id)
+            dims = self._dims[company_id]
+            sel  = slice(None)
+            if tech_name is not None:
+                if tech_name not in dims.tech_id: return []
+                sel = m.col("tech") == dims.tech_id[tech_name]
+            tech, day, team, region = (m.col(k)[sel] for k in ("tech", "day", "team", "region"))
+            qty, cents, cat = m.col("qty")[sel], m.col("cents")[sel], dims.category[m.col("svc")[sel]]
+            solo = dims.solo[team]
+        if not len(tech): return []
+
+        # Técnico-dias: solo se algum lançamento do dia foi em equipe individual; região = menor id do dia
+        keys, g = np.unique(tech.astype(np.int64) * 32 + day, return_inverse=True)
+        k       = len(keys)
+        order   = np.argsort(g, kind="stable")
+        starts  = np.searchsorted(g[order], np.arange(k))
+        reg     = np.minimum.reduceat(np.where(region >= 0, region, _NO_REGION)[order], starts)
+        tech_ids = keys // 32
+        return kpis_from_days(
+            conn, company_id, [dims.names.get(int(t), f"#{t}") for t in tech_ids], tech_ids,
+            int(np.datetime64(f"{ym}-01", "D").astype(np.int64)) - 1 + keys % 32,
+            np.bincount(g, weights=solo, minlength=k) > 0, np.where(reg == _NO_REGION, -1, reg),
+            np.bincount(g, weights=np.where(cat == 0, qty, 0), minlength=k),
+            np.bincount(g, weights=np.where(cat == 1, qty, 0), minlength=k),
+            np.bincount(g, weights=cents, minlength=k))
@@ -0,0 +1,142 @@
+"""Cálculo dos indicadores por técnico (sem Streamlit — usado pelas páginas e pelo worker)."""
+import calendar
+import numpy as np
+from goals import DEFAULT_ALERT_PCT, get_rules
+from workcal import get_calendar
+
+# ==============================
+# INDICADORES — helpers
+# ==============================
+def _semaforo(media, meta_media, limiar_pct=DEFAULT_ALERT_PCT):
+    if media >= meta_media:          return "kpi-green",  "🟢", "No alvo"
+    elif media >= meta_media * limiar_pct: return "kpi-orange", "🟠", "Atenção"
+    else:                            return "kpi-red",    "🔴", "Abaixo"
+
+def _perf(tech_name, dias_solo, dias_equipe, ativ_total, manu_total, meta_ativ_total, meta_manu_total,
+          pct_ativ_lim, pct_manu_lim, meta_ativ_vazio, meta_manu_vazio):
+    total_dias      = dias_solo + dias_equipe
+    media_ativ      = ativ_total / total_dias      if total_dias > 0 else 0.0
+    media_manu      = manu_total / total_dias      if total_dias > 0 else 0.0
+    meta_ativ_media = meta_ativ_total / total_dias if total_dias > 0 else meta_ativ_vazio
+    meta_manu_media = meta_manu_total / total_dias if total_dias > 0 else meta_manu_vazio
+    pct_ativ        = (ativ_total / meta_ativ_total * 100) if meta_ativ_total > 0 else 0
+    pct_manu        = (manu_total / meta_manu_total * 100) if meta_manu_total > 0 else 0
+    cor_a, sem_a, st_a = _semaforo(media_ativ, meta_ativ_media, pct_ativ_lim)
+    cor_m, sem_m, st_m = _semaforo(media_manu, meta_manu_media, pct_manu_lim)
+    return {
+        "Tecnico": tech_name, "DiasSolo": dias_solo, "DiasEquipe": dias_equipe,
+        "DiasTrabalh": total_dias,
+        "AtivTotal": ativ_total, "MediaAtiv": media_ativ, "MetaAtivMedia": meta_ativ_media,
+        "PctAtiv": pct_ativ, "CorAtiv": cor_a, "SemAtiv": sem_a, "StAtiv": st_a,
+        "ManuTotal": manu_total, "MediaManu": media_manu, "MetaManuMedia": meta_manu_media,
+        "PctManu": pct_manu, "CorManu": cor_m, "SemManu": sem_m, "StManu": st_m,
+    }
+
+def card_html(p, show_receita=True) -> str:
+    """Card HTML de um técnico (página Indicadores e relatório mensal)."""
+    receita_html = (f"<div style='margin-top:8px;font-size:0.78rem;color:#aaa;text-align:right;'>"
+                    f"Receita: R$ {p.get('ReceitaGerada',0):,.0f}</div>") if show_receita else ""
+    return f"""
+    <div style="background:#1e1e2f;border:1px solid rgba(255,255,255,0.12);border-radius:16px;padding:16px 18px;margin-bottom:10px;">
+        <div style="font-size:1.05rem;font-weight:700;color:#fff;margin-bottom:12px;">
+            👤 {p['Tecnico']}
+            <span style="font-size:0.78rem;color:#aaa;">&nbsp;{p['DiasTrabalh']}d ({p['DiasSolo']}solo+{p['DiasEquipe']}eq)</span>
+        </div>
+        <div style="display:flex;gap:10px;">
+            <div style="flex:1;background:{'#0d3320' if p['CorAtiv']=='kpi-green' else '#3d2400' if p['CorAtiv']=='kpi-orange' else '#3d0000'};
+                        border:1px solid {'#2ecc71' if p['CorAtiv']=='kpi-green' else '#f39c12' if p['CorAtiv']=='kpi-orange' else '#e74c3c'};
+                        border-radius:10px;padding:10px 12px;">
+                <div style="font-size:0.78rem;color:#ccc;">⚡ Ativação</div>
+                <div style="font-size:1.4rem;font-weight:700;color:#fff;">{p['MediaAtiv']:.2f}<span style="font-size:0.75rem;color:#aaa;">/dia</span></div>
+                <div style="font-size:0.75rem;color:#ccc;">
+                    {p['SemAtiv']} {p['StAtiv']}<br>
+                    Meta {p['MetaAtivMedia']:.1f} | Total: {p['AtivTotal']:.0f} ativ | {p['PctAtiv']:.0f}% cumprido
+                </div>
+            </div>
+            <div style="flex:1;background:{'#0d3320' if p['CorManu']=='kpi-green' else '#3d2400' if p['CorManu']=='kpi-orange' else '#3d0000'};
+                        border:1px solid {'#2ecc71' if p['CorManu']=='kpi-green' else '#f39c12' if p['CorManu']=='kpi-orange' else '#e74c3c'};
+                        border-radius:10px;padding:10px 12px;">
+                <div style="font-size:0.78rem;color:#ccc;">🔧 Manutenção</div>
+                <div style="font-size:1.4rem;font-weight:700;color:#fff;">{p['MediaManu']:.2f}<span style="font-size:0.75rem;color:#aaa;">/dia</span></div>
+                <div style="font-size:0.75rem;color:#ccc;">
+                    {p['SemManu']} {p['StManu']}<br>
+                    Meta {p['MetaManuMedia']:.1f} | Total: {p['ManuTotal']:.0f} manu | {p['PctManu']:.0f}% cumprido
+                </div>
+            </div>
+        </div>
+        {receita_html}
+    </div>"""
+
+def month_kpis(conn, company_id, ym, tech_name=None):
+    """Indicadores de todos os técnicos com lançamento no mês, por receita decrescente.
+
+    Uma consulta traz os técnico-dias (solo se algum lançamento do dia foi em
+    equipe individual; região = menor id do dia) e as metas de cada dia vêm das
+    regras da empresa, avaliadas de uma vez sobre todos os dias.
+    """
+    start = f"{ym}-01"
+    end   = f"{ym}-{calendar.monthrange(int(ym[:4]), int(ym[5:]))[1]:02d}"
+    rows  = conn.execute(f"""
+        SELECT t.name, e.technician_id, e.entry_date,
+               MAX(COALESCE(tm.is_solo, 0)), COALESCE(MIN(e.region_id), -1),
+               SUM(CASE WHEN st.category='ativacao'   THEN e.quantity ELSE 0 END),
+               SUM(CASE WHEN st.category='manutencao' THEN e.quantity ELSE 0 END),
+               SUM(e.revenue_cents)
+        FROM entries e JOIN technicians t ON t.id=e.technician_id
+        JOIN service_types st ON st.id=e.service_type_id
+        LEFT JOIN teams tm ON tm.id=e.team_id
+        WHERE e.company_id=? AND e.entry_date BETWEEN ? AND ? {"AND t.name=?" if tech_name else ""}
+        GROUP BY e.technician_id, t.name, e.entry_date""",
+        (company_id, start, end) + ((tech_name,) if tech_name else ())).fetchall()
+    if not rows: return []
+    names, tech_ids, days, solo, region, ativ, manu, receita = zip(*rows)
+    return kpis_from_days(conn, company_id, names, tech_ids, np.array(days, dtype="datetime64[D]").astype(np.int64),
+                          solo, region, ativ, manu, receita)
+
+def kpis_from_days(conn, company_id, names, tech_ids, days, solo, region, ativ, manu, receita):
+    """Indicadores a partir dos técnico-dias (uma posição por técnico × dia; days em dias desde 1970, receita em centavos).
+
+    Usado por month_kpis (SQL) e pelo mês corrente em memória (hotstore). A meta
+    de cada dia só vale se o dia é útil no calendário da região do lançamento.
+    """
+    _, idx    = np.unique(np.asarray(tech_ids), return_inverse=True)
+    solo      = np.asarray(solo, dtype=np.int8)
+    rules     = get_rules(conn, company_id)
+    meta_a, lim_a = rules.evaluate("ativacao",   days, solo, region)
+    meta_m, lim_m = rules.evaluate("manutencao", days, solo, region)
+    # Dia não útil no calendário da região (domingo, feriado regional, fechamento): produção conta, meta não
+    util          = get_calendar(conn, company_id).is_workday_many(np.asarray(days, dtype=np.int64).astype("datetime64[D]"), region)
+    meta_a, meta_m = meta_a * util, meta_m * util
+
+    n   = idx.max() + 1
+    sum_ = lambda w: np.bincount(idx, weights=np.asarray(w, dtype=np.float64), minlength=n)
+    dias_solo, dias  = np.bincount(idx, weights=solo, minlength=n), np.bincount(idx, minlength=n)
+    ativ_t, manu_t   = sum_(ativ), sum_(manu)
+    meta_a_t, meta_m_t = sum_(meta_a), sum_(meta_m)
+    lim_a_m, lim_m_m = sum_(lim_a) / dias, sum_(lim_m) / dias
+    receita_t        = sum_(receita) / 100      # centavos inteiros: soma exata em float64 até 2**53
+    nome = dict(zip(idx.tolist(), names))
+
+    perf_data = []
+    for i in np.argsort(-receita_t, kind="stable"):
+        p = _perf(nome[int(i)], int(dias_solo[i]), int(dias[i] - dias_solo[i]), float(ativ_t[i]), float(manu_t[i]),
+                  float(meta_a_t[i]), float(meta_m_t[i]), float(lim_a_m[i]), float(lim_m_m[i]), 0.0, 0.0)
+        p["ReceitaGerada"] = float(receita_t[i])
+        perf_data.append(p)
+    return perf_data
+
+def _calc_perf_tecnico(conn, company_id, ym, tech_name, kpis=month_kpis):
+    """Calcula métricas de um técnico para o mês ym. Retorna dict sem receita.
+
+    kpis: month_kpis ou HotStore.kpis (mês corrente em memória), mesma assinatura.
+    """
+    found = kpis(conn, company_id, ym, tech_name)
+    if found:
+        p = found[0]; p.pop("ReceitaGerada")
+        return p
+    # Sem lançamentos: mostra a meta de um dia solo no início do mês
+    day  = np.array([f"{ym}-01"], dtype="datetime64[D]").astype(np.int64)
+    rules = get_rules(conn, company_id)
+    (ma,), (la,) = rules.evaluate("ativacao",   day, [1], [-1])
+    (mm,), (lm,) = rules.evaluate("manutencao", day, [1], [-1])
+    return _perf(tech_name, 0, 0, 0.0, 0.0, 0.0, 0.0, float(la), float(lm), float(ma), float(mm))
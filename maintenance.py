@@ -0,0 +1,136 @@
+"""Manutenção periódica do banco: ANALYZE / PRAGMA optimize e incremental_vacuum.
+
+Banco criado antes do auto_vacuum incremental é convertido aqui, com o VACUUM
+único na primeira janela ociosa (ou via CLI) — nunca no caminho das requisições.
+
+Na mesma janela pré-gera o relatório do último mês fechado (reports.prebuild).
+
+O job roda em thread própria e só age em janelas ociosas, detectadas pela
+data da última gravação no arquivo do banco (e do -wal, se existir).
+"""
+import sqlite3
+import os
+import time
+import threading
+
+DB_PATH            = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+MAINT_INTERVAL_H   = float(os.environ.get("MAINT_INTERVAL_H", "24"))
+MAINT_IDLE_S       = float(os.environ.get("MAINT_IDLE_S", "300"))
+MAINT_CHECK_S      = float(os.environ.get("MAINT_CHECK_S", "60"))
+MAINT_VACUUM_PAGES = int(os.environ.get("MAINT_VACUUM_PAGES", "0"))   # 0 = libera todas
+ANALYSIS_LIMIT     = int(os.environ.get("MAINT_ANALYSIS_LIMIT", "1000"))
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+# ==============================
+# MIGRAÇÃO
+# ==============================
+def enable_incremental_vacuum(conn, vacuum: bool = False) -> bool:
+    """Liga auto_vacuum=INCREMENTAL; True se ficou ligado.
+
+    Em banco novo (sem tabelas) o PRAGMA basta. Em banco já existente só vale
+    depois de um VACUUM completo, feito apenas com `vacuum=True` (run_maintenance).
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return True
+    conn.commit()
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    if vacuum: conn.execute("VACUUM")
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+# ==============================
+# ESTATÍSTICAS
+# ==============================
+def last_write_ts(db_path=DB_PATH) -> float:
+    ts = 0.0
+    for p in (db_path, db_path + "-wal"):
+        try: ts = max(ts, os.path.getmtime(p))
+        except OSError: pass
+    return ts
+
+def db_stats(conn, db_path=DB_PATH) -> dict:
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages     = conn.execute("PRAGMA page_count").fetchone()[0]
+    free      = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    mode      = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    analyzed  = conn.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'").fetchone() is not None
+    return {
+        "file_bytes": os.path.getsize(db_path) if os.path.exists(db_path) else 0,
+        "page_size": page_size, "page_count": pages, "freelist_count": free,
+        "free_pct": (free / pages * 100) if pages else 0.0,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(mode, str(mode)), "analyzed": analyzed,
+    }
+
+# ==============================
+# MANUTENÇÃO
+# ==============================
+def run_maintenance(db_path=DB_PATH, vacuum_pages=MAINT_VACUUM_PAGES) -> dict:
+    """Executa ANALYZE/optimize + incremental_vacuum e devolve estatísticas antes/depois."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        before   = db_stats(conn, db_path)
+        t0       = time.perf_counter()
+        migrated = before["auto_vacuum"] != "incremental" and enable_incremental_vacuum(conn, vacuum=True)
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        if not before["analyzed"]:
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+        if before["auto_vacuum"] == "incremental" and before["freelist_count"] > 0:
+            n = f"({int(vacuum_pages)})" if vacuum_pages else ""
+            # executescript avança o PRAGMA até o fim (execute liberaria só 1 página)
+            conn.executescript(f"PRAGMA incremental_vacuum{n};")
+        conn.commit()
+        duration = time.perf_counter() - t0
+        after    = db_stats(conn, db_path)
+    finally:
+        conn.close()
+    return {"before": before, "after": after, "duration_s": duration, "migrated": migrated, "finished_at": time.time()}
+
+class MaintenanceScheduler(threading.Thread):
+    """Roda run_maintenance no máximo a cada `interval_h`, só com o banco ocioso há `idle_s`."""
+
+    def __init__(self, db_path=DB_PATH, interval_h=MAINT_INTERVAL_H, idle_s=MAINT_IDLE_S, check_s=MAINT_CHECK_S):
+        super().__init__(name="technoops-maintenance", daemon=True)
+        self.db_path, self.interval_h, self.idle_s, self.check_s = db_path, interval_h, idle_s, check_s
+        self.last_report = None
+        self.last_error  = None
+        self.last_run    = 0.0
+        self._lock       = threading.Lock()
+        self._halt       = threading.Event()
+
+    def is_idle(self) -> bool:
+        return time.time() - last_write_ts(self.db_path) >= self.idle_s
+
+    def is_due(self) -> bool:
+        return time.time() - self.last_run >= self.interval_h * 3600
+
+    def run_now(self) -> dict:
+        with self._lock:
+            try:
+                import reports                                                    # pandas só na janela de manutenção
+                self.last_report = run_maintenance(self.db_path)
+                self.last_report["relatorios"] = reports.prebuild(self.db_path)   # mês que acabou de fechar
+                self.last_error  = None
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                raise
+            finally:
+                self.last_run = time.time()
+            return self.last_report
+
+    def run(self):
+        while not self._halt.wait(self.check_s):
+            if self.is_due() and self.is_idle():
+                try: self.run_now()
+                except Exception: pass
+
+    def stop(self): self._halt.set()
+
+if __name__ == "__main__":
+    import sys
+    r = run_maintenance(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
+    for k in ("before", "after"):
+        s = r[k]
+        print(f"{k:6}: {s['file_bytes']/1_048_576:.2f} MB, {s['page_count']} páginas, "
+              f"{s['freelist_count']} livres ({s['free_pct']:.1f}%), auto_vacuum={s['auto_vacuum']}")
+    print(f"duração: {r['duration_s']:.2f}s" + (" (convertido para auto_vacuum incremental)" if r["migrated"] else ""))
@@ -0,0 +1,232 @@
+"""Métricas do servidor no formato texto do Prometheus (sem dependências).
+
+Contadores, gauges e histogramas em memória, baratos o suficiente para os
+caminhos quentes (um lock e uma soma por observação). A exposição é opcional:
+
+  METRICS_PORT=9464          → http://<host>:9464/metrics numa thread à parte
+  METRICS_TEXTFILE=/var/lib/node_exporter/technoops.prom
+                             → arquivo reescrito a cada METRICS_INTERVAL_S (textfile collector)
+"""
+import os
+import time
+import bisect
+import sqlite3
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT     = int(os.environ.get("METRICS_PORT", "0") or 0)
+METRICS_TEXTFILE = os.environ.get("METRICS_TEXTFILE", "")
+METRICS_INTERVAL = float(os.environ.get("METRICS_INTERVAL_S", "15"))
+SESSION_WINDOW_S = 300        # sessão "ativa" = rerun nos últimos 5 min
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS   = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# ==============================
+# TIPOS
+# ==============================
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _fmt_labels(names, values, extra=""):
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra: parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt(v):
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, doc, labels=()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self._values = {}
+        self._lock   = threading.Lock()
+        REGISTRY.append(self)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, n=1):
+        with self._lock: self._values[labels] = self._values.get(labels, 0) + n
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt(v)}" for k, v in sorted(self._values.items())]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name, doc, labels=(), fn=None):
+        super().__init__(name, doc, labels)
+        self.fn = fn               # calculado na exposição (ex.: sessões ativas)
+
+    def set(self, *labels, value):
+        with self._lock: self._values[labels] = value
+
+    def render(self):
+        if self.fn:
+            with self._lock: self._values = {(): self.fn()}
+        return super().render()
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(buckets)
+        self._le     = [f'le="{_fmt(b)}"' for b in self.buckets] + ['le="+Inf"']
+
+    def observe(self, *labels, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            h = self._values.get(labels)
+            if h is None: h = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            h[0][i] += 1; h[1] += value; h[2] += 1
+
+    def count(self, *labels):
+        h = self._values.get(labels)
+        return h[2] if h else 0
+
+    def render(self):
+        out = self.header()
+        with self._lock: items = [(k, list(h[0]), h[1], h[2]) for k, h in sorted(self._values.items())]
+        for k, counts, total, n in items:
+            acc = 0
+            for le, c in zip(self._le, counts):
+                acc += c
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, k, le)} {acc}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, k)} {total!r}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, k)} {n}")
+        return out
+
+REGISTRY = []
+
+def render() -> str:
+    lines = []
+    for m in REGISTRY: lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+# ==============================
+# SESSÕES ATIVAS
+# ==============================
+_sessions      = {}
+_sessions_lock = threading.Lock()
+
+def touch_session(session_id):
+    with _sessions_lock: _sessions[session_id] = time.monotonic()
+
+def active_sessions() -> int:
+    limit = time.monotonic() - SESSION_WINDOW_S
+    with _sessions_lock:
+        for sid in [s for s, t in _sessions.items() if t < limit]: _sessions.pop(sid, None)
+        return len(_sessions)
+
+# ==============================
+# MÉTRICAS DO APP
+# ==============================
+PAGE_SECONDS   = Histogram("technoops_page_render_seconds", "Tempo de renderização da página por rerun.", ["page"])
+PAGE_SQL       = Histogram("technoops_page_sql_statements", "Comandos SQL executados por rerun da página.", ["page"], COUNT_BUCKETS)
+PAGE_ERRORS    = Counter("technoops_page_errors_total", "Reruns que terminaram em exceção.", ["page"])
+SQL_STATEMENTS = Counter("technoops_sql_statements_total", "Comandos SQL executados pelas conexões do app.")
+DB_COMMIT      = Histogram("technoops_db_commit_seconds", "Duração do commit (inclui espera pelo lock de escrita).")
+DB_LOCKED      = Counter("technoops_db_locked_total", "Erros 'database is locked' (espera de lock esgotada).", ["where"])
+CACHE_LOOKUPS  = Counter("technoops_cache_lookups_total", "Consultas a caches do app.", ["cache"])
+CACHE_MISSES   = Counter("technoops_cache_misses_total", "Consultas a caches que precisaram recalcular.", ["cache"])
+LOGINS         = Counter("technoops_login_attempts_total", "Tentativas de login por resultado.", ["result"])
+PBKDF2_SECONDS = Histogram("technoops_pbkdf2_seconds", "Tempo de cada derivação PBKDF2 (login/troca de senha).")
+API_REQUESTS   = Counter("technoops_api_requests_total", "Pedidos à API JSON por rota e status HTTP.", ["route", "status"])
+API_SECONDS    = Histogram("technoops_api_request_seconds", "Tempo de resposta da API JSON (inclui espera no pool).", ["route"])
+SECTION_SECONDS  = Histogram("technoops_page_section_seconds", "Tempo de carga de cada seção da página (pool de leitura).", ["page", "section"])
+SECTION_FAILURES = Counter("technoops_page_section_failures_total", "Seções que falharam ou passaram do prazo.", ["page", "section", "reason"])
+SESSIONS       = Gauge("technoops_active_sessions", f"Sessões com rerun nos últimos {SESSION_WINDOW_S}s.", fn=active_sessions)
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache)
+    if not hit: CACHE_MISSES.inc(cache)
+
+def is_locked(exc) -> bool:
+    return isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc)
+
+# ==============================
+# POR RERUN — SQL por página (contador da thread do ScriptRunner)
+# ==============================
+_local = threading.local()
+
+def sql_statement(_stmt=None):
+    """Trace callback das conexões do app (sqlite3 set_trace_callback)."""
+    SQL_STATEMENTS.inc()
+    _local.sql = getattr(_local, "sql", 0) + 1
+
+@contextlib.contextmanager
+def page_timer(page: str):
+    """Latência, comandos SQL e erros de um rerun da página (st.rerun/st.stop não contam como erro)."""
+    _local.sql = 0
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        PAGE_ERRORS.inc(page)
+        if is_locked(exc): DB_LOCKED.inc("pagina")
+        raise
+    finally:
+        PAGE_SECONDS.observe(page, value=time.perf_counter() - t0)
+        PAGE_SQL.observe(page, value=_local.sql)
+
+# ==============================
+# EXPOSIÇÃO
+# ==============================
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404); return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): pass
+
+class MetricsExporter(threading.Thread):
+    """Servidor HTTP /metrics (port) e/ou gravação periódica do textfile (path)."""
+
+    def __init__(self, port=METRICS_PORT, textfile=METRICS_TEXTFILE, interval_s=METRICS_INTERVAL):
+        super().__init__(name="technoops-metrics", daemon=True)
+        self.port, self.textfile, self.interval_s = port, textfile, interval_s
+        self.last_error = None
+        self.server     = None
+        self._halt      = threading.Event()
+        if port:
+            try:
+                self.server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+            except OSError as exc:       # porta ocupada (outro processo do app) — segue sem HTTP
+                self.last_error = f"porta {port}: {exc}"
+            else:
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, name="technoops-metrics-http", daemon=True).start()
+
+    def write_textfile(self):
+        tmp = self.textfile + ".tmp"
+        with open(tmp, "w") as f: f.write(render())
+        os.replace(tmp, self.textfile)       # o collector nunca lê um arquivo pela metade
+
+    def run(self):
+        if not self.textfile: return
+        while not self._halt.wait(self.interval_s):
+            try:
+                self.write_textfile(); self.last_error = None
+            except OSError as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+
+    def stop(self):
+        self._halt.set()
+        if self.server: self.server.shutdown()
@@ -0,0 +1,207 @@
+"""Motor analítico opcional: espelho colunar (DuckDB) do banco para as consultas de relatório.
+
+ANALYTICS_ENGINE=duckdb liga o espelho; o padrão (sqlite) deixa tudo no banco
+principal. Gravações continuam só no SQLite. O espelho é copiado inteiro numa
+única transação de leitura do SQLite para um arquivo novo em OLAP_DIR; os
+leitores abrem sempre o arquivo mais recente. A MirrorScheduler refaz a cópia
+quando o banco foi gravado desde a última, no máximo a cada
+ANALYTICS_REFRESH_S.
+
+Os serviços de relatório (period_summary, cube, technician_trend,
+month_kpis) recebem a conexão de reader(): o espelho só responde se as
+versões dos meses pedidos (data_versions) e a assinatura dos cadastros,
+regras de meta e calendário (queries.dims_stamp, gravada em mirror_stamps na
+cópia) forem as mesmas do SQLite — senão a consulta vai para o SQLite e o resultado é
+sempre o atual.
+
+    python olap.py --refresh
+"""
+import sqlite3
+import os
+import glob
+import time
+import threading
+import maintenance
+import metrics
+
+try:                                   # opcional: pip install duckdb
+    import duckdb
+except ImportError:
+    duckdb = None
+
+DB_PATH        = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+ENGINE         = os.environ.get("ANALYTICS_ENGINE", "sqlite").lower()
+OLAP_DIR       = os.environ.get("OLAP_DIR", os.path.join(os.path.dirname(DB_PATH), "olap"))
+REFRESH_S      = float(os.environ.get("ANALYTICS_REFRESH_S", "300"))
+OLAP_KEEP      = 2                     # arquivos mantidos (o anterior pode estar aberto por um leitor)
+
+# Tabelas espelhadas: DDL no DuckDB e SELECT no SQLite (mesmas colunas, mesma ordem)
+MIRROR = {
+    "entries": ("""id BIGINT, company_id INTEGER, entry_date VARCHAR, technician_id INTEGER, team_id INTEGER,
+                   region_id INTEGER, service_type_id INTEGER, quantity DOUBLE, unit_cents BIGINT, revenue_cents BIGINT""",
+                """SELECT id, company_id, entry_date, technician_id, team_id, region_id, service_type_id,
+                          quantity, unit_cents, revenue_cents FROM entries"""),
+    "technicians":   ("id INTEGER, company_id INTEGER, name VARCHAR, is_active INTEGER",
+                      "SELECT id, company_id, name, is_active FROM technicians"),
+    "teams":         ("id INTEGER, company_id INTEGER, name VARCHAR, is_active INTEGER, is_solo INTEGER",
+                      "SELECT id, company_id, name, is_active, is_solo FROM teams"),
+    "regions":       ("id INTEGER, company_id INTEGER, name VARCHAR, is_active INTEGER",
+                      "SELECT id, company_id, name, is_active FROM regions"),
+    "service_types": ("id INTEGER, company_id INTEGER, name VARCHAR, category VARCHAR, default_unit_cents BIGINT, is_active INTEGER",
+                      "SELECT id, company_id, name, category, default_unit_cents, is_active FROM service_types"),
+    "data_versions": ("company_id INTEGER, ym VARCHAR, version INTEGER",
+                      "SELECT company_id, ym, version FROM data_versions"),
+    "goal_rules":    ("""id INTEGER, company_id INTEGER, team_type VARCHAR, category VARCHAR, region_id INTEGER,
+                         valid_from VARCHAR, valid_to VARCHAR, daily_target DOUBLE, alert_pct DOUBLE, updated_at VARCHAR""",
+                      """SELECT id, company_id, team_type, category, region_id, valid_from, valid_to,
+                                daily_target, alert_pct, updated_at FROM goal_rules"""),
+    "company_calendar":  ("company_id INTEGER, weekmask VARCHAR, version INTEGER",
+                          "SELECT company_id, weekmask, version FROM company_calendar"),
+    "calendar_holidays": ("id INTEGER, company_id INTEGER, day VARCHAR, name VARCHAR, kind VARCHAR, region_id INTEGER",
+                          "SELECT id, company_id, day, name, kind, region_id FROM calendar_holidays"),
+}
+_AS_TEXT = {"entry_date": "str", "day": "str", "name": "str", "category": "str"}   # sem datetime64/categorias na cópia
+
+def enabled() -> bool:
+    return ENGINE == "duckdb" and duckdb is not None
+
+# ==============================
+# CÓPIA
+# ==============================
+def build_mirror(db_path=DB_PATH, out_dir=OLAP_DIR, keep=OLAP_KEEP) -> dict:
+    """Copia as tabelas de MIRROR para um arquivo DuckDB novo; lançamentos ordenados por empresa e data."""
+    if duckdb is None: raise RuntimeError("Espelho analítico indisponível: instale o pacote duckdb")
+    from frames import fetch_df                            # pandas só quando o espelho é copiado
+    from queries import dims_stamp
+    os.makedirs(out_dir, exist_ok=True)
+    final = os.path.join(out_dir, f"espelho-{time.time_ns()}.duckdb")
+    tmp   = final + ".tmp"
+    t0    = time.perf_counter()
+    src   = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    dst   = duckdb.connect(tmp)
+    rows  = {}
+    try:
+        src.execute("BEGIN")                               # todas as tabelas do mesmo instante
+        for table, (ddl, sql) in MIRROR.items():
+            df = fetch_df(src, sql, dtypes=_AS_TEXT)
+            dst.execute(f"CREATE TABLE {table} ({ddl})")
+            if len(df):
+                dst.register("copia", df)
+                order = " ORDER BY company_id, entry_date" if table == "entries" else ""
+                dst.execute(f"INSERT INTO {table} SELECT * FROM copia{order}")   # zonemaps podam por empresa/data
+                dst.unregister("copia")
+            rows[table] = len(df)
+        stamps = [(cid, dims_stamp(src, cid)) for (cid,) in src.execute("SELECT id FROM companies").fetchall()]
+        dst.execute("CREATE TABLE mirror_stamps (company_id INTEGER, dims VARCHAR)")
+        if stamps: dst.executemany("INSERT INTO mirror_stamps VALUES (?, ?)", stamps)
+        src.execute("COMMIT")
+        dst.execute("CHECKPOINT")
+    finally:
+        dst.close(); src.close()
+    os.replace(tmp, final)
+    for old in sorted(glob.glob(os.path.join(out_dir, "espelho-*.duckdb")))[:-keep]:
+        try: os.remove(old)
+        except OSError: pass
+    return {"path": final, "rows": rows, "duration_s": time.perf_counter() - t0,
+            "bytes": os.path.getsize(final), "finished_at": time.time()}
+
+# ==============================
+# LEITURA
+# ==============================
+class DuckConn:
+    """O pedaço de sqlite3.Connection que os serviços de relatório usam (execute, cursor p/ fetch_df)."""
+    dialect = "duckdb"
+
+    def __init__(self, cur):
+        self._cur, self.row_factory = cur, None
+
+    def execute(self, sql, params=()):
+        return self._cur.execute(sql, list(params))
+
+    def cursor(self):      return self
+    def fetchmany(self, n): return self._cur.fetchmany(n)
+    def close(self):       pass
+
+    @property
+    def description(self): return self._cur.description
+
+_open      = {}                        # arquivo → conexão somente leitura (um arquivo novo por cópia)
+_open_lock = threading.Lock()
+
+def _latest(out_dir=OLAP_DIR):
+    files = sorted(glob.glob(os.path.join(out_dir, "espelho-*.duckdb")))
+    if not files: return None
+    with _open_lock:
+        if files[-1] not in _open:
+            for path in list(_open):                       # cópias antigas: cursores em uso mantêm a base viva
+                del _open[path]
+            _open[files[-1]] = duckdb.connect(files[-1], read_only=True)
+        return _open[files[-1]].cursor()
+
+def reader(conn, company_id: int, start, end):
+    """Conexão para as consultas de relatório do intervalo: o espelho se estiver em dia, senão `conn`."""
+    if not enabled(): return conn
+    cur = _latest()
+    if cur is None:
+        metrics.cache_lookup("olap", False); return conn
+    from queries import dims_stamp
+    sql  = "SELECT ym, version FROM data_versions WHERE company_id=? AND ym BETWEEN ? AND ? ORDER BY ym"
+    args = (company_id, start.isoformat()[:7], end.isoformat()[:7])
+    try:
+        hit = ([tuple(r) for r in conn.execute(sql, args)] == [tuple(r) for r in cur.execute(sql, list(args)).fetchall()]
+               and cur.execute("SELECT dims FROM mirror_stamps WHERE company_id=?", [company_id]).fetchone()
+                   == (dims_stamp(conn, company_id),))
+    except duckdb.Error:                                   # cópia de uma versão anterior, sem mirror_stamps
+        hit = False
+    metrics.cache_lookup("olap", hit)
+    return DuckConn(cur) if hit else conn
+
+# ==============================
+# AGENDADOR
+# ==============================
+class MirrorScheduler(threading.Thread):
+    """Refaz o espelho a cada `refresh_s` se o banco foi gravado desde a última cópia."""
+
+    def __init__(self, db_path=DB_PATH, out_dir=OLAP_DIR, refresh_s=REFRESH_S):
+        super().__init__(name="technoops-olap", daemon=True)
+        self.db_path, self.out_dir, self.refresh_s = db_path, out_dir, refresh_s
+        self.last_report = None
+        self.last_error  = None
+        self.last_start  = 0.0
+        self._lock       = threading.Lock()
+        self._halt       = threading.Event()
+
+    def run_now(self) -> dict:
+        with self._lock:
+            self.last_start = time.time()
+            try:
+                self.last_report = build_mirror(self.db_path, self.out_dir)
+                self.last_error  = None
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                raise
+            return self.last_report
+
+    def run(self):
+        wait = 0.0                                         # primeira cópia logo na subida
+        while not self._halt.wait(wait):
+            wait = self.refresh_s
+            if maintenance.last_write_ts(self.db_path) >= self.last_start:
+                try: self.run_now()
+                except Exception: pass
+
+    def stop(self): self._halt.set()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Espelho analítico (DuckDB) do TechnoOps")
+    ap.add_argument("--db", default=DB_PATH)
+    ap.add_argument("--out", default=OLAP_DIR)
+    ap.add_argument("--refresh", action="store_true", help="gera uma cópia nova agora")
+    a = ap.parse_args()
+    if a.refresh:
+        r = build_mirror(a.db, a.out)
+        print(f"{os.path.basename(r['path'])}: {sum(r['rows'].values()):,} linhas, "
+              f"{r['bytes']/1_048_576:.1f} MB em {r['duration_s']:.2f}s")
+    else:
+        ap.print_help()
@@ -0,0 +1,116 @@
+"""Carregamento concorrente das seções independentes de uma página (Painel).
+
+As leituras de cada seção rodam num pool pequeno (PAGE_WORKERS threads), cada
+thread com a sua conexão somente leitura (mode=ro + query_only) sobre o banco
+em WAL: leitores não esperam gravações nem uns aos outros. A página desenha os
+placeholders na ordem final e preenche cada seção assim que os dados dela
+chegam; seção que passa do prazo vira um aviso sem segurar as outras. A
+latência percebida passa a ser a da seção mais lenta, não a soma de todas.
+
+O pool é do servidor, dividido entre as sessões. O prazo de cada seção conta
+de quando ela começa a rodar; na fila ela espera no máximo o mesmo prazo e,
+se não começou, é pulada sem ocupar thread. Seção que passa do prazo rodando
+tem a consulta interrompida (Connection.interrupt) e devolve a thread ao pool.
+
+O Streamlit só desenha na thread da sessão: as funções das seções só leem e
+devolvem dados.
+"""
+import os
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import metrics
+
+DB_PATH           = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+PAGE_WORKERS      = int(os.environ.get("PAGE_WORKERS", "4"))
+SECTION_TIMEOUT_S = float(os.environ.get("PAGE_SECTION_TIMEOUT_S", "8"))
+
+class _Task:
+    """Estado de uma seção no pool: fila → rodando → fim (ou pulada, se a página desistiu ainda na fila)."""
+
+    def __init__(self, fn, timeout):
+        self.fn, self.timeout = fn, timeout
+        self.queued  = time.monotonic()
+        self.started = None
+        self.state   = "fila"
+        self.conn    = None
+        self.lock    = threading.Lock()
+
+    def deadline(self) -> float:
+        return (self.started or self.queued) + self.timeout
+
+@dataclass
+class Section:
+    name: str
+    ok: bool
+    value: object = None
+    error: str = ""         # exceção ou prazo esgotado
+
+class PageLoader:
+    """Pool de leitura (1 por servidor — core.get_page_loader)."""
+
+    def __init__(self, db_path=DB_PATH, workers=PAGE_WORKERS):
+        self.db_path = db_path
+        self.pool    = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="technoops-secao")
+        self._local  = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True,
+                                                      timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only=1")
+            conn.set_trace_callback(metrics.sql_statement)
+        return conn
+
+    def _run(self, task):
+        with task.lock:
+            if task.state != "fila": return None, 0.0        # pulada: a página já desistiu dela
+            task.state, task.started, task.conn = "rodando", time.monotonic(), self._conn()
+        try:
+            t0 = time.perf_counter()
+            return task.fn(task.conn), time.perf_counter() - t0
+        finally:
+            with task.lock: task.state = "fim"
+
+    def _give_up(self, task):
+        """Prazo esgotado: pula se ainda está na fila, interrompe a consulta se está rodando. None se já terminou."""
+        with task.lock:
+            if task.state == "fila":
+                task.state = "pulada"; return "fila"
+            if task.state == "rodando":
+                task.conn.interrupt(); return "prazo"          # a mesma thread não pega outra seção antes do "fim"
+        return None
+
+    def load(self, page: str, sections: dict, timeouts: dict = None):
+        """Gera Section na ordem em que ficam prontas. `sections`: nome → fn(conn); prazo por seção contado do início."""
+        tasks   = {name: _Task(fn, (timeouts or {}).get(name, SECTION_TIMEOUT_S)) for name, fn in sections.items()}
+        futures = {self.pool.submit(self._run, t): name for name, t in tasks.items()}
+        pending = set(futures)
+        while pending:
+            next_dl = min(tasks[futures[f]].deadline() for f in pending)
+            done, _ = wait(pending, timeout=max(next_dl - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            for f in done:
+                name = futures[f]
+                try:
+                    value, took = f.result()
+                except Exception as exc:
+                    metrics.SECTION_FAILURES.inc(page, name, "erro")
+                    yield Section(name, False, error=f"{type(exc).__name__}: {exc}")
+                else:
+                    metrics.SECTION_SECONDS.observe(page, name, value=took)
+                    yield Section(name, True, value)
+            pending -= done
+            now = time.monotonic()
+            for f in [f for f in pending if tasks[futures[f]].deadline() <= now]:
+                name, task = futures[f], tasks[futures[f]]
+                reason = self._give_up(task)
+                if reason is None: continue                     # terminou agora: sai no próximo wait
+                f.cancel()
+                pending.discard(f)
+                metrics.SECTION_FAILURES.inc(page, name, reason)
+                yield Section(name, False, error=(f"passou de {task.timeout:g}s" if reason == "prazo"
+                                                  else f"não começou em {task.timeout:g}s (servidor ocupado)"))
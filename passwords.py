@@ -0,0 +1,60 @@
+"""Hash de senhas (PBKDF2-SHA256) e hash em lote num pool de processos.
+
+Sem Streamlit: os processos do pool importam só este módulo (e metrics).
+"""
+import os
+import time
+import hashlib
+import secrets
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import metrics
+
+PBKDF2_ITERATIONS = 200_000
+HASH_WORKERS      = int(os.environ.get("HASH_WORKERS", "0") or 0) or min(os.cpu_count() or 1, 8)
+
+# Senhas temporárias: sem caracteres ambíguos (0/O, 1/l/I)
+_TEMP_ALPHABET = "abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+def _pbkdf2_hash(password: str, salt_hex: str) -> str:
+    t0 = time.perf_counter()
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt_hex), PBKDF2_ITERATIONS)
+    metrics.PBKDF2_SECONDS.observe(value=time.perf_counter() - t0)
+    return dk.hex()
+
+def verify_password(stored: str, password: str) -> bool:
+    try:
+        algo, salt, digest = stored.split("$", 2)
+        if algo != "pbkdf2_sha256": return False
+        return _pbkdf2_hash(password, salt) == digest
+    except Exception:
+        return False
+
+def hash_password(password: str) -> str:
+    salt = secrets.token_hex(16)
+    return f"pbkdf2_sha256${salt}${_pbkdf2_hash(password, salt)}"
+
+def temp_password(length: int = 10) -> str:
+    return "".join(secrets.choice(_TEMP_ALPHABET) for _ in range(length))
+
+def hash_many(passwords: list, workers: int = HASH_WORKERS, progress=None) -> list:
+    """Hashes na mesma ordem de `passwords`, em até `workers` processos (spawn: sem herdar threads do servidor).
+
+    progress(feitos, total) é chamado na thread de quem pediu, conforme os lotes terminam.
+    """
+    total = len(passwords)
+    if total == 0: return []
+    if workers <= 1 or total == 1:
+        out = []
+        for i, p in enumerate(passwords, 1):
+            out.append(hash_password(p))
+            if progress: progress(i, total)
+        return out
+    chunk = max(1, total // (workers * 4))
+    out   = []
+    with ProcessPoolExecutor(max_workers=min(workers, total),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        for h in pool.map(hash_password, passwords, chunksize=chunk):
+            out.append(h)
+            if progress and (len(out) % chunk == 0 or len(out) == total): progress(len(out), total)
+    return out
@@ -0,0 +1,141 @@
+"""Perfil por rerun (opt-in): cProfile ou amostragem de pilhas em volta da página.
+
+Desligado, o custo é só o teste `wants()` em render_page. Ligado, cada rerun
+das páginas escolhidas vira um ProfileRecord guardado em memória (últimos
+PROFILE_KEEP), com as funções mais caras e um arquivo para download: .pstats
+(cProfile, abre com `python -m pstats` / snakeviz) ou pilhas colapsadas
+(amostragem, formato do flamegraph.pl / speedscope).
+"""
+import os
+import sys
+import time
+import marshal
+import cProfile
+import threading
+import collections
+import datetime as dt
+from dataclasses import dataclass, field
+
+PROFILE_KEEP     = int(os.environ.get("PROFILE_KEEP", "20"))
+SAMPLE_INTERVAL  = float(os.environ.get("PROFILE_SAMPLE_MS", "5")) / 1000
+ROOT             = os.path.dirname(os.path.abspath(__file__))
+
+MODES = {"cprofile": "cProfile (determinístico)", "amostragem": "Amostragem de pilhas"}
+
+@dataclass
+class ProfileRecord:
+    page: str
+    user: str
+    mode: str
+    started_at: str
+    duration_s: float
+    top: list                  # [{Função, Chamadas, Própria (ms), Acumulada (ms)}] por tempo acumulado
+    data: bytes = field(repr=False)
+    filename: str = ""
+
+def _where(filename, line, func):
+    if filename.startswith(ROOT): filename = os.path.relpath(filename, ROOT)
+    elif "site-packages" in filename: filename = filename.split("site-packages" + os.sep, 1)[1]
+    return f"{func} ({filename}:{line})" if line else func
+
+# ==============================
+# cPROFILE
+# ==============================
+def _top_cprofile(stats: dict, limit: int) -> list:
+    rows = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:limit]
+    return [{"Função": _where(*key), "Chamadas": nc, "Própria (ms)": tt * 1000, "Acumulada (ms)": ct * 1000}
+            for key, (cc, nc, tt, ct, callers) in rows]
+
+# ==============================
+# AMOSTRAGEM
+# ==============================
+class _Sampler(threading.Thread):
+    """Lê a pilha da thread do rerun a cada `interval` segundos (sys._current_frames).
+
+    Só guarda os frames a partir de `root` (a função da página), sem o ScriptRunner acima dela.
+    """
+
+    def __init__(self, thread_id, interval, root=None):
+        super().__init__(name="technoops-sampler", daemon=True)
+        self.thread_id, self.interval, self.root = thread_id, interval, root
+        self.stacks = collections.Counter()
+        self._halt  = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                if code is self.root: break
+                frame = frame.f_back
+            if stack: self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._halt.set(); self.join()
+
+def _top_samples(stacks: collections.Counter, interval: float, limit: int) -> list:
+    total, own = collections.Counter(), collections.Counter()
+    for stack, n in stacks.items():
+        for key in set(stack): total[key] += n
+        own[stack[-1]] += n
+    return [{"Função": _where(*key), "Chamadas": None, "Própria (ms)": own[key] * interval * 1000,
+             "Acumulada (ms)": n * interval * 1000} for key, n in total.most_common(limit)]
+
+def _collapsed(stacks: collections.Counter) -> bytes:
+    lines = [";".join(_where(*f) for f in stack) + f" {n}" for stack, n in stacks.items()]
+    return "\n".join(lines).encode()
+
+# ==============================
+# REGISTRO
+# ==============================
+class ProfileStore:
+    """Configuração do modo perfil e últimos registros (um por servidor)."""
+
+    def __init__(self, keep=PROFILE_KEEP):
+        self.enabled  = False
+        self.mode     = "cprofile"
+        self.pages    = set()          # vazio = todas
+        self.top_n    = 40
+        self.records  = collections.deque(maxlen=keep)
+        self._lock    = threading.Lock()
+
+    def wants(self, page: str) -> bool:
+        return self.enabled and (not self.pages or page in self.pages)
+
+    def run(self, page: str, user: str, fn, *args):
+        """Executa fn(*args) sob o profiler e guarda o registro, mesmo se a página chamar st.rerun/st.stop."""
+        now     = dt.datetime.now()
+        started = now.isoformat(sep=" ", timespec="seconds")
+        stem    = f"{page}-{now:%Y%m%d-%H%M%S}"
+        t0      = time.perf_counter()
+        if self.mode == "amostragem":
+            sampler = _Sampler(threading.get_ident(), SAMPLE_INTERVAL, getattr(fn, "__code__", None))
+            sampler.start()
+            try:
+                return fn(*args)
+            finally:
+                sampler.stop()
+                self._add(ProfileRecord(page, user, self.mode, started, time.perf_counter() - t0,
+                                        _top_samples(sampler.stacks, SAMPLE_INTERVAL, self.top_n),
+                                        _collapsed(sampler.stacks), f"{stem}.collapsed.txt"))
+        pr = cProfile.Profile()
+        try:
+            pr.enable()
+        except ValueError:             # outro profiler ativo (3.12+: um por processo) — roda sem perfil
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            pr.disable()
+            pr.create_stats()
+            self._add(ProfileRecord(page, user, self.mode, started, time.perf_counter() - t0,
+                                    _top_cprofile(pr.stats, self.top_n), marshal.dumps(pr.stats),
+                                    f"{stem}.pstats"))
+
+    def _add(self, rec: ProfileRecord):
+        with self._lock: self.records.appendleft(rec)
+
+    def clear(self):
+        with self._lock: self.records.clear()
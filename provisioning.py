@@ -0,0 +1,100 @@
+"""Cadastro em lote de técnicos e usuários 'technician' a partir de um CSV.
+
+plan() confere o arquivo contra o banco, sem gravar, e devolve a prévia linha a
+linha. apply() gera as senhas temporárias que faltarem, calcula os hashes em
+paralelo (passwords.hash_many, fora da transação) e grava técnicos e usuários
+numa transação só: ou entra tudo, ou nada.
+
+Colunas: nome (obrigatória), usuario e senha (opcionais). Separador , ; ou tab.
+"""
+import io
+import csv
+import unicodedata
+import datetime as dt
+from dataclasses import dataclass
+from passwords import hash_many, temp_password
+
+MIN_PASSWORD = 6
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+@dataclass
+class PlanRow:
+    linha: int
+    nome: str
+    usuario: str
+    senha: str                 # vazia = gerar temporária
+    cria_tecnico: bool = False
+    cria_usuario: bool = False
+    erro: str = ""
+
+    @property
+    def status(self) -> str:
+        if self.erro: return f"❌ {self.erro}"
+        if self.cria_tecnico and self.cria_usuario: return "Novo técnico + usuário"
+        if self.cria_usuario: return "Técnico já existe — cria usuário"
+        if self.cria_tecnico: return "Usuário já existe — cria técnico"
+        return "Já cadastrado — ignorado"
+
+def default_username(name: str) -> str:
+    """Mesmo LOWER() do SQLite (só ASCII), usado por Meus Indicadores para achar o técnico do usuário."""
+    return name.translate(_ASCII_LOWER)
+
+def _header(h: str) -> str:
+    h = unicodedata.normalize("NFKD", (h or "").strip().lower())
+    return "".join(c for c in h if not unicodedata.combining(c))
+
+def read_csv(data: bytes) -> list:
+    """Linhas do CSV como dicts com cabeçalho normalizado ("Usuário" → "usuario")."""
+    try: text = data.decode("utf-8-sig")
+    except UnicodeDecodeError: text = data.decode("latin-1")
+    try: dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+    except csv.Error: dialect = csv.excel
+    reader = csv.reader(io.StringIO(text), dialect)
+    header = [_header(h) for h in next(reader, [])]
+    if "nome" not in header: raise ValueError("O CSV precisa de uma coluna 'nome'.")
+    return [dict(zip(header, (v.strip() for v in row))) for row in reader if any(v.strip() for v in row)]
+
+# ==============================
+# PRÉVIA
+# ==============================
+def plan(conn, company_id: int, data: bytes, generate: bool = True) -> list:
+    techs = {default_username(r[0]) for r in conn.execute("SELECT name FROM technicians WHERE company_id=?", (company_id,))}
+    users = {r[0] for r in conn.execute("SELECT username FROM users WHERE company_id=?", (company_id,))}
+    seen_names, seen_users, out = set(), set(), []
+    for i, rec in enumerate(read_csv(data), start=2):          # linha 1 = cabeçalho
+        nome  = rec.get("nome", "")
+        row   = PlanRow(i, nome, rec.get("usuario") or default_username(nome), rec.get("senha", ""))
+        key   = default_username(nome)
+        if not nome:                                          row.erro = "nome vazio"
+        elif default_username(row.usuario) != key:            row.erro = "usuário deve ser o nome do técnico (deixe em branco para usar o nome)"
+        elif key in seen_names or row.usuario in seen_users:  row.erro = "repetido no arquivo"
+        elif row.senha and len(row.senha) < MIN_PASSWORD:     row.erro = f"senha com menos de {MIN_PASSWORD} caracteres"
+        else:
+            row.cria_tecnico = key not in techs
+            row.cria_usuario = row.usuario not in users
+            if row.cria_usuario and not row.senha and not generate: row.erro = "sem senha (ative as senhas temporárias)"
+        seen_names.add(key); seen_users.add(row.usuario)
+        out.append(row)
+    return out
+
+# ==============================
+# GRAVAÇÃO
+# ==============================
+def apply(conn, company_id: int, rows: list, progress=None) -> list:
+    """Grava as linhas válidas numa transação. Devolve [(nome, usuario, senha temporária)] das senhas geradas."""
+    if any(r.erro for r in rows): raise ValueError("Corrija as linhas com erro antes de gravar.")
+    novos  = [r for r in rows if r.cria_usuario]
+    senhas = [r.senha or temp_password() for r in novos]
+    hashes = hash_many(senhas, progress=progress)             # antes do BEGIN: não segura o lock de escrita
+    now    = dt.datetime.utcnow().isoformat()
+    try:
+        conn.executemany("INSERT INTO technicians(company_id, name, is_active) VALUES (?,?,1)",
+                         [(company_id, r.nome) for r in rows if r.cria_tecnico])
+        conn.executemany("""INSERT INTO users(company_id, username, password_hash, role, is_active, created_at)
+                            VALUES (?,?,?,'technician',1,?)""",
+                         [(company_id, r.usuario, h, now) for r, h in zip(novos, hashes)])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return [(r.nome, r.usuario, s) for r, s in zip(novos, senhas) if not r.senha]
@@ -0,0 +1,253 @@
+"""Consultas de resumo reutilizáveis (sem Streamlit): totais por período direto no SQL."""
+import re
+import hashlib
+import calendar
+import datetime as dt
+from frames import fetch_df
+from workcal import get_calendar
+
+# ==============================
+# PERÍODOS
+# ==============================
+GRANULARITIES = {
+    "dia":       "e.entry_date",
+    "semana":    "date(e.entry_date, '-' || ((CAST(strftime('%w', e.entry_date) AS INTEGER) + 6) % 7) || ' days')",
+    "mes":       "substr(e.entry_date,1,7)",
+    "trimestre": "substr(e.entry_date,1,4) || '-T' || ((CAST(substr(e.entry_date,6,2) AS INTEGER) + 2) / 3)",
+    "ano":       "substr(e.entry_date,1,4)",
+}
+# Espelho DuckDB (olap.py): mesmas consultas, só estas expressões mudam (semana ISO e divisão inteira)
+DUCKDB_GRANULARITIES = {**GRANULARITIES,
+    "semana":    "strftime(date_trunc('week', CAST(e.entry_date AS DATE)), '%Y-%m-%d')",
+    "trimestre": "substr(e.entry_date,1,4) || '-T' || ((CAST(substr(e.entry_date,6,2) AS INTEGER) + 2) // 3)",
+}
+
+def period_bounds(kind: str, ref: dt.date) -> tuple:
+    """Início e fim (inclusive) da semana/mês/trimestre/ano que contém `ref`."""
+    if kind == "semana":
+        start = ref - dt.timedelta(days=ref.weekday())
+        return start, start + dt.timedelta(days=6)
+    if kind == "mes":
+        return ref.replace(day=1), ref.replace(day=calendar.monthrange(ref.year, ref.month)[1])
+    if kind == "trimestre":
+        m0 = (ref.month - 1) // 3 * 3 + 1
+        return dt.date(ref.year, m0, 1), dt.date(ref.year, m0 + 2, calendar.monthrange(ref.year, m0 + 2)[1])
+    if kind == "ano":
+        return dt.date(ref.year, 1, 1), dt.date(ref.year, 12, 31)
+    raise ValueError(f"Período desconhecido: {kind}")
+
+def months_between(start: dt.date, end: dt.date) -> list:
+    y, m, out = start.year, start.month, []
+    while (y, m) <= (end.year, end.month):
+        out.append((y, m))
+        m += 1
+        if m > 12: m, y = 1, y + 1
+    return out
+
+# ==============================
+# RESUMO
+# ==============================
+def period_summary(conn, company_id: int, start: dt.date, end: dt.date, granularity: str = "mes") -> dict:
+    """Totais por categoria e por período em uma única consulta agrupada.
+
+    As linhas com category NULL são o total do período (emulação de ROLLUP),
+    que também traz os dias distintos com lançamento.
+    """
+    period = (DUCKDB_GRANULARITIES if getattr(conn, "dialect", None) == "duckdb" else GRANULARITIES)[granularity]
+    rows = conn.execute(f"""
+        WITH d AS MATERIALIZED (
+            SELECT e.entry_date, {period} AS period, st.category,
+                   SUM(e.quantity) AS qtd, SUM(e.revenue_cents) AS receita
+            FROM entries e JOIN service_types st ON st.id = e.service_type_id
+            WHERE e.company_id=? AND e.entry_date BETWEEN ? AND ?
+            GROUP BY e.entry_date, st.category)
+        SELECT category, period, SUM(qtd) AS qtd, SUM(receita) AS receita, COUNT(DISTINCT entry_date) AS dias
+        FROM d GROUP BY category, period
+        UNION ALL
+        SELECT NULL, period, SUM(qtd), SUM(receita), COUNT(DISTINCT entry_date)
+        FROM d GROUP BY period
+        ORDER BY 2""", (company_id, start.isoformat(), end.isoformat())).fetchall()
+
+    totals  = {"qtd": {}, "receita": {}, "dias": 0}
+    cents   = {}
+    periods = {}
+    for category, p, qtd, receita, dias in rows:      # receita em centavos inteiros
+        bucket = periods.setdefault(p, {"period": p, "qtd": {}, "receita": {}, "dias": 0})
+        key = category or "total"
+        bucket["qtd"][key]     = float(qtd or 0)
+        bucket["receita"][key] = int(receita or 0) / 100
+        totals["qtd"][key]     = totals["qtd"].get(key, 0.0) + float(qtd or 0)
+        cents[key]             = cents.get(key, 0) + int(receita or 0)
+        if category is None:
+            bucket["dias"]  = int(dias)
+            totals["dias"] += int(dias)
+    totals["receita"] = {k: c / 100 for k, c in cents.items()}
+    return {"start": start, "end": end, "granularity": granularity,
+            "totals": totals, "periods": list(periods.values())}
+
+def prorated_goal(conn, company_id: int, start: dt.date, end: dt.date) -> float:
+    """Meta de receita do intervalo: cada meta mensal proporcional aos dias úteis cobertos."""
+    months = months_between(start, end)
+    goals  = {(y, m): float(v) for y, m, v in conn.execute(
+        "SELECT year, month, goal_value FROM monthly_goals WHERE company_id=? AND year*100+month BETWEEN ? AND ?",
+        (company_id, months[0][0] * 100 + months[0][1], months[-1][0] * 100 + months[-1][1])).fetchall()}
+    if not goals: return 0.0
+    # Dias úteis do mês inteiro e da parte coberta, de uma vez só (busday_count vetorizado)
+    m_start = [dt.date(y, m, 1) for y, m in months]
+    m_end   = [dt.date(y, m, calendar.monthrange(y, m)[1]) for y, m in months]
+    cal     = get_calendar(conn, company_id)
+    uteis   = cal.count_many(m_start, m_end)
+    cobert  = cal.count_many([max(start, d) for d in m_start], [min(end, d) for d in m_end])
+    total   = 0.0
+    for (y, m), n, c in zip(months, uteis, cobert):
+        goal = goals.get((y, m), 0.0)
+        if goal > 0 and n > 0: total += goal * c / n
+    return total
+
+# ==============================
+# VERSÕES DE DADOS (por empresa-mês)
+# ==============================
+def mark_dirty(conn, company_id: int, dates) -> list:
+    """Incrementa a versão dos meses tocados por uma gravação; devolve os 'YYYY-MM' afetados."""
+    yms = sorted({(d.isoformat() if isinstance(d, dt.date) else str(d))[:7] for d in dates})
+    now = dt.datetime.utcnow().isoformat()
+    conn.executemany("""INSERT INTO data_versions(company_id, ym, version, updated_at) VALUES (?,?,1,?)
+                        ON CONFLICT(company_id, ym) DO UPDATE SET version=version+1, updated_at=excluded.updated_at""",
+                     [(company_id, ym, now) for ym in yms])
+    return yms
+
+def period_version(conn, company_id: int, start: dt.date, end: dt.date) -> tuple:
+    """Assinatura barata dos dados do intervalo, para usar como chave de cache."""
+    return tuple((ym, v) for ym, v in conn.execute(
+        "SELECT ym, version FROM data_versions WHERE company_id=? AND ym BETWEEN ? AND ? ORDER BY ym",
+        (company_id, start.isoformat()[:7], end.isoformat()[:7])))
+
+# Cadastros que os relatórios juntam aos lançamentos (nomes, equipe solo, categoria), as regras de meta e o
+# calendário de dias úteis (month_kpis); a primeira coluna ordena as linhas
+DIM_COLUMNS = {"technicians":       "id, name, is_active",
+               "teams":             "id, name, is_active, is_solo",
+               "regions":           "id, name, is_active",
+               "service_types":     "id, name, category, default_unit_cents, is_active",
+               "goal_rules":        "id, team_type, category, region_id, valid_from, valid_to, daily_target, alert_pct",
+               "company_calendar":  "company_id, weekmask, version",
+               "calendar_holidays": "id, day, region_id"}
+
+def dims_stamp(conn, company_id: int) -> str:
+    """Assinatura dos cadastros da empresa: muda com renomeações, regras e feriados, que não tocam em data_versions."""
+    h = hashlib.sha1()
+    for table, cols in DIM_COLUMNS.items():
+        for r in conn.execute(f"SELECT {cols} FROM {table} WHERE company_id=? ORDER BY 1", (company_id,)):
+            h.update(repr(tuple(r)).encode())
+    return h.hexdigest()
+
+# ==============================
+# BUSCA NAS OBSERVAÇÕES (FTS5 — ver entries_fts em core.init_db)
+# ==============================
+HL_START, HL_END = "\x02", "\x03"     # marcadores do trecho; a página escapa o HTML e troca por <mark>
+
+def fts_query(text: str) -> str:
+    """Texto digitado → consulta FTS5 segura: termos (todos), "frase exata" e prefixo com *."""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text or ""):
+        t      = (phrase or word).replace('"', "")
+        prefix = not phrase and t.endswith("*")
+        t      = t.rstrip("*").strip()
+        if t: terms.append(f'"{t}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def search_notes(conn, company_id: int, text: str, start: dt.date, end: dt.date, limit: int = 100):
+    """Lançamentos cuja observação casa com `text`, por relevância (bm25), com trecho destacado."""
+    query = fts_query(text)
+    if not query: return fetch_df(conn, "SELECT NULL AS id WHERE 0")
+    return fetch_df(conn, """
+        SELECT e.id, e.entry_date AS Data, t.name AS Tecnico, st.name AS Servico,
+               e.quantity AS Qtd, e.revenue_cents / 100.0 AS Receita,
+               snippet(entries_fts, 0, ?, ?, '…', 24) AS Trecho
+        FROM entries_fts f
+        CROSS JOIN entries e  ON e.id  = f.rowid      -- CROSS: o MATCH dirige; sem ele o planner varre o índice por data
+        JOIN technicians t    ON t.id  = e.technician_id
+        JOIN service_types st ON st.id = e.service_type_id
+        WHERE entries_fts MATCH ? AND e.company_id=? AND e.entry_date BETWEEN ? AND ?
+        ORDER BY f.rank LIMIT ?""",
+        (HL_START, HL_END, query, company_id, start.isoformat(), end.isoformat(), limit),
+        dtypes={"Data": "date", "Qtd": "float", "Receita": "float"})
+
+# ==============================
+# CUBO — mês × região × equipe × categoria × técnico
+# ==============================
+CUBE_DIMS = {"Mês": "mes", "Região": "regiao", "Equipe": "equipe", "Categoria": "category", "Técnico": "tecnico"}
+
+def cube(conn, company_id: int, start: dt.date, end: dt.date):
+    """Agregação completa do intervalo em uma consulta; fatiar/detalhar é feito em memória."""
+    return fetch_df(conn, """
+        SELECT substr(e.entry_date,1,7) AS mes,
+               COALESCE(r.name, '—') AS regiao, COALESCE(tm.name, '—') AS equipe,
+               st.category, t.name AS tecnico,
+               SUM(e.quantity) AS qtd, SUM(e.revenue_cents) / 100.0 AS receita,
+               COUNT(DISTINCT e.entry_date) AS dias
+        FROM entries e
+        JOIN service_types st ON st.id = e.service_type_id
+        JOIN technicians t    ON t.id  = e.technician_id
+        LEFT JOIN teams tm    ON tm.id = e.team_id
+        LEFT JOIN regions r   ON r.id  = e.region_id
+        WHERE e.company_id=? AND e.entry_date BETWEEN ? AND ?
+        GROUP BY mes, e.region_id, r.name, e.team_id, tm.name, st.category, e.technician_id, t.name""",
+        (company_id, start.isoformat(), end.isoformat()),
+        dtypes={"mes": "category", "regiao": "category", "equipe": "category", "tecnico": "category",
+                "qtd": "float", "receita": "float", "dias": "int"})
+
+# ==============================
+# RANKING E TENDÊNCIA DOS TÉCNICOS
+# ==============================
+def trend_bounds(year: int, month: int, n_months: int) -> tuple:
+    """Datas lidas por technician_trend (com os 2 meses extras) e o índice do primeiro mês exibido."""
+    last  = year * 12 + (month - 1)
+    first = last - n_months + 1
+    y0, m0 = divmod(first - 2, 12)
+    return dt.date(y0, m0 + 1, 1), dt.date(year, month, calendar.monthrange(year, month)[1]), first
+
+def technician_trend(conn, company_id: int, year: int, month: int, n_months: int = 6):
+    """Posição, variação mês a mês e média móvel de 3 meses por técnico, numa só consulta.
+
+    Busca 2 meses extras antes da janela para que LAG/AVG do primeiro mês
+    exibido tenham histórico; meses sem lançamento não contam como vizinhos.
+    """
+    start, end, first = trend_bounds(year, month, n_months)
+    return fetch_df(conn, """
+        WITH base AS (
+            SELECT substr(e.entry_date,1,7) AS mes,
+                   CAST(substr(e.entry_date,1,4) AS INTEGER) * 12 + CAST(substr(e.entry_date,6,2) AS INTEGER) - 1 AS mi,
+                   e.technician_id,
+                   SUM(CASE WHEN st.category='ativacao'   THEN e.quantity ELSE 0 END) AS ativ,
+                   SUM(CASE WHEN st.category='manutencao' THEN e.quantity ELSE 0 END) AS manu,
+                   SUM(e.revenue_cents) / 100.0 AS receita,
+                   COUNT(DISTINCT e.entry_date)   AS dias
+            FROM entries e JOIN service_types st ON st.id = e.service_type_id
+            WHERE e.company_id=? AND e.entry_date BETWEEN ? AND ?
+            GROUP BY mes, mi, e.technician_id),
+        m AS (
+            SELECT *, ativ * 1.0 / dias AS ativ_dia, manu * 1.0 / dias AS manu_dia,
+                   RANK() OVER (PARTITION BY mi ORDER BY receita DESC)                          AS pos_receita,
+                   RANK() OVER (PARTITION BY mi ORDER BY (ativ + manu) * 1.0 / dias DESC)       AS pos_prod
+            FROM base),
+        w AS (
+            SELECT m.*,
+                   CASE WHEN LAG(mi) OVER t = mi - 1 THEN LAG(pos_receita) OVER t - pos_receita END AS dpos_receita,
+                   CASE WHEN LAG(mi) OVER t = mi - 1 THEN LAG(pos_prod)    OVER t - pos_prod    END AS dpos_prod,
+                   CASE WHEN LAG(mi) OVER t = mi - 1 THEN receita  - LAG(receita)  OVER t END AS d_receita,
+                   CASE WHEN LAG(mi) OVER t = mi - 1 THEN ativ_dia - LAG(ativ_dia) OVER t END AS d_ativ_dia,
+                   CASE WHEN LAG(mi) OVER t = mi - 1 THEN manu_dia - LAG(manu_dia) OVER t END AS d_manu_dia,
+                   AVG(ativ_dia) OVER (t RANGE BETWEEN 2 PRECEDING AND CURRENT ROW) AS ativ_dia_3m,
+                   AVG(manu_dia) OVER (t RANGE BETWEEN 2 PRECEDING AND CURRENT ROW) AS manu_dia_3m
+            FROM m
+            WINDOW t AS (PARTITION BY technician_id ORDER BY mi))
+        SELECT w.mes, tc.name AS tecnico, w.technician_id, w.dias, w.ativ, w.manu, w.receita,
+               w.ativ_dia, w.manu_dia, w.ativ_dia_3m, w.manu_dia_3m,
+               w.pos_receita, w.pos_prod, w.dpos_receita, w.dpos_prod,
+               w.d_receita, w.d_ativ_dia, w.d_manu_dia
+        FROM w JOIN technicians tc ON tc.id = w.technician_id
+        WHERE w.mi >= ?
+        ORDER BY w.mi, w.pos_receita""",
+        (company_id, start.isoformat(), end.isoformat(), first),
+        dtypes={"mes": "category", "tecnico": "category", "dias": "int",
+                "pos_receita": "int", "pos_prod": "int"})
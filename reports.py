@@ -0,0 +1,258 @@
+"""Relatório de fechamento do mês: HTML autocontido (PDF opcional) com cache em disco.
+
+O arquivo é endereçado pelo conteúdo das entradas que o determinam: versão dos
+dados do mês (data_versions), cadastros e regras de meta, meta mensal, calendário e versão
+do layout. Pedidos repetidos leem o arquivo pronto; qualquer gravação no mês
+muda a chave e o relatório é refeito no próximo pedido (ou no pré-cálculo da
+manutenção). Pode rodar headless:
+
+    python reports.py --company 1 --month 2026-09 [--pdf] [--out relatorio.html]
+"""
+import sqlite3
+import os
+import html
+import json
+import base64
+import hashlib
+import calendar
+import datetime as dt
+import metrics
+import olap
+from aggregates import current_version
+from kpi import card_html, month_kpis
+from queries import dims_stamp, period_summary, prorated_goal
+
+try:                                   # PDF é opcional: pip install weasyprint
+    import weasyprint
+except ImportError:
+    weasyprint = None
+
+DB_PATH       = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "technoops.db"))
+REPORT_DIR    = os.environ.get("REPORT_DIR", os.path.join(os.path.dirname(DB_PATH), "reports"))
+REPORT_LAYOUT = 1                      # incrementar quando o template mudar (invalida o cache)
+LOGO          = os.path.join(os.path.dirname(__file__), "static", "logo_principal.png")
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho",
+         "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+# ==============================
+# CHAVE (endereço pelo conteúdo)
+# ==============================
+def month_label(ym: str) -> str:
+    return f"{MESES[int(ym[5:]) - 1]}/{ym[:4]}"
+
+def closed_months(conn, company_id: int, today: dt.date = None) -> list:
+    """Meses anteriores ao atual com lançamentos, do mais recente para o mais antigo."""
+    first = (today or dt.date.today()).replace(day=1).isoformat()
+    return [r[0] for r in conn.execute("""SELECT DISTINCT substr(entry_date, 1, 7) FROM entries
+                                          WHERE company_id=? AND entry_date < ? ORDER BY 1 DESC""",
+                                       (company_id, first)).fetchall()]
+
+def report_key(conn, company_id: int, ym: str) -> str:
+    """Hash de tudo que muda o relatório; barato (poucas leituras de uma linha)."""
+    year, month = int(ym[:4]), int(ym[5:])
+    inputs = {
+        "layout":   REPORT_LAYOUT, "company": company_id, "ym": ym,
+        "dados":    current_version(conn, company_id, ym),
+        "cadastros": dims_stamp(conn, company_id),              # nomes dos técnicos e regras de meta
+        "meta":     tuple(conn.execute("SELECT goal_value FROM monthly_goals WHERE company_id=? AND year=? AND month=?",
+                                       (company_id, year, month)).fetchone() or ()),
+        "calendario": tuple(conn.execute("SELECT weekmask, version FROM company_calendar WHERE company_id=?",
+                                         (company_id,)).fetchone() or ()),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+def _path(company_id: int, ym: str, key: str, ext: str) -> str:
+    return os.path.join(REPORT_DIR, str(company_id), f"{ym}-{key}.{ext}")
+
+def _write(path: str, data: bytes):
+    """Grava atomicamente e apaga as versões antigas do mesmo mês/formato."""
+    folder, name = os.path.split(path)
+    os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f: f.write(data)
+    os.replace(tmp, path)
+    prefix, ext = name[:8], os.path.splitext(name)[1]
+    for old in os.listdir(folder):
+        if old.startswith(prefix) and old.endswith(ext) and old != name:
+            try: os.remove(os.path.join(folder, old))
+            except OSError: pass
+
+# ==============================
+# GRÁFICOS (SVG embutido — sem JS nem CDN, imprime igual no PDF)
+# ==============================
+def _svg_daily(por_dia: dict, ym: str, width=900, height=220) -> str:
+    n_days = calendar.monthrange(int(ym[:4]), int(ym[5:]))[1]
+    values = [por_dia.get(f"{ym}-{d:02d}", 0.0) for d in range(1, n_days + 1)]
+    top    = max(values) or 1.0
+    pad, bw = 30, (width - 40) / n_days
+    bars = []
+    for i, v in enumerate(values):
+        h = (height - 2 * pad) * v / top
+        x = 20 + i * bw
+        bars.append(f"<rect x='{x + 2:.1f}' y='{height - pad - h:.1f}' width='{bw - 4:.1f}' height='{h:.1f}' rx='3' fill='#A64D9A'>"
+                    f"<title>{i + 1:02d}: R$ {v:,.2f}</title></rect>"
+                    f"<text x='{x + bw / 2:.1f}' y='{height - pad + 14}' font-size='10' fill='#aaa' text-anchor='middle'>{i + 1}</text>")
+    return (f"<svg viewBox='0 0 {width} {height}' width='100%' xmlns='http://www.w3.org/2000/svg'>"
+            f"<text x='20' y='16' font-size='11' fill='#aaa'>máx. R$ {top:,.0f}/dia</text>{''.join(bars)}</svg>")
+
+def _svg_kpis(perf_data: list, width=900, row=26) -> str:
+    """Barras horizontais de média/dia por técnico (ativação e manutenção) com a meta marcada."""
+    cor    = {"kpi-green": "#2ecc71", "kpi-orange": "#f39c12", "kpi-red": "#e74c3c"}
+    label  = 180
+    top    = max([max(p["MediaAtiv"], p["MetaAtivMedia"], p["MediaManu"], p["MetaManuMedia"]) for p in perf_data] + [1.0])
+    half   = (width - label - 40) / 2
+    height = row * len(perf_data) + 30
+    out = [f"<text x='{label}' y='14' font-size='12' fill='#ccc'>⚡ Ativação média/dia</text>",
+           f"<text x='{label + half + 20}' y='14' font-size='12' fill='#ccc'>🔧 Manutenção média/dia</text>"]
+    for i, p in enumerate(perf_data):
+        y = 24 + i * row
+        out.append(f"<text x='{label - 8}' y='{y + 14}' font-size='12' fill='#fff' text-anchor='end'>{html.escape(p['Tecnico'])}</text>")
+        for x0, media, meta, c in ((label, p["MediaAtiv"], p["MetaAtivMedia"], p["CorAtiv"]),
+                                   (label + half + 20, p["MediaManu"], p["MetaManuMedia"], p["CorManu"])):
+            w, m = half * media / top, half * meta / top
+            out.append(f"<rect x='{x0}' y='{y + 3}' width='{w:.1f}' height='{row - 8}' rx='4' fill='{cor[c]}'>"
+                       f"<title>{media:.2f} (meta {meta:.1f})</title></rect>"
+                       f"<line x1='{x0 + m:.1f}' x2='{x0 + m:.1f}' y1='{y}' y2='{y + row - 2}' stroke='#FFC107' stroke-width='2' stroke-dasharray='4 2'/>"
+                       f"<text x='{x0 + w + 4:.1f}' y='{y + 15}' font-size='11' fill='#ccc'>{media:.2f}</text>")
+    return f"<svg viewBox='0 0 {width} {height}' width='100%' xmlns='http://www.w3.org/2000/svg'>{''.join(out)}</svg>"
+
+# ==============================
+# HTML
+# ==============================
+_CSS = """
+* { box-sizing: border-box; -webkit-print-color-adjust: exact; print-color-adjust: exact; }
+body { background:#0F0F0F; color:#fff; font-family: -apple-system, "Segoe UI", Roboto, Arial, sans-serif; margin:0; padding:28px; }
+header { display:flex; align-items:center; gap:20px; border-bottom:3px solid #F2B233; padding-bottom:14px; margin-bottom:20px; }
+header img { height:64px; }
+h1 { margin:0; font-size:1.6rem; } h2 { color:#F2B233; font-size:1.15rem; margin:28px 0 12px; }
+.sub { color:#aaa; font-size:0.85rem; }
+.grid { display:grid; grid-template-columns:repeat(3, 1fr); gap:12px; }
+.techno-card { background:#1E1E2F; border:1px solid rgba(255,255,255,0.12); border-radius:14px; padding:14px 16px; break-inside:avoid; }
+.techno-kpi { color:#ccc; font-size:0.85rem; } .techno-value { font-size:1.4rem; font-weight:700; margin-top:4px; }
+.cards > div { break-inside:avoid; }
+table { width:100%; border-collapse:collapse; font-size:0.82rem; }
+th, td { padding:6px 8px; border-bottom:1px solid rgba(255,255,255,0.1); text-align:right; }
+th:first-child, td:first-child { text-align:left; } th { color:#F2B233; }
+footer { margin-top:30px; color:#777; font-size:0.75rem; }
+@page { size: A4; margin: 12mm; }
+"""
+
+def _card(label, value) -> str:
+    return f"<div class='techno-card'><div class='techno-kpi'>{label}</div><div class='techno-value'>{value}</div></div>"
+
+def _logo() -> str:
+    if not os.path.exists(LOGO): return ""
+    with open(LOGO, "rb") as f:
+        return f"<img src='data:image/png;base64,{base64.b64encode(f.read()).decode()}' alt=''>"
+
+def build_html(conn, company_id: int, ym: str, key: str = "") -> str:
+    """Resumo do mês (cards), receita por dia, cards e gráfico de KPIs por técnico e tabela detalhada."""
+    year, month = int(ym[:4]), int(ym[5:])
+    start, end  = dt.date(year, month, 1), dt.date(year, month, calendar.monthrange(year, month)[1])
+    company     = conn.execute("SELECT name FROM companies WHERE id=?", (company_id,)).fetchone()
+    olap_conn   = olap.reader(conn, company_id, start, end)     # espelho DuckDB, se ligado e em dia
+    res         = period_summary(olap_conn, company_id, start, end, "dia")
+    qtd, rec    = res["totals"]["qtd"], res["totals"]["receita"]
+    n_dias      = res["totals"]["dias"]
+    goal        = prorated_goal(conn, company_id, start, end)
+    pct         = f"{rec.get('total', 0.0) / goal * 100:.0f}%" if goal > 0 else "—"
+    por_dia     = {p["period"]: p["receita"].get("total", 0.0) for p in res["periods"]}
+    perf_data   = [dict(p, Tecnico=html.escape(p["Tecnico"])) for p in month_kpis(conn, company_id, ym)]   # metas do SQLite, as mesmas de report_key
+
+    cards = [_card("Total ativações", f"{qtd.get('ativacao', 0.0):.0f}"),
+             _card("Total manutenções", f"{qtd.get('manutencao', 0.0):.0f}"),
+             _card("Total serviços", f"{qtd.get('total', 0.0):.0f}"),
+             _card("Receita ativações", f"R$ {rec.get('ativacao', 0.0):,.2f}"),
+             _card("Receita manutenções", f"R$ {rec.get('manutencao', 0.0):,.2f}"),
+             _card("Receita bruta do mês", f"R$ {rec.get('total', 0.0):,.2f}"),
+             _card("Meta de receita", f"R$ {goal:,.2f}"),
+             _card("% meta atingida", pct),
+             _card("Receita média diária", f"R$ {(rec.get('total', 0.0) / n_dias if n_dias else 0.0):,.2f}")]
+    linhas = "".join(
+        f"<tr><td>{p['Tecnico']}</td><td>{p['SemAtiv']} {p['MediaAtiv']:.2f} / {p['MetaAtivMedia']:.1f}</td>"
+        f"<td>{p['PctAtiv']:.0f}%</td><td>{p['SemManu']} {p['MediaManu']:.2f} / {p['MetaManuMedia']:.1f}</td>"
+        f"<td>{p['PctManu']:.0f}%</td><td>{p['DiasTrabalh']}</td><td>R$ {p['ReceitaGerada']:,.2f}</td></tr>"
+        for p in perf_data)
+    tecnicos = (f"<h2>🚦 Desempenho por técnico</h2><div class='grid cards'>{''.join(card_html(p) for p in perf_data)}</div>"
+                f"<h2>📊 Comparativo — média/dia × meta</h2>{_svg_kpis(perf_data)}"
+                f"<h2>📋 Tabela detalhada</h2><table><tr><th>Técnico</th><th>Ativ/dia (meta)</th><th>% Ativ</th>"
+                f"<th>Manu/dia (meta)</th><th>% Manu</th><th>Dias</th><th>Receita</th></tr>{linhas}</table>"
+                ) if perf_data else "<h2>Técnicos</h2><p class='sub'>Sem lançamentos no mês.</p>"
+    nome = html.escape(company["name"] if company else str(company_id))
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8">
+<title>{nome} — Relatório {month_label(ym)}</title><style>{_CSS}</style></head>
+<body>
+<header>{_logo()}<div><h1>{nome} — Relatório de {month_label(ym)}</h1>
+<div class="sub">{start:%d/%m/%Y} a {end:%d/%m/%Y} • {n_dias} dias com lançamento</div></div></header>
+<h2>Resumo do mês</h2><div class="grid">{''.join(cards)}</div>
+<h2>📈 Receita por dia</h2>{_svg_daily(por_dia, ym)}
+{tecnicos}
+<footer>Gerado em {dt.datetime.now():%d/%m/%Y %H:%M} • TechnoOps • {key}</footer>
+</body></html>"""
+
+def build_pdf(html_text: str) -> bytes:
+    if weasyprint is None:
+        raise RuntimeError("PDF indisponível: instale o pacote weasyprint")
+    return weasyprint.HTML(string=html_text).write_pdf()
+
+# ==============================
+# CACHE
+# ==============================
+def cached_report(conn, company_id: int, ym: str, fmt: str = "html"):
+    """Caminho do relatório se já estiver pronto para a versão atual dos dados; senão None."""
+    path = _path(company_id, ym, report_key(conn, company_id, ym), fmt)
+    return path if os.path.exists(path) else None
+
+def get_report(conn, company_id: int, ym: str, fmt: str = "html") -> bytes:
+    """Bytes do relatório (html ou pdf); gera e grava só se a chave mudou."""
+    key  = report_key(conn, company_id, ym)
+    path = _path(company_id, ym, key, fmt)
+    hit  = os.path.exists(path)
+    metrics.cache_lookup("relatorios", hit)
+    if hit:
+        with open(path, "rb") as f: return f.read()
+    html_path = _path(company_id, ym, key, "html")
+    if fmt == "pdf" and os.path.exists(html_path):
+        with open(html_path, "rb") as f: text = f.read().decode()
+    else:
+        text = build_html(conn, company_id, ym, key)
+        if fmt == "html" or not os.path.exists(html_path): _write(html_path, text.encode())
+    if fmt == "html": return text.encode()
+    data = build_pdf(text)
+    _write(path, data)
+    return data
+
+def prebuild(db_path=DB_PATH, today: dt.date = None) -> int:
+    """Gera o HTML do último mês fechado de cada empresa, se ainda não estiver no cache."""
+    conn  = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    built = 0
+    try:
+        for (company_id,) in conn.execute("SELECT id FROM companies").fetchall():
+            months = closed_months(conn, company_id, today)
+            if months and not cached_report(conn, company_id, months[0]):
+                get_report(conn, company_id, months[0]); built += 1
+    finally:
+        conn.close()
+    return built
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Relatório mensal em HTML/PDF")
+    ap.add_argument("--company", type=int, default=1)
+    ap.add_argument("--month", help="AAAA-MM (padrão: último mês fechado)")
+    ap.add_argument("--pdf", action="store_true")
+    ap.add_argument("--out", help="copiar para este arquivo")
+    args = ap.parse_args()
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    ym   = args.month or (closed_months(conn, args.company) or [None])[0]
+    if not ym: raise SystemExit("Nenhum mês fechado com lançamentos.")
+    fmt  = "pdf" if args.pdf else "html"
+    data = get_report(conn, args.company, ym, fmt)
+    out  = args.out or _path(args.company, ym, report_key(conn, args.company, ym), fmt)
+    if args.out:
+        with open(out, "wb") as f: f.write(data)
+    print(f"{month_label(ym)}: {out} ({len(data) / 1024:.0f} KB)")
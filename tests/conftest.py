@@ -0,0 +1,68 @@
+"""Fixtures dos testes: banco novo por teste (esquema e carga inicial de core.init_db) e lançamentos de exemplo."""
+import os
+import sys
+import sqlite3
+import datetime as dt
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import core  # noqa: E402
+import goals  # noqa: E402
+import workcal  # noqa: E402
+
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory):
+    """init_db uma vez só (o hash da senha do admin é lento); cada teste recebe uma cópia."""
+    path = str(tmp_path_factory.mktemp("modelo") / "modelo.db")
+    mp = pytest.MonkeyPatch()
+    mp.setattr(core, "DB_PATH", path)
+    try: core.init_db()
+    finally: mp.undo()
+    return path
+
+@pytest.fixture
+def db_path(template_db, tmp_path, monkeypatch):
+    path = str(tmp_path / "t.db")
+    src, dst = sqlite3.connect(template_db), sqlite3.connect(path)
+    try: src.backup(dst)
+    finally: dst.close(); src.close()
+    monkeypatch.setattr(core, "DB_PATH", path)
+    # Caches por empresa do processo: cada teste tem um banco novo com a mesma empresa 1
+    monkeypatch.setattr(workcal, "_CACHE", {})
+    monkeypatch.setattr(goals, "_CACHE", {})
+    return path
+
+@pytest.fixture
+def conn(db_path):
+    c = core.get_conn()
+    yield c
+    c.close()
+
+@pytest.fixture
+def company(conn):
+    """Ids da empresa semeada: empresa, serviços por categoria, região e equipe solo."""
+    cid = conn.execute("SELECT id FROM companies").fetchone()[0]
+    svc = dict(conn.execute("SELECT category, id FROM service_types WHERE company_id=?", (cid,)).fetchall())
+    return {"id": cid, "ativacao": svc["ativacao"], "manutencao": svc["manutencao"],
+            "regiao": conn.execute("SELECT id FROM regions WHERE company_id=?", (cid,)).fetchone()[0],
+            "solo": conn.execute("SELECT id FROM teams WHERE company_id=? AND is_solo=1", (cid,)).fetchone()[0]}
+
+@pytest.fixture
+def add_tech(conn, company):
+    def add(name):
+        cur = conn.execute("INSERT INTO technicians(company_id, name, is_active) VALUES (?,?,1)", (company["id"], name))
+        conn.commit()
+        return cur.lastrowid
+    return add
+
+@pytest.fixture
+def add_entry(conn, company):
+    """Insere um lançamento direto no banco (sem versões nem estatísticas) e devolve o id."""
+    def add(day, tech, svc, qty=1.0, unit_cents=10000, team=None, region=None, notes=None):
+        cur = conn.execute("""INSERT INTO entries(company_id, entry_date, technician_id, team_id, region_id,
+                                  service_type_id, quantity, unit_cents, notes, created_at) VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                           (company["id"], str(day), tech, team, region, svc, qty, unit_cents, notes,
+                            dt.datetime.utcnow().isoformat()))
+        conn.commit()
+        return cur.lastrowid
+    return add
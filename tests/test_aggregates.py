@@ -0,0 +1,63 @@
+import time
+import json
+import pytest
+from aggregates import RecomputeWorker, get_aggregate, invalidate, month_payload
+from queries import mark_dirty
+
+@pytest.fixture
+def worker(db_path):
+    workers = []
+    def start(debounce_s, max_wait_s):
+        w = RecomputeWorker(db_path, debounce_s=debounce_s, max_wait_s=max_wait_s)
+        w.start(); workers.append(w)
+        return w
+    yield start
+    for w in workers: w.stop(); w.join(2)
+
+def _until(cond, timeout=3.0):
+    end = time.monotonic() + timeout
+    while not cond() and time.monotonic() < end: time.sleep(0.01)
+    return cond()
+
+def _cached(conn, company, ym, kind="dashboard"):
+    row = conn.execute("SELECT version, payload FROM agg_cache WHERE company_id=? AND ym=? AND kind=?",
+                       (company["id"], ym, kind)).fetchone()
+    return row and (row[0], json.loads(row[1]))
+
+def test_version_bump_is_a_miss(conn, company, add_tech, add_entry):
+    a, ym = add_tech("Ana"), "2026-05"
+    add_entry("2026-05-04", a, company["ativacao"], 2, 21000)
+    first = get_aggregate(conn, company["id"], ym, "dashboard")
+    assert _cached(conn, company, ym) == (0, first)
+    add_entry("2026-05-05", a, company["ativacao"], 1, 21000)         # sem versão nova: o cache ainda vale
+    assert get_aggregate(conn, company["id"], ym, "dashboard") == first
+    mark_dirty(conn, company["id"], ["2026-05-05"]); conn.commit()
+    misses = []
+    fresh = get_aggregate(conn, company["id"], ym, "dashboard", misses)
+    assert fresh["qtd"] == 3 and misses == [ym] and _cached(conn, company, ym)[0] == 0   # somente leitura: não grava
+    assert get_aggregate(conn, company["id"], ym, "dashboard") == fresh == month_payload(conn, company["id"], ym)
+    assert _cached(conn, company, ym)[0] == 1
+    invalidate(conn, company["id"], "dashboard")
+    assert _cached(conn, company, ym) is None
+
+def test_repeated_notices_recompute_once(conn, company, add_tech, add_entry, worker):
+    a, cid = add_tech("Ana"), company["id"]
+    w = worker(debounce_s=0.3, max_wait_s=5)
+    for d in range(1, 11):
+        add_entry(f"2026-05-{d:02d}", a, company["ativacao"], 1, 21000)
+        w.notify(cid, mark_dirty(conn, cid, [f"2026-05-{d:02d}"])); conn.commit()
+        time.sleep(0.02)
+    assert w.processed == 0 and w.pending() == [(cid, "2026-05")]
+    assert _until(lambda: w.processed == 1)
+    time.sleep(0.3)
+    assert (w.processed, w.notified, w.last_error) == (1, 10, None)
+    assert _cached(conn, company, "2026-05") == (10, month_payload(conn, cid, "2026-05"))
+
+def test_max_wait_bounds_a_busy_month(conn, company, worker):
+    w = worker(debounce_s=0.2, max_wait_s=0.3)
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < 0.8:                                 # avisos mais rápidos que o debounce
+        w.notify(company["id"], ["2026-05"]); time.sleep(0.05)
+    assert w.processed >= 2
+    w.notify(company["id"], ["2026-06", "2026-05"])
+    assert _until(lambda: not w.pending())
@@ -0,0 +1,68 @@
+import statistics
+import pytest
+import anomaly
+
+def _fold(xs):
+    s = (0, 0.0, 0.0)
+    for x in xs: s = anomaly._add(*s, x)
+    return s
+
+def test_welford_matches_statistics():
+    xs = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0]
+    n, mean, m2 = _fold(xs)
+    assert n == len(xs) and mean == pytest.approx(statistics.fmean(xs)) and m2 / (n - 1) == pytest.approx(statistics.variance(xs))
+
+def test_welford_keeps_precision_with_large_values():
+    xs = [1e9 + (i % 3) for i in range(1000)]
+    n, _, m2 = _fold(xs)
+    assert m2 / (n - 1) == pytest.approx(statistics.variance(xs), rel=1e-6)
+
+def test_remove_undoes_add():
+    xs = [10.0, 12.0, 11.0, 30.0, 9.0]
+    n, mean, m2 = anomaly._remove(*_fold(xs), 30.0)
+    ref = _fold([10.0, 12.0, 11.0, 9.0])
+    assert n == ref[0] and mean == pytest.approx(ref[1]) and m2 == pytest.approx(ref[2])
+    assert anomaly._remove(1, 5.0, 0.0, 5.0) == (0, 0.0, 0.0)
+
+def _record(conn, company, tech, qty, cents, add_entry):
+    eid = add_entry("2026-05-04", tech, company["ativacao"], qty, cents)
+    flags = anomaly.record(conn, company["id"], eid, tech, company["ativacao"], qty, cents / 100)
+    conn.commit()
+    return eid, flags
+
+def _stats(conn):
+    return {tuple(r)[:3]: tuple(r)[3:] for r in conn.execute(
+        "SELECT company_id, technician_id, service_type_id, n, mean_q, m2_q, mean_v, m2_v FROM entry_stats ORDER BY 1, 2, 3")}
+
+def test_outlier_is_flagged_and_not_counted(conn, company, add_tech, add_entry):
+    tech = add_tech("Ana")
+    for q in [1, 2, 1, 2, 1, 2, 1, 2, 1, 2]:
+        _, flags = _record(conn, company, tech, q, 21000, add_entry)
+        assert flags == []
+    eid, flags = _record(conn, company, tech, 40, 21000, add_entry)
+    assert [f[0] for f in flags] == ["quantity"]
+    assert conn.execute("SELECT status FROM entry_flags WHERE entry_id=?", (eid,)).fetchone()[0] == "pendente"
+    assert list(_stats(conn).values())[0][0] == 10
+    anomaly.accept(conn, company["id"], eid, "admin")
+    assert list(_stats(conn).values())[0][0] == 11
+
+def test_rebuild_matches_incremental_state(conn, company, add_tech, add_entry):
+    a, b = add_tech("Ana"), add_tech("Bruno")
+    ids = []
+    for i in range(12):
+        for tech in (a, b):
+            eid, _ = _record(conn, company, tech, 1 + i % 3, 21000 + 50 * (i % 2), add_entry)
+            ids.append((eid, tech, 1 + i % 3, 21000 + 50 * (i % 2)))
+    eid, tech, q, c = ids[5]                               # edição: tira o valor antigo antes de gravar o novo
+    anomaly.forget(conn, company["id"], eid, tech, company["ativacao"], q, c / 100)
+    conn.execute("DELETE FROM entries WHERE id=?", (eid,))
+    conn.commit()
+    incremental = _stats(conn)
+    anomaly.rebuild(conn, company["id"])
+    rebuilt = _stats(conn)
+    assert rebuilt.keys() == incremental.keys()
+    for k in rebuilt:
+        assert rebuilt[k][0] == incremental[k][0]
+        assert rebuilt[k][1:] == pytest.approx(incremental[k][1:], abs=1e-9)
+    anomaly.rebuild(conn, company["id"], [(a, company["ativacao"])])
+    assert _stats(conn) == rebuilt
@@ -0,0 +1,140 @@
+import json
+import threading
+import datetime as dt
+import http.client
+import pytest
+import api
+from hotstore import HotStore, open_month
+from kpi import month_kpis
+
+@pytest.fixture
+def store(db_path, monkeypatch):
+    """Mês em memória do banco do teste; notify_dirty só aplica a gravação nele (sem o worker)."""
+    s = HotStore(db_path)
+    monkeypatch.setattr(api, "_local", threading.local())
+    monkeypatch.setattr(api, "get_hot_store", lambda: s)
+    monkeypatch.setattr(api, "notify_dirty", lambda cid, yms, change=None: s.apply(change))
+    yield s
+    if getattr(api._local, "conn", None): api._local.conn.close()
+    s.conn.close()
+
+@pytest.fixture
+def token(conn, company):
+    """Usuário com token da API (hash de senha fictício: o login é testado à parte)."""
+    def make(username, role="admin", hours=1):
+        now = dt.datetime.utcnow()
+        conn.execute("INSERT OR IGNORE INTO users(company_id, username, password_hash, role, is_active, created_at) "
+                     "VALUES (?,?,'-',?,1,?)", (company["id"], username, role, now.isoformat()))
+        tok = f"tok-{username}-{hours}"
+        conn.execute("INSERT INTO api_tokens(token_hash, company_id, username, created_at, expires_at) VALUES (?,?,?,?,?)",
+                     (api._token_hash(tok), company["id"], username, now.isoformat(),
+                      (now + dt.timedelta(hours=hours)).isoformat()))
+        conn.commit()
+        return {"authorization": f"Bearer {tok}"}
+    return make
+
+def call(method, path, headers=None, query=None, body=None, raw=None):
+    if body is not None: raw = json.dumps(body).encode()
+    return api.handle(api.ROUTES[(method, path)], path, headers or {}, query or {}, raw or b"")
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+def test_login_and_logout(store):
+    status, payload, _ = call("POST", "/api/v1/token", body={"empresa": "Techno Mais", "usuario": "admin", "senha": "admin123"})
+    assert status == 201
+    auth = {"authorization": f"Bearer {payload['token']}"}
+    assert call("GET", "/api/v1/totais", auth)[0] == 200
+    assert call("DELETE", "/api/v1/token", auth)[0] == 200
+    assert call("GET", "/api/v1/totais", auth)[0] == 401
+    assert call("POST", "/api/v1/token", body={"empresa": "Techno Mais", "usuario": "admin", "senha": "x"})[0] == 401
+
+def test_unknown_expired_and_inactive_tokens(conn, company, store, token):
+    assert call("GET", "/api/v1/totais")[0] == 401
+    assert call("GET", "/api/v1/totais", {"authorization": "Bearer nada"})[0] == 401
+    assert call("GET", "/api/v1/totais", token("velho", hours=-1))[0] == 401
+    auth = token("ops", "operator")
+    assert call("GET", "/api/v1/totais", auth)[0] == 200
+    conn.execute("UPDATE users SET is_active=0 WHERE username='ops'"); conn.commit()
+    assert call("GET", "/api/v1/totais", auth)[0] == 401
+
+def test_technician_sees_only_own_kpis(conn, company, add_tech, add_entry, store, token):
+    a, b = add_tech("Ana"), add_tech("Bruno")
+    for day in ("2026-05-04", f"{open_month()}-01"):
+        add_entry(day, a, company["ativacao"], 3, 21000, team=company["solo"])
+        add_entry(day, b, company["manutencao"], 5, 13500)
+    auth = token("ana", "technician")
+    for ym in ("2026-05", open_month()):
+        status, payload, _ = call("GET", "/api/v1/kpis", auth, {"mes": ym})
+        assert status == 200 and [p["Tecnico"] for p in payload["tecnicos"]] == ["Ana"]
+        assert "ReceitaGerada" not in payload["tecnicos"][0]
+        full = month_kpis(conn, company["id"], ym, "Ana")[0]
+        assert payload["tecnicos"][0] == {k: v for k, v in full.items() if k != "ReceitaGerada"}
+    assert call("GET", "/api/v1/totais", auth)[0] == 403
+    assert call("GET", "/api/v1/kpis", token("bia", "technician"))[0] == 404
+    status, payload, _ = call("GET", "/api/v1/kpis", token("chefe"), {"mes": "2026-05"})
+    assert [p["Tecnico"] for p in payload["tecnicos"]] == ["Bruno", "Ana"] and "ReceitaGerada" in payload["tecnicos"][0]
+    assert call("GET", "/api/v1/kpis", auth, {"mes": "2026-13"})[0] == 400
+
+def test_rejected_batch_writes_nothing(conn, company, add_tech, store, token):
+    add_tech("Ana")
+    auth, before = token("ops", "operator"), _count(conn)
+    good = {"tecnico": "Ana", "servico": "Ativação", "quantidade": 2, "data": "2026-05-04"}
+    status, payload, _ = call("POST", "/api/v1/lancamentos", auth, body={"lancamentos": [
+        good, {"tecnico": "Zé", "servico": "Ativação"}, dict(good, quantidade=-1), dict(good, data="ontem"), "x"]})
+    assert status == 422 and [d["indice"] for d in payload["detalhes"]] == [1, 2, 3, 4]
+    assert _count(conn) == before
+    assert conn.execute("SELECT COUNT(*) FROM data_versions").fetchone()[0] == 0
+    assert call("POST", "/api/v1/lancamentos", token("ver", "viewer"), body={"lancamentos": [good]})[0] == 403
+    status, payload, _ = call("POST", "/api/v1/lancamentos", auth, body={"lancamentos": [good, dict(good, valor_unitario=210.15)]})
+    assert status == 201 and len(payload["ids"]) == 2 and _count(conn) == before + 2
+    assert conn.execute("SELECT unit_cents FROM entries WHERE id=?", (payload["ids"][1],)).fetchone()[0] == 21015
+
+@pytest.mark.parametrize("raw, status", [(b'{"lancamentos": [{"tecnico": "Ana", "servico": "Ativa\\u00e7\\u00e3o", "quantidade": NaN}]}', 400),
+                                         (b'{"lancamentos": [{"tecnico": "Ana", "servico": "Ativa\\u00e7\\u00e3o", "quantidade": Infinity}]}', 400),
+                                         (b'{"lancamentos": [{"tecnico": "Ana", "servico": "Ativa\\u00e7\\u00e3o", "quantidade": 1e999}]}', 422),
+                                         (b'{"lancamentos": [{"tecnico": "Ana", "servico": "Ativa\\u00e7\\u00e3o", "quantidade": "nan"}]}', 422),
+                                         (b'{"lancamentos": ', 400)])
+def test_non_finite_numbers_are_rejected(conn, add_tech, store, token, raw, status):
+    add_tech("Ana")
+    before = _count(conn)
+    assert call("POST", "/api/v1/lancamentos", token("ops", "operator"), raw=raw)[0] == status
+    assert _count(conn) == before
+
+def test_etag_changes_after_write(conn, add_tech, store, token):
+    add_tech("Ana")
+    auth  = token("ops", "operator")
+    today = {"data": dt.date.today().isoformat()}
+    status, first, etag = call("GET", "/api/v1/totais", auth, today)
+    assert status == 200 and etag
+    assert call("GET", "/api/v1/totais", dict(auth, **{"if-none-match": etag}), today) == (304, None, etag)
+    assert call("GET", "/api/v1/totais", dict(auth, **{"if-none-match": f'"x", W/{etag}'}), today)[0] == 304
+    assert call("POST", "/api/v1/lancamentos", auth, body={"lancamentos": [
+        {"tecnico": "Ana", "servico": "Ativação", "quantidade": 2, "data": today["data"]}]})[0] == 201
+    status, second, new = call("GET", "/api/v1/totais", dict(auth, **{"if-none-match": etag}), today)
+    assert status == 200 and new != etag
+    assert second["dia"]["qtd"] == first["dia"]["qtd"] + 2
+    assert call("GET", "/api/v1/totais", token("chefe"), today)[2] == new   # totais: mesmo ETag para a empresa toda
+    kpi_etag = call("GET", "/api/v1/kpis", auth)[2]
+    assert call("GET", "/api/v1/kpis", token("ana", "technician"))[2] != kpi_etag       # kpis: escopo do usuário
+
+def test_http_server_routes(store, token):
+    server = api.ApiServer(port=0, workers=1)
+    server.start(); server.ready.wait(5)
+    try:
+        http_conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        for method, path, status in [("GET", "/nada", 404), ("PUT", "/api/v1/token", 405), ("GET", "/api/v1/totais", 401)]:
+            http_conn.request(method, path)
+            resp = http_conn.getresponse(); resp.read()
+            assert resp.status == status
+        assert resp.getheader("WWW-Authenticate") == "Bearer"
+        http_conn.request("GET", "/api/v1/totais", headers={"Authorization": token("ops", "operator")["authorization"]})
+        resp = http_conn.getresponse(); body = json.loads(resp.read())
+        assert resp.status == 200 and resp.getheader("ETag") and "mes" in body
+        http_conn.request("GET", "/api/v1/totais", headers={"Authorization": token("ops", "operator", 2)["authorization"],
+                                                             "If-None-Match": resp.getheader("ETag")})
+        resp = http_conn.getresponse()
+        assert resp.status == 304 and resp.read() == b""
+        http_conn.close()
+    finally:
+        server.stop()
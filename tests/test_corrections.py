@@ -0,0 +1,60 @@
+import datetime as dt
+import pytest
+from aggregates import current_version
+from corrections import Correction, apply, preview
+
+START, END = dt.date(2026, 3, 1), dt.date(2026, 4, 30)
+
+@pytest.fixture
+def sample(company, add_tech, add_entry):
+    a, b = add_tech("Ana"), add_tech("Bruno")
+    ativ, manu = company["ativacao"], company["manutencao"]
+    for day, tech, svc, qty, cents in [("2026-02-27", a, ativ, 1, 20000),                # fora do intervalo
+                                       ("2026-03-02", a, ativ, 2, 20000), ("2026-03-02", b, ativ, 1.5, 20000),
+                                       ("2026-03-20", a, manu, 3, 13500), ("2026-04-01", a, ativ, 1, 21000),
+                                       ("2026-04-15", b, ativ, 1, 20000), ("2026-04-30", a, ativ, 0.5, 20000)]:
+        add_entry(day, tech, svc, qty, cents)
+    return a, b
+
+def _revenue(conn, company):
+    return conn.execute("SELECT SUM(revenue_cents) FROM entries WHERE company_id=?", (company["id"],)).fetchone()[0] / 100
+
+def test_price_preview_matches_apply(conn, company, sample):
+    c = Correction("preco", START, END, service_id=company["ativacao"], unit_cents=22000, only_cents=20000)
+    before = _revenue(conn, company)
+    prev = preview(conn, company["id"], c)
+    assert prev["linhas"] == 4 and len(prev["amostra"]) == 4
+    assert prev["depois"] - prev["antes"] == pytest.approx((2 + 1.5 + 1 + 0.5) * 20)
+    done = apply(conn, company["id"], c, chunk=3)
+    assert (done["linhas"], done["lotes"]) == (4, 2)
+    assert (done["antes"], done["depois"]) == pytest.approx((prev["antes"], prev["depois"]))
+    assert {ym: (m["linhas"], m["antes"], m["depois"]) for ym, m in done["por_mes"].items()} == \
+           {m["Mês"]: (m["Lançamentos"], m["Receita antes"], m["Receita depois"]) for m in prev["por_mes"]}
+    assert _revenue(conn, company) == pytest.approx(before + done["depois"] - done["antes"])
+    assert preview(conn, company["id"], c)["linhas"] == 0                    # já corrigido
+    assert (current_version(conn, company["id"], "2026-03"), current_version(conn, company["id"], "2026-04"),
+            current_version(conn, company["id"], "2026-02")) == (1, 2, 0)   # um incremento por lote que tocou o mês
+
+def test_move_changes_owner_and_keeps_revenue(conn, company, sample):
+    a, b = sample
+    c = Correction("mover", START, END, tech_id=a, new_tech_id=b, new_team_id=company["solo"])
+    before = _revenue(conn, company)
+    prev = preview(conn, company["id"], c)
+    owners = {r["Técnico"]: r for r in prev["por_dono"]["Técnico"]}
+    assert owners["Ana"]["Lançamentos (saldo)"] == -4 and owners["Bruno"]["Lançamentos (saldo)"] == 4
+    assert owners["Bruno"]["Variação de receita"] == -owners["Ana"]["Variação de receita"] == prev["antes"]
+    notified = []
+    done = apply(conn, company["id"], c, chunk=2, notify=lambda cid, yms, ch: notified.append((yms, sorted(ch.rows))))
+    assert done["linhas"] == 4 and done["antes"] == done["depois"] == prev["antes"]
+    assert [yms for yms, _ in notified] == [["2026-03"], ["2026-04"]]
+    assert _revenue(conn, company) == before
+    assert conn.execute("""SELECT COUNT(*) FROM entries WHERE technician_id=? AND entry_date BETWEEN ? AND ?""",
+                        (a, START.isoformat(), END.isoformat())).fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM entries WHERE team_id=?", (company["solo"],)).fetchone()[0] == 4
+
+@pytest.mark.parametrize("kwargs", [dict(kind="preco", service_id=None, unit_cents=100),
+                                    dict(kind="mover", new_tech_id=1), dict(kind="mover", tech_id=1),
+                                    dict(kind="outro")])
+def test_invalid_corrections(conn, company, kwargs):
+    with pytest.raises(ValueError): preview(conn, company["id"], Correction(start=START, end=END, **kwargs))
+    with pytest.raises(ValueError): Correction("preco", END, START, service_id=1, unit_cents=1).validate()
@@ -0,0 +1,62 @@
+import datetime as dt
+import numpy as np
+import pytest
+from core import get_forecaster
+from forecast import Forecaster, fit
+from views.admin import calendar_changed
+from workcal import BusinessCalendar
+
+@pytest.fixture
+def history(conn, company, add_tech):
+    """Seis meses: 2–3 técnicos por dia útil, R$ 300 por técnico mais um pouco de ruído; nada aos domingos."""
+    techs = [add_tech(n) for n in ("Ana", "Bruno", "Carla")]
+    cal, rng, rows = BusinessCalendar(), np.random.default_rng(7), []
+    day = dt.date(2026, 1, 1)
+    while day < dt.date(2026, 7, 1):
+        if cal.is_workday(day):
+            for t in techs[:2 + day.day % 2]:
+                rows.append((company["id"], day.isoformat(), t, company["ativacao"], 1.0,
+                             30000 + int(rng.integers(-500, 500)), "x"))
+        day += dt.timedelta(days=1)
+    conn.executemany("""INSERT INTO entries(company_id, entry_date, technician_id, service_type_id, quantity,
+                            unit_cents, created_at) VALUES (?,?,?,?,?,?,?)""", rows)
+    conn.commit()
+
+def test_fit_explains_history_and_band_narrows(conn, company, history):
+    f = fit(conn, company["id"], "2026-07")
+    assert f.ym == "2026-07" and f.days == 181 and f.r2 > 0.9
+    assert len(f.rest) == len(f.band) == 32 and f.rest[-1] == 0 and f.band[-1] == pytest.approx(0)
+    assert np.all(np.diff(f.rest) <= 1e-9) and np.all(np.diff(f.band) <= 1e-9)
+    # Julho/2026: 26 dias úteis com ~2,5 técnicos a R$ 300
+    assert f.rest[0] == pytest.approx(26 * 2.5 * 300, rel=0.1)
+
+def test_project_brackets_the_projection(conn, company, history):
+    f = fit(conn, company["id"], "2026-07")
+    p = f.project(5000.0, 10)
+    assert p["projecao"] == pytest.approx(5000.0 + f.rest[10])
+    assert p["min"] <= p["projecao"] <= p["max"]
+    assert f.project(9000.0, 31) == {"projecao": 9000.0, "min": 9000.0, "max": 9000.0}
+
+def test_without_history_returns_none(conn, company, add_tech, add_entry):
+    assert fit(conn, company["id"], "2026-07") is None
+    add_entry("2026-07-02", add_tech("Ana"), company["ativacao"])       # só o mês aberto: não é histórico
+    assert fit(conn, company["id"], "2026-07") is None
+    assert fit(conn, company["id"], "2026-08").days == 31
+
+def test_forecaster_refits_on_month_change(conn, company, history):
+    fc = Forecaster()
+    first = fc.get(conn, company["id"], dt.date(2026, 7, 3))
+    assert fc.get(conn, company["id"], dt.date(2026, 7, 20)) is first and fc.refits == 1
+    assert fc.get(conn, company["id"], dt.date(2026, 8, 1)).ym == "2026-08" and fc.refits == 2
+    fc.forget(company["id"])
+    fc.get(conn, company["id"], dt.date(2026, 8, 2))
+    assert fc.refits == 3
+
+def test_calendar_edit_discards_the_fit(conn, company, history):
+    fc = get_forecaster()
+    fc.forget(company["id"])
+    before = fc.get(conn, company["id"], dt.date(2026, 7, 3))
+    calendar_changed(conn, company["id"], "1111100")                     # sábado deixa de ser útil
+    after = fc.get(conn, company["id"], dt.date(2026, 7, 3))
+    assert after is not before and after.rest[0] < before.rest[0]
+    fc.forget(company["id"])
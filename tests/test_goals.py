@@ -0,0 +1,86 @@
+import datetime as dt
+import numpy as np
+import pytest
+from aggregates import get_aggregate
+from goals import DEFAULT_ALERT_PCT, DEFAULT_TARGETS, GoalRules, get_rules
+from kpi import month_kpis
+from views.admin import calendar_changed
+from workcal import bump_version
+
+def _days(*iso):
+    return np.array(iso, dtype="datetime64[D]").astype(np.int64)
+
+RULES = GoalRules([
+    ("*",      "ativacao", None, "2026-01-01", None,         2.0, 0.8),   # genérica
+    ("solo",   "ativacao", None, "2026-01-01", None,         3.0, 0.8),   # tipo de equipe
+    ("solo",   "ativacao", None, "2026-03-15", None,         3.5, 0.9),   # vigência mais recente
+    ("*",      "ativacao", 7,    "2026-01-01", "2026-06-30", 5.0, 0.7),   # região (mais específica)
+])
+
+def test_most_specific_rule_wins():
+    meta, pct = RULES.evaluate("ativacao", _days("2026-02-10", "2026-02-10", "2026-02-10"), [1, 0, 1], [-1, -1, 7])
+    assert meta.tolist() == [3.0, 2.0, 5.0]
+    assert pct.tolist() == [0.8, 0.8, 0.7]
+
+def test_newer_rule_applies_from_its_start():
+    meta, _ = RULES.evaluate("ativacao", _days("2026-03-14", "2026-03-15", "2026-12-01"), [1, 1, 1], [-1, -1, -1])
+    assert meta.tolist() == [3.0, 3.5, 3.5]
+
+def test_expired_rule_falls_back():
+    meta, _ = RULES.evaluate("ativacao", _days("2026-06-30", "2026-07-01"), [1, 1], [7, 7])
+    assert meta.tolist() == [5.0, 3.5]
+
+def test_defaults_without_rules():
+    meta, pct = GoalRules().evaluate("manutencao", _days("2026-01-05", "2026-01-05"), [1, 0], [-1, -1])
+    assert meta.tolist() == [DEFAULT_TARGETS[("manutencao", "solo")], DEFAULT_TARGETS[("manutencao", "equipe")]]
+    assert pct.tolist() == [DEFAULT_ALERT_PCT] * 2
+
+def test_before_any_rule_uses_defaults():
+    meta, _ = RULES.evaluate("ativacao", _days("2025-12-31"), [0], [-1])
+    assert meta.tolist() == [DEFAULT_TARGETS[("ativacao", "equipe")]]
+
+def test_get_rules_reloads_when_rules_change(conn, company):
+    day = _days("2026-05-04")
+    assert get_rules(conn, company["id"]).evaluate("ativacao", day, [1], [-1])[0][0] == 3.0    # semeadas
+    conn.execute("""INSERT INTO goal_rules(company_id, team_type, category, region_id, valid_from, valid_to,
+                        daily_target, alert_pct, updated_at) VALUES (?,?,?,?,?,NULL,?,?,?)""",
+                 (company["id"], "solo", "ativacao", None, "2026-05-01", 6.0, 0.8, dt.datetime.utcnow().isoformat()))
+    assert get_rules(conn, company["id"]).evaluate("ativacao", day, [1], [-1])[0][0] == 6.0
+
+def test_month_kpis_per_technician(conn, company, add_tech, add_entry):
+    a, b = add_tech("Ana"), add_tech("Bruno")
+    # Ana: 2 dias solo (seg/ter); Bruno: 1 dia em equipe comum
+    add_entry("2026-05-04", a, company["ativacao"], 3, 21000, team=company["solo"])
+    add_entry("2026-05-04", a, company["manutencao"], 2, 13500, team=company["solo"])
+    add_entry("2026-05-05", a, company["ativacao"], 1, 21000, team=company["solo"])
+    add_entry("2026-05-05", b, company["manutencao"], 6, 13500)
+    perf = {p["Tecnico"]: p for p in month_kpis(conn, company["id"], "2026-05")}
+    assert list(perf) == ["Ana", "Bruno"]                                   # receita decrescente
+    ana, bruno = perf["Ana"], perf["Bruno"]
+    assert (ana["DiasSolo"], ana["DiasEquipe"], bruno["DiasSolo"], bruno["DiasEquipe"]) == (2, 0, 0, 1)
+    assert ana["MediaAtiv"] == 2.0 and ana["MetaAtivMedia"] == 3.0 and ana["PctAtiv"] == pytest.approx(4 / 6 * 100)
+    assert bruno["MediaManu"] == 6.0 and bruno["MetaManuMedia"] == 6.0 and bruno["StManu"] == "No alvo"
+    assert ana["ReceitaGerada"] == (4 * 21000 + 2 * 13500) / 100
+
+def test_no_target_on_non_working_days(conn, company, add_tech, add_entry):
+    a = add_tech("Ana")
+    add_entry("2026-05-02", a, company["ativacao"], 3, team=company["solo"])   # sábado: útil
+    add_entry("2026-05-03", a, company["ativacao"], 3, team=company["solo"])   # domingo
+    conn.execute("INSERT INTO calendar_holidays(company_id, day, name, kind, region_id) VALUES (?,?,?,?,?)",
+                 (company["id"], "2026-05-04", "Feriado regional", "regional", company["regiao"]))
+    bump_version(conn, company["id"])
+    add_entry("2026-05-04", a, company["ativacao"], 3, team=company["solo"], region=company["regiao"])
+    (p,) = month_kpis(conn, company["id"], "2026-05")
+    assert p["DiasTrabalh"] == 3 and p["AtivTotal"] == 9
+    assert p["MetaAtivMedia"] == pytest.approx(3.0 / 3)                    # só o sábado tem meta
+
+def test_calendar_edit_refreshes_cached_kpis(conn, company, add_tech, add_entry):
+    a = add_tech("Ana")
+    add_entry("2026-05-04", a, company["ativacao"], 3, team=company["solo"])
+    add_entry("2026-05-05", a, company["ativacao"], 3, team=company["solo"])
+    assert get_aggregate(conn, company["id"], "2026-05", "kpis")[0]["MetaAtivMedia"] == 3.0
+    conn.execute("INSERT INTO calendar_holidays(company_id, day, name, kind, region_id) VALUES (?,?,?,?,NULL)",
+                 (company["id"], "2026-05-04", "Fechamento", "fechamento"))
+    calendar_changed(conn, company["id"])
+    assert get_aggregate(conn, company["id"], "2026-05", "kpis") == month_kpis(conn, company["id"], "2026-05")
+    assert get_aggregate(conn, company["id"], "2026-05", "kpis")[0]["MetaAtivMedia"] == 1.5
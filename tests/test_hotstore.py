@@ -0,0 +1,67 @@
+import datetime as dt
+import pytest
+from aggregates import month_payload
+from hotstore import HotStore, open_month, stage
+from kpi import month_kpis
+from queries import mark_dirty
+
+@pytest.fixture
+def store(db_path):
+    s = HotStore(db_path)
+    yield s
+    s.conn.close()
+
+def _day(d):
+    return f"{open_month()}-{d:02d}"
+
+def _write(conn, company, ids, dates):
+    """Caminho das páginas: mark_dirty e stage na transação, apply depois do commit."""
+    change = stage(conn, company["id"], ids, mark_dirty(conn, company["id"], dates))
+    conn.commit()
+    return change
+
+def test_open_month_matches_database(conn, company, add_tech, add_entry, store):
+    a, b = add_tech("Ana"), add_tech("Bruno")
+    add_entry(_day(1), a, company["ativacao"], 2, 21000, team=company["solo"])
+    add_entry(_day(1), b, company["manutencao"], 3, 13500)
+    add_entry(_day(2), a, company["manutencao"], 1.5, 13550, region=company["regiao"])
+    cid, ym = company["id"], open_month()
+    assert store.dashboard(cid) == month_payload(conn, cid, ym)
+    assert store.kpis(conn, cid, ym) == month_kpis(conn, cid, ym)
+    assert store.kpis(conn, cid, ym, "Ana") == month_kpis(conn, cid, ym, "Ana")
+    assert store.kpis(conn, cid, ym, "Ninguém") == []
+
+def test_write_is_applied_in_place(conn, company, add_tech, add_entry, store):
+    a, cid = add_tech("Ana"), company["id"]
+    store.dashboard(cid)
+    assert store.rebuilds == 1
+    eid = add_entry(_day(3), a, company["ativacao"], 2, 21000)
+    store.apply(_write(conn, company, [eid], [_day(3)]))
+    conn.execute("UPDATE entries SET quantity=5 WHERE id=?", (eid,))
+    store.apply(_write(conn, company, [eid], [_day(3)]))
+    assert (store.applied, store.rebuilds) == (2, 1)
+    assert store.dashboard(cid) == month_payload(conn, cid, open_month())
+    assert store.rebuilds == 1                                 # commits já aplicados não recarregam
+    conn.execute("DELETE FROM entries WHERE id=?", (eid,))
+    store.apply(_write(conn, company, [eid], [_day(3)]))
+    assert store.dashboard(cid)["qtd"] == 0 and store.version(cid) == (open_month(), 3)
+
+def test_missed_version_reloads(conn, company, add_tech, add_entry, store):
+    a, cid = add_tech("Ana"), company["id"]
+    store.dashboard(cid)
+    first = add_entry(_day(4), a, company["ativacao"], 1, 21000)
+    _write(conn, company, [first], [_day(4)])                  # outro processo: apply não chega aqui
+    second = add_entry(_day(5), a, company["ativacao"], 2, 21000)
+    store.apply(_write(conn, company, [second], [_day(5)]))
+    assert store.applied == 0
+    assert store.dashboard(cid)["qtd"] == 3 and store.rebuilds == 2
+    assert store.version(cid) == (open_month(), 2)
+
+def test_other_months_are_ignored(conn, company, add_tech, add_entry, store):
+    a, cid = add_tech("Ana"), company["id"]
+    store.dashboard(cid)
+    old = (dt.date.fromisoformat(_day(1)) - dt.timedelta(days=1)).isoformat()
+    eid = add_entry(old, a, company["ativacao"], 1, 21000)
+    store.apply(_write(conn, company, [eid], [old]))
+    assert store.applied == 0 and store.dashboard(cid)["qtd"] == 0 and store.rebuilds == 1
+    assert store.kpis(conn, cid, old[:7]) == month_kpis(conn, cid, old[:7])
@@ -0,0 +1,129 @@
+import sqlite3
+import pytest
+import core
+from core import _migrate_entries_cents, to_cents
+
+# Esquema das instalações antigas: valores em reais (REAL), sem receita gravada
+BASELINE = """
+CREATE TABLE companies (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE,
+    theme_primary TEXT, theme_secondary TEXT, created_at TEXT NOT NULL);
+CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, company_id INTEGER NOT NULL, username TEXT NOT NULL,
+    password_hash TEXT NOT NULL, role TEXT NOT NULL CHECK(role IN ('admin','operator','viewer','technician')),
+    is_active INTEGER NOT NULL DEFAULT 1, created_at TEXT NOT NULL, UNIQUE(company_id, username));
+CREATE TABLE technicians (id INTEGER PRIMARY KEY AUTOINCREMENT, company_id INTEGER NOT NULL, name TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1, UNIQUE(company_id, name));
+CREATE TABLE teams (id INTEGER PRIMARY KEY AUTOINCREMENT, company_id INTEGER NOT NULL, name TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1, UNIQUE(company_id, name));
+CREATE TABLE regions (id INTEGER PRIMARY KEY AUTOINCREMENT, company_id INTEGER NOT NULL, name TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1, UNIQUE(company_id, name));
+CREATE TABLE service_types (id INTEGER PRIMARY KEY AUTOINCREMENT, company_id INTEGER NOT NULL, name TEXT NOT NULL,
+    category TEXT NOT NULL CHECK(category IN ('ativacao','manutencao','outros')),
+    default_unit_value REAL NOT NULL, is_active INTEGER NOT NULL DEFAULT 1, UNIQUE(company_id, name));
+CREATE TABLE entries (id INTEGER PRIMARY KEY AUTOINCREMENT, company_id INTEGER NOT NULL, entry_date TEXT NOT NULL,
+    technician_id INTEGER NOT NULL, team_id INTEGER, region_id INTEGER, service_type_id INTEGER NOT NULL,
+    quantity REAL NOT NULL, unit_value REAL NOT NULL, notes TEXT, created_at TEXT NOT NULL);
+INSERT INTO companies(name, created_at) VALUES ('Antiga', '2025-01-01');
+INSERT INTO technicians(company_id, name) VALUES (1, 'Ana');
+INSERT INTO teams(company_id, name) VALUES (1, 'Solo');
+INSERT INTO service_types(company_id, name, category, default_unit_value)
+    VALUES (1, 'Ativação', 'ativacao', 210.15), (1, 'Manutenção', 'manutencao', 135.0), (1, 'Visita', 'outros', 0.005);
+"""
+ENTRY = "INSERT INTO entries(company_id, entry_date, technician_id, service_type_id, quantity, unit_value, notes, created_at) VALUES (1,?,1,1,?,?,?,'x')"
+VALUES = [(1, 210.15), (3, 210.15), (0.5, 135.0), (2, 19.99), (1.5, 0.1), (7, 210.15), (1, 1e-3), (4, 135.0)]
+
+class _Hooked(core._Connection):
+    """Conexão que roda `on_commit(conn, n)` depois do n-ésimo commit (o 1º é o de antes da cópia)."""
+    on_commit = None
+    commits   = 0
+
+    def commit(self):
+        super().commit()
+        self.commits += 1
+        if self.on_commit: self.on_commit(self, self.commits)
+
+@pytest.fixture
+def old_db(tmp_path, monkeypatch):
+    """Banco no esquema antigo com ids 1..8; 2 e 8 excluídos (seq = 8, maior id = 7)."""
+    path = str(tmp_path / "antigo.db")
+    c = sqlite3.connect(path)
+    c.executescript(BASELINE)
+    c.executemany(ENTRY, [(f"2026-01-{i:02d}", q, v, f"obs {i}") for i, (q, v) in enumerate(VALUES, 1)])
+    c.execute("DELETE FROM entries WHERE id IN (2, 8)")
+    c.commit(); c.close()
+    monkeypatch.setattr(core, "DB_PATH", path)
+    return path
+
+def _open(path):
+    c = sqlite3.connect(path, factory=_Hooked)
+    c.row_factory = sqlite3.Row
+    return c
+
+def _rows(conn):
+    return {r["id"]: (r["quantity"], r["unit_cents"], r["revenue_cents"], r["notes"])
+            for r in conn.execute("SELECT id, quantity, unit_cents, revenue_cents, notes FROM entries")}
+
+def _expected(ids):
+    return {i: (VALUES[i - 1][0], to_cents(VALUES[i - 1][1]), round(VALUES[i - 1][0] * to_cents(VALUES[i - 1][1])), f"obs {i}")
+            for i in ids}
+
+def test_to_cents_rounds_half_up():
+    assert [to_cents(v) for v in (0.005, 210.15, 19.99, 2.675, "1.5", 0, 1e-3)] == [1, 21015, 1999, 268, 150, 0, 0]
+    assert to_cents(0.1 + 0.2) == 30
+
+def test_init_db_migrates_old_install(old_db):
+    core.init_db()
+    conn = _open(old_db)
+    assert "unit_value" not in {r["name"] for r in conn.execute("PRAGMA table_info(entries)")}
+    assert _rows(conn) == _expected([1, 3, 4, 5, 6, 7])
+    assert _rows(conn)[6][2] == 147105                       # 7 × R$ 210,15
+    svc = dict(conn.execute("SELECT name, default_unit_cents FROM service_types").fetchall())
+    assert svc == {"Ativação": 21015, "Manutenção": 13500, "Visita": 1}
+    assert "default_unit_value" not in {r["name"] for r in conn.execute("PRAGMA table_info(service_types)")}
+    assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name='entries'").fetchone()[0] == 8
+    cur = conn.execute("INSERT INTO entries(company_id, entry_date, technician_id, service_type_id, quantity, unit_cents, created_at) "
+                       "VALUES (1, '2026-02-01', 1, 1, 1, 100, 'x')")
+    conn.commit()
+    assert cur.lastrowid == 9                                # ids excluídos não voltam
+    assert [r[0] for r in conn.execute("SELECT rowid FROM entries_fts WHERE entries_fts MATCH 'obs' ORDER BY rowid")] == [1, 3, 4, 5, 6, 7]
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'entries_mig%'")} == set()
+    conn.close()
+    core.init_db()                                           # segunda subida: nada a migrar
+    conn = _open(old_db)
+    assert len(_rows(conn)) == 7
+    conn.close()
+
+def test_writes_during_copy_are_mirrored(old_db):
+    def write(conn, n):
+        if n != 2: return                                    # depois do primeiro lote (ids 1 e 3)
+        conn.execute("UPDATE entries SET quantity=10, unit_value=1.25 WHERE id=1")   # já copiado
+        conn.execute("DELETE FROM entries WHERE id=3")                              # já copiado
+        conn.execute("DELETE FROM entries WHERE id=6")                              # ainda não copiado
+        conn.execute(ENTRY, ("2026-01-20", 2, 99.99, "nova"))                         # id 9
+        sqlite3.Connection.commit(conn)
+    conn = _open(old_db)
+    conn.on_commit = write
+    _migrate_entries_cents(conn, chunk=2)
+    rows = _rows(conn)
+    assert set(rows) == {1, 4, 5, 7, 9}
+    assert rows[1] == (10, 125, 1250, "obs 1") and rows[9] == (2, 9999, 19998, "nova")
+    assert {k: rows[k] for k in (4, 5, 7)} == _expected([4, 5, 7])
+    assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name='entries'").fetchone()[0] == 9
+    conn.close()
+
+def test_interrupted_copy_resumes(old_db):
+    def crash(conn, n):
+        if n == 3: raise KeyboardInterrupt                   # processo derrubado depois de 2 lotes
+    conn = _open(old_db)
+    conn.on_commit = crash
+    with pytest.raises(KeyboardInterrupt): _migrate_entries_cents(conn, chunk=2)
+    assert conn.execute("SELECT COUNT(*) FROM entries_cents").fetchone()[0] == 4
+    conn.execute(ENTRY, ("2026-01-21", 1, 50.0, "entre as subidas"))                  # gravado com a migração parada
+    conn.commit(); conn.close()
+    core.init_db()
+    conn = _open(old_db)
+    rows = _rows(conn)
+    assert {k: rows[k] for k in (1, 3, 4, 5, 6, 7)} == _expected([1, 3, 4, 5, 6, 7])
+    assert rows[9] == (1, 5000, 5000, "entre as subidas")
+    assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name='entries'").fetchone()[0] == 9
+    conn.close()
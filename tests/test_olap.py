@@ -0,0 +1,69 @@
+import datetime as dt
+import functools
+import pandas as pd
+import pytest
+import olap
+from kpi import month_kpis
+from queries import cube, mark_dirty, period_summary, technician_trend
+
+duckdb = pytest.importorskip("duckdb")
+
+START, END = dt.date(2026, 1, 1), dt.date(2026, 3, 31)
+
+@pytest.fixture
+def mirror(db_path, tmp_path, monkeypatch):
+    """Espelho ligado, lido de um diretório do teste; build() copia o banco como está."""
+    out = str(tmp_path / "olap")
+    monkeypatch.setattr(olap, "ENGINE", "duckdb")
+    monkeypatch.setattr(olap, "_open", {})
+    monkeypatch.setattr(olap, "_latest", functools.partial(olap._latest, out_dir=out))
+    return lambda: olap.build_mirror(db_path, out)
+
+@pytest.fixture
+def sample(conn, company, add_tech, add_entry):
+    a, b = add_tech("Ana"), add_tech("Bruno")
+    rows = [("2026-01-05", a, "ativacao",   2, 21000, company["solo"], None),
+            ("2026-01-05", b, "manutencao", 3, 13500, None, company["regiao"]),
+            ("2026-01-31", a, "manutencao", 1, 13500, None, None),
+            ("2026-02-02", b, "ativacao",   1.5, 20000, None, company["regiao"]),
+            ("2026-03-30", a, "manutencao", 4, 13550, company["solo"], None),
+            ("2026-03-31", b, "ativacao",   1, 21000, None, None)]
+    for day, tech, cat, qty, cents, team, region in rows:
+        add_entry(day, tech, company[cat], qty, cents, team=team, region=region)
+    mark_dirty(conn, company["id"], [r[0] for r in rows])
+    conn.commit()
+
+def test_mirror_answers_like_sqlite(conn, company, sample, mirror):
+    mirror()
+    cid = company["id"]
+    duck = olap.reader(conn, cid, START, END)
+    assert isinstance(duck, olap.DuckConn)
+    for gran in ("dia", "semana", "mes", "trimestre", "ano"):
+        assert period_summary(duck, cid, START, END, gran) == period_summary(conn, cid, START, END, gran), gran
+    keys = ["mes", "regiao", "equipe", "category", "tecnico"]
+    a, b = (df.astype({k: str for k in keys}).sort_values(keys).reset_index(drop=True)
+            for df in (cube(duck, cid, START, END), cube(conn, cid, START, END)))
+    pd.testing.assert_frame_equal(a, b, check_dtype=False)
+    pd.testing.assert_frame_equal(technician_trend(duck, cid, 2026, 3, 3), technician_trend(conn, cid, 2026, 3, 3),
+                                  check_dtype=False)
+    assert month_kpis(duck, cid, "2026-03") == month_kpis(conn, cid, "2026-03")
+
+def test_stale_mirror_falls_back_to_sqlite(conn, company, add_entry, sample, mirror):
+    cid = company["id"]
+    assert olap.reader(conn, cid, START, END) is conn                     # ainda sem cópia
+    mirror()
+    tech = conn.execute("SELECT id FROM technicians WHERE name='Ana'").fetchone()[0]
+    add_entry("2026-02-10", tech, company["ativacao"], 1)
+    mark_dirty(conn, cid, ["2026-02-10"])
+    conn.commit()
+    assert olap.reader(conn, cid, START, END) is conn                     # fevereiro mudou
+    assert isinstance(olap.reader(conn, cid, dt.date(2026, 3, 1), END), olap.DuckConn)
+    conn.execute("UPDATE technicians SET name='Ana Paula' WHERE id=?", (tech,))
+    conn.commit()
+    assert olap.reader(conn, cid, dt.date(2026, 3, 1), END) is conn       # cadastro renomeado
+    mirror()
+    assert isinstance(olap.reader(conn, cid, START, END), olap.DuckConn)
+    conn.execute("INSERT INTO calendar_holidays(company_id, day, name, kind, region_id) VALUES (?,?,?,?,?)",
+                 (cid, "2026-03-30", "Regional", "regional", company["regiao"]))
+    conn.commit()
+    assert olap.reader(conn, cid, START, END) is conn                     # feriado novo muda as metas
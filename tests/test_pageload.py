@@ -0,0 +1,51 @@
+import time
+import threading
+import pytest
+from pageload import PageLoader
+
+INFINITE = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+
+@pytest.fixture
+def loader(db_path):
+    pl = PageLoader(db_path, workers=1)
+    yield pl
+    pl.pool.shutdown(wait=True)
+
+def _load(loader, sections, timeouts):
+    return {s.name: s for s in loader.load("teste", sections, timeouts)}
+
+def test_sections_return_values_and_errors(loader):
+    def boom(conn): raise ValueError("sem dados")
+    out = _load(loader, {"um": lambda c: c.execute("SELECT 1").fetchone()[0], "erro": boom}, {})
+    assert out["um"].ok and out["um"].value == 1
+    assert not out["erro"].ok and out["erro"].error == "ValueError: sem dados"
+
+def test_late_running_and_queued_sections(loader):
+    ran, release = [], threading.Event()
+    def slow(conn):
+        release.wait(2); return "tarde"
+    def queued(conn):
+        ran.append(True); return "nunca"
+    t0  = time.monotonic()
+    out = _load(loader, {"lenta": slow, "fila": queued}, {"lenta": 0.2, "fila": 0.1})
+    assert time.monotonic() - t0 < 1                                  # a página não espera a seção lenta
+    assert not out["lenta"].ok and out["lenta"].error == "passou de 0.2s"
+    assert not out["fila"].ok and out["fila"].error.startswith("não começou em 0.1s")
+    release.set()
+    assert _load(loader, {"depois": lambda c: 2}, {})["depois"].value == 2
+    assert ran == []                                                   # pulada na fila: nunca rodou
+
+def test_running_query_is_interrupted(loader):
+    t0  = time.monotonic()
+    out = _load(loader, {"infinita": lambda c: c.execute(INFINITE).fetchone()}, {"infinita": 0.2})
+    assert out["infinita"].error == "passou de 0.2s"
+    out = _load(loader, {"rapida": lambda c: c.execute("SELECT 42").fetchone()[0]}, {"rapida": 2})
+    assert out["rapida"].ok and out["rapida"].value == 42                # a única thread foi liberada
+    assert time.monotonic() - t0 < 2
+
+def test_deadline_counts_from_start(loader):
+    """Com 1 thread, a segunda seção espera a primeira na fila e ainda tem o prazo inteiro ao começar."""
+    def work(conn):
+        time.sleep(0.15); return "ok"
+    out = _load(loader, {"a": work, "b": work}, {"a": 0.3, "b": 0.3})
+    assert out["a"].ok and out["b"].ok
@@ -0,0 +1,56 @@
+import functools
+import pytest
+import passwords
+import provisioning
+from provisioning import plan, apply
+
+CSV = "\n".join(["Nome;Usuário;Senha",
+                 "Ana;;segredo1",
+                 "Bruno;bruno;",
+                 ";x;",
+                 "Carla;outra;",
+                 "ana;;",
+                 "Davi;;123",
+                 "Elisa;;"]).encode()
+
+@pytest.fixture
+def fast_hash(monkeypatch):
+    """Hash em processo e com poucas iterações: o teste confere a gravação, não o PBKDF2."""
+    monkeypatch.setattr(passwords, "PBKDF2_ITERATIONS", 1000)
+    monkeypatch.setattr(provisioning, "hash_many", functools.partial(passwords.hash_many, workers=1))
+
+def test_plan_statuses(conn, company, add_tech):
+    add_tech("Elisa")
+    rows = {r.linha: r for r in plan(conn, company["id"], CSV)}
+    assert (rows[2].usuario, rows[2].cria_tecnico, rows[2].cria_usuario, rows[2].erro) == ("ana", True, True, "")
+    assert rows[3].status == "Novo técnico + usuário"
+    assert rows[4].erro == "nome vazio"
+    assert rows[5].erro.startswith("usuário deve ser o nome")
+    assert rows[6].erro == "repetido no arquivo"
+    assert rows[7].erro.startswith("senha com menos de")
+    assert rows[8].status == "Técnico já existe — cria usuário"
+
+def test_plan_existing_user_and_no_generation(conn, company):
+    (admin,) = plan(conn, company["id"], b"nome\nadmin\n")
+    assert (admin.cria_tecnico, admin.cria_usuario) == (True, False)
+    assert admin.status == "Usuário já existe — cria técnico"
+    (row,) = plan(conn, company["id"], b"nome\nBruno\n", generate=False)
+    assert row.erro.startswith("sem senha")
+
+def test_read_csv_requires_name_column(conn, company):
+    with pytest.raises(ValueError): plan(conn, company["id"], b"usuario,senha\nana,segredo1\n")
+
+def test_apply_refuses_rows_with_errors(conn, company):
+    with pytest.raises(ValueError): apply(conn, company["id"], plan(conn, company["id"], CSV))
+
+def test_apply_creates_techs_and_users(conn, company, add_tech, fast_hash):
+    add_tech("Elisa")
+    rows = plan(conn, company["id"], "nome,senha\nAna,segredo1\nBruno,\nElisa,\n".encode())
+    temps = apply(conn, company["id"], rows)
+    assert [(n, u) for n, u, _ in temps] == [("Bruno", "bruno"), ("Elisa", "elisa")]
+    techs = {r[0] for r in conn.execute("SELECT name FROM technicians WHERE company_id=?", (company["id"],))}
+    assert techs == {"Ana", "Bruno", "Elisa"}
+    stored = dict(conn.execute("SELECT username, password_hash FROM users WHERE role='technician'").fetchall())
+    assert passwords.verify_password(stored["ana"], "segredo1")
+    assert all(passwords.verify_password(stored[u], s) for _, u, s in temps)
+    assert all(r.status == "Já cadastrado — ignorado" for r in plan(conn, company["id"], b"nome\nAna\nElisa\n"))
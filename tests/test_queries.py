@@ -0,0 +1,62 @@
+import datetime as dt
+import pytest
+from frames import fetch_df
+from queries import period_bounds, period_summary
+
+@pytest.fixture
+def sample(company, add_tech, add_entry):
+    """Três meses, duas categorias, dias com mais de um lançamento."""
+    a, b = add_tech("Ana"), add_tech("Bruno")
+    rows = [("2026-01-05", a, "ativacao",   2, 21000), ("2026-01-05", b, "manutencao", 3, 13500),
+            ("2026-01-31", a, "manutencao", 1, 13500), ("2026-02-02", b, "ativacao",   1, 21050),
+            ("2026-02-02", b, "ativacao",   1.5, 20000), ("2026-03-30", a, "manutencao", 4, 13500)]
+    for day, tech, cat, qty, cents in rows:
+        add_entry(day, tech, company[cat], qty, cents)
+    return rows
+
+def _expected(rows, key):
+    out = {}
+    for day, _, cat, qty, cents in rows:
+        p = out.setdefault(key(day), {"qtd": {}, "cents": {}, "dias": set()})
+        for k in (cat, "total"):
+            p["qtd"][k]   = p["qtd"].get(k, 0) + qty
+            p["cents"][k] = p["cents"].get(k, 0) + round(qty * cents)
+        p["dias"].add(day)
+    return out
+
+@pytest.mark.parametrize("gran, key", [("dia", lambda d: d), ("mes", lambda d: d[:7]), ("ano", lambda d: d[:4]),
+                                       ("trimestre", lambda d: f"{d[:4]}-T{(int(d[5:7]) + 2) // 3}")])
+def test_period_rollup_matches_rows(conn, company, sample, gran, key):
+    res = period_summary(conn, company["id"], dt.date(2026, 1, 1), dt.date(2026, 3, 31), gran)
+    exp = _expected(sample, key)
+    assert [p["period"] for p in res["periods"]] == sorted(exp)
+    for p in res["periods"]:
+        e = exp[p["period"]]
+        assert p["qtd"] == pytest.approx(e["qtd"])
+        assert p["receita"] == {k: c / 100 for k, c in e["cents"].items()}
+        assert p["dias"] == len(e["dias"])
+    assert res["totals"]["dias"] == len({r[0] for r in sample})
+    assert res["totals"]["receita"]["total"] == sum(round(q * c) for _, _, _, q, c in sample) / 100
+
+def test_week_starts_on_monday(conn, company, sample):
+    res = period_summary(conn, company["id"], dt.date(2026, 1, 1), dt.date(2026, 2, 28), "semana")
+    assert [p["period"] for p in res["periods"]] == ["2026-01-05", "2026-01-26", "2026-02-02"]
+
+def test_range_filters_rows(conn, company, sample):
+    res = period_summary(conn, company["id"], dt.date(2026, 1, 6), dt.date(2026, 2, 28), "mes")
+    assert res["totals"]["qtd"]["total"] == pytest.approx(1 + 1 + 1.5)
+    assert period_summary(conn, company["id"], dt.date(2025, 1, 1), dt.date(2025, 12, 31))["periods"] == []
+
+def test_period_bounds():
+    ref = dt.date(2026, 5, 14)
+    assert period_bounds("semana", ref) == (dt.date(2026, 5, 11), dt.date(2026, 5, 17))
+    assert period_bounds("trimestre", ref) == (dt.date(2026, 4, 1), dt.date(2026, 6, 30))
+    assert period_bounds("mes", dt.date(2028, 2, 3)) == (dt.date(2028, 2, 1), dt.date(2028, 2, 29))
+    with pytest.raises(ValueError): period_bounds("quinzena", ref)
+
+def test_money_columns_are_int64(conn, company, sample):
+    df = fetch_df(conn, "SELECT id, unit_cents, revenue_cents, quantity FROM entries ORDER BY id")
+    assert df.dtypes.to_dict() == {"id": "int32", "unit_cents": "int64", "revenue_cents": "int64", "quantity": "float64"}
+    assert df["revenue_cents"].tolist() == [round(q * c) for _, _, _, q, c in sample]
+    svc = fetch_df(conn, "SELECT default_unit_cents FROM service_types WHERE company_id=?", (company["id"],))
+    assert svc["default_unit_cents"].dtype == "int64"
@@ -0,0 +1,64 @@
+import datetime as dt
+import pytest
+from queries import HL_END, HL_START, fts_query, search_notes
+
+START, END = dt.date(2026, 1, 1), dt.date(2026, 12, 31)
+
+@pytest.fixture
+def notes(company, add_tech, add_entry):
+    a = add_tech("Ana")
+    add = lambda day, text: add_entry(day, a, company["ativacao"], notes=text)
+    return {"ont":    add("2026-03-02", "Troca da ONT_45 e instalação da CTO-12/3"),
+            "fibra":  add("2026-03-03", "Fibra rompida na rua; cliente sem sinal"),
+            "sinal":  add("2026-03-04", "Sinal fraco, reinstalação do roteador"),
+            "vazio":  add("2026-03-05", None),
+            "antigo": add("2025-12-30", "Instalação em dezembro")}
+
+def _ids(conn, company, text, start=START, end=END):
+    return set(search_notes(conn, company["id"], text, start, end)["id"].tolist())
+
+def test_fts_query_sanitizes_input():
+    assert fts_query('cto-12/3 "fibra rompida" instal*') == '"cto-12/3" "fibra rompida" "instal"*'
+    assert fts_query('a"b NEAR( OR AND NOT * ^x :col') == '"ab" "NEAR(" "OR" "AND" "NOT" "^x" ":col"'
+    assert fts_query('"sem fim') == '"sem" "fim"'
+    assert fts_query('  ""  * ') == "" and fts_query(None) == ""
+
+@pytest.mark.parametrize("text", ['"', "(", "NEAR(", "a OR", "-x", "col:valor", "*", 'x"y"z', "AND NOT", "^", "{a b}"])
+def test_user_input_never_breaks_match(conn, company, notes, text):
+    search_notes(conn, company["id"], text, START, END)             # sem "fts5: syntax error"
+
+def test_accents_case_and_codes(conn, company, notes):
+    assert _ids(conn, company, "INSTALACAO") == {notes["ont"]}
+    assert _ids(conn, company, "instalação", dt.date(2025, 1, 1)) == {notes["ont"], notes["antigo"]}
+    assert _ids(conn, company, "ont_45") == _ids(conn, company, "CTO-12/3") == {notes["ont"]}
+    assert _ids(conn, company, "ont") == set()                      # o código inteiro é um termo só
+
+def test_phrases_prefixes_and_all_terms(conn, company, notes):
+    assert _ids(conn, company, '"fibra rompida"') == {notes["fibra"]}
+    assert _ids(conn, company, '"rompida fibra"') == set()
+    assert _ids(conn, company, "sinal") == {notes["fibra"], notes["sinal"]}
+    assert _ids(conn, company, "sinal fraco") == {notes["sinal"]}
+    assert _ids(conn, company, "rein*") == {notes["sinal"]}
+    assert _ids(conn, company, "ro*") == {notes["fibra"], notes["sinal"]}
+
+def test_snippet_marks_match(conn, company, notes):
+    (trecho,) = search_notes(conn, company["id"], "roteador", START, END)["Trecho"]
+    assert f"{HL_START}roteador{HL_END}" in trecho
+
+def test_triggers_keep_index_in_sync(conn, company, notes):
+    conn.execute("UPDATE entries SET notes='Poste caído' WHERE id=?", (notes["fibra"],))
+    conn.execute("UPDATE entries SET notes='Fibra nova' WHERE id=?", (notes["vazio"],))
+    conn.execute("UPDATE entries SET notes=NULL WHERE id=?", (notes["sinal"],))
+    conn.execute("UPDATE entries SET quantity=3 WHERE id=?", (notes["ont"],))          # sem mudar a observação
+    conn.execute("DELETE FROM entries WHERE id=?", (notes["antigo"],))
+    conn.commit()
+    assert _ids(conn, company, "rompida") == set()
+    assert _ids(conn, company, "caido") == {notes["fibra"]}
+    assert _ids(conn, company, "fibra") == {notes["vazio"]}
+    assert _ids(conn, company, "roteador") == set()
+    assert _ids(conn, company, "ont_45") == {notes["ont"]}
+    assert _ids(conn, company, "dezembro", dt.date(2025, 1, 1)) == set()
+    # Índice consistente (sem comparar com entries: lançamentos sem observação ficam fora de propósito)
+    conn.execute("INSERT INTO entries_fts(entries_fts, rank) VALUES ('integrity-check', 0)")
+    indexed = {r[0] for r in conn.execute("SELECT rowid FROM entries_fts WHERE entries_fts MATCH 'fibra OR caido OR ont_45'")}
+    assert indexed == {notes["fibra"], notes["vazio"], notes["ont"]}
@@ -0,0 +1,61 @@
+import sqlite3
+import datetime as dt
+import numpy as np
+import pytest
+from workcal import BusinessCalendar, bump_version, get_calendar, national_holidays
+
+D = dt.date
+
+def test_easter_based_holidays():
+    h = national_holidays(2026)                              # Páscoa em 5/4/2026
+    assert h[D(2026, 4, 3)] == "Sexta-feira Santa"
+    assert h[D(2026, 2, 16)] == h[D(2026, 2, 17)] == "Carnaval"
+    assert h[D(2026, 6, 4)] == "Corpus Christi"
+    assert D(2023, 11, 20) not in national_holidays(2023) and D(2024, 11, 20) in national_holidays(2024)
+
+def test_count_mon_to_sat_with_holidays():
+    cal = BusinessCalendar()
+    assert cal.count(D(2026, 9, 1), D(2026, 9, 30)) == 25    # 26 seg–sáb menos 7/9
+    assert cal.count(D(2026, 9, 7), D(2026, 9, 7)) == 0
+    assert cal.count(D(2026, 9, 30), D(2026, 9, 1)) == 0
+    assert not cal.is_workday(D(2026, 9, 6)) and cal.is_workday(D(2026, 9, 5))
+
+def test_count_many_matches_count():
+    cal    = BusinessCalendar("1111100", [D(2026, 3, 10)])
+    starts = [D(2026, 1, 1), D(2026, 3, 1), D(2026, 12, 20), D(2026, 5, 5)]
+    ends   = [D(2026, 1, 31), D(2026, 3, 31), D(2027, 1, 10), D(2026, 5, 1)]
+    assert cal.count_many(starts, ends).tolist() == [cal.count(s, e) for s, e in zip(starts, ends)]
+
+def test_month_stats():
+    cal = BusinessCalendar()
+    s = cal.month_stats(2026, 9, D(2026, 9, 8))
+    assert s == {"total": 25, "passados": 6, "restantes": 19}
+    assert cal.month(2026, 9).dtype == np.dtype("datetime64[D]")
+
+def test_region_calendar_adds_regional_holidays():
+    cal = BusinessCalendar(extra_holidays=[D(2026, 10, 20)], regional={7: [D(2026, 10, 21)]})
+    week = (D(2026, 10, 19), D(2026, 10, 24))
+    assert cal.count(*week) == 5
+    assert cal.region(7).count(*week) == 4
+    assert cal.region(8) is cal and cal.region(None) is cal
+    util = cal.is_workday_many(["2026-10-21", "2026-10-21", "2026-10-21", "2026-10-20"], [7, 8, -1, 7])
+    assert util.tolist() == [False, True, True, False]
+
+def test_get_calendar_reads_db_and_follows_version(conn, company):
+    cid, rid = company["id"], company["regiao"]
+    week = (D(2026, 10, 19), D(2026, 10, 24))
+    assert get_calendar(conn, cid).count(*week) == 6
+    conn.executemany("INSERT INTO calendar_holidays(company_id, day, name, kind, region_id) VALUES (?,?,?,?,?)",
+                     [(cid, "2026-10-20", "Fechamento", "fechamento", None), (cid, "2026-10-21", "Regional", "regional", rid)])
+    bump_version(conn, cid)
+    assert get_calendar(conn, cid).count(*week) == 5
+    assert get_calendar(conn, cid, rid).count(*week) == 4
+    bump_version(conn, cid, "1111100")
+    assert get_calendar(conn, cid).count(*week) == 4
+
+def test_company_wide_holiday_is_unique(conn, company):
+    sql = "INSERT INTO calendar_holidays(company_id, day, name, kind, region_id) VALUES (?,?,?,?,?)"
+    conn.execute(sql, (company["id"], "2026-10-20", "A", "fechamento", None))
+    conn.execute(sql, (company["id"], "2026-10-20", "B", "regional", company["regiao"]))
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute(sql, (company["id"], "2026-10-20", "C", "fechamento", None))
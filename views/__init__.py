@@ -0,0 +1,14 @@
+"""Páginas do TechnoOps, importadas sob demanda por app.render_page."""
+
+# Páginas carregadas sob demanda: o módulo (e o pandas) só é importado na 1ª navegação
+PAGES = {
+    "Painel":            ("views.dashboard",   "page_dashboard"),
+    "Lançamento Diário": ("views.daily_entry", "page_daily_entry"),
+    "Resumo Mensal":     ("views.summary",     "page_monthly_summary"),
+    "Indicadores":       ("views.kpis",        "page_technician_kpis"),
+    "Ranking":           ("views.ranking",     "page_technician_ranking"),
+    "Análises":          ("views.analytics",   "page_analytics"),
+    "Busca":             ("views.search",      "page_search_notes"),
+    "Administração":     ("views.admin",       "page_admin"),
+    "Meus Indicadores":  ("views.tech_self",   "page_meu_indicador"),
+}
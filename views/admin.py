@@ -0,0 +1,621 @@
+import sqlite3
+import os
+import datetime as dt
+import pandas as pd
+import streamlit as st
+import aggregates
+import anomaly
+import backup
+import corrections
+import goals
+import hotstore
+import maintenance
+import profiling
+import provisioning
+from core import (DB_PATH, fetch_all, fetch_one, get_backup_scheduler, get_conn, get_forecaster, get_hot_store,
+                  get_maintenance_scheduler, get_olap_mirror, get_profiler, get_recompute_worker, get_user, hash_password, notify_dirty, require_login, require_role, to_cents,
+                  update_user_password)
+from frames import fetch_df
+from queries import mark_dirty
+from views import PAGES
+from workcal import DEFAULT_WEEKMASK, HOLIDAY_KINDS, bump_version, get_calendar, national_holidays
+
+# ==============================
+# ADMIN — EDITOR TABELAS
+# ==============================
+def admin_table_editor(title, table, company_id, key_prefix):
+    st.subheader(title)
+    conn = get_conn()
+    df   = fetch_df(conn, f"SELECT id, name, is_active FROM {table} WHERE company_id=? ORDER BY id DESC", (company_id,))
+
+    with st.form(f"{key_prefix}_add"):
+        st.markdown("**Adicionar novo**")
+        name      = st.text_input("Nome", key=f"{key_prefix}_name")
+        submitted = st.form_submit_button("Adicionar", use_container_width=True)
+        if submitted:
+            if not name.strip(): st.error("Informe um nome.")
+            else:
+                try:
+                    conn.execute(f"INSERT INTO {table}(company_id, name, is_active) VALUES (?,?,1)", (company_id, name.strip()))
+                    conn.commit(); st.success("Adicionado."); st.rerun()
+                except sqlite3.IntegrityError:
+                    st.error("Já existe um registro com esse nome.")
+
+    st.divider()
+    if df.empty: st.info("Nenhum registro cadastrado ainda."); return
+    st.markdown("**Registros**")
+    for rid, name, is_active in df[["id", "name", "is_active"]].itertuples(index=False):
+        rid, is_active = int(rid), int(is_active) == 1
+        c1, c2, c3, c4 = st.columns([6,2,2,2])
+        c1.write(name); c2.write("✅ Ativo" if is_active else "⛔ Inativo")
+        if c3.button("Desativar" if is_active else "Ativar", key=f"{key_prefix}_toggle_{rid}"):
+            conn.execute(f"UPDATE {table} SET is_active=? WHERE company_id=? AND id=?",
+                         (0 if is_active else 1, company_id, rid))
+            conn.commit(); st.rerun()
+        if c4.button("Excluir", key=f"{key_prefix}_del_{rid}"):
+            st.session_state[f"{key_prefix}_confirm_del"] = rid
+        if st.session_state.get(f"{key_prefix}_confirm_del") == rid:
+            st.warning(f"Confirmar exclusão de: **{name}** ?")
+            cc1, cc2 = st.columns(2)
+            if cc1.button("✅ Confirmar", key=f"{key_prefix}_confirm_yes_{rid}"):
+                conn.execute(f"DELETE FROM {table} WHERE company_id=? AND id=?", (company_id, rid))
+                conn.commit(); st.session_state[f"{key_prefix}_confirm_del"] = None
+                st.success("Excluído."); st.rerun()
+            if cc2.button("Cancelar", key=f"{key_prefix}_confirm_no_{rid}"):
+                st.session_state[f"{key_prefix}_confirm_del"] = None; st.rerun()
+
+# ==============================
+# ADMIN — CADASTRO EM LOTE (CSV)
+# ==============================
+def bulk_provisioning(conn, company_id):
+    st.subheader("Cadastro em lote de técnicos")
+    st.caption("CSV com a coluna **nome** (obrigatória) e, opcionalmente, **usuario** e **senha**. Cria o técnico "
+               "e o usuário com permissão Técnico; o usuário é o nome do técnico (padrão: em minúsculas).")
+    up  = st.file_uploader("Arquivo CSV", type=["csv", "txt"], key="bulk_csv")
+    gen = st.checkbox("Gerar senha temporária para quem não tiver senha no arquivo", value=True, key="bulk_gen")
+    done = st.session_state.get("bulk_result")
+    if done:
+        st.success(f"{done['tecnicos']} técnico(s) e {done['usuarios']} usuário(s) criados em {done['segundos']:.1f}s.")
+        if done["senhas"]:
+            st.warning("Senhas temporárias: baixe agora, elas não ficam guardadas.")
+            csv_out = "nome;usuario;senha_temporaria\n" + "".join(f"{n};{us};{pw}\n" for n, us, pw in done["senhas"])
+            st.download_button("⬇️ Baixar senhas temporárias", csv_out.encode("utf-8-sig"), "senhas_temporarias.csv", "text/csv")
+        if st.button("Novo cadastro em lote"): st.session_state.pop("bulk_result"); st.rerun()
+        return
+    if up is None: return
+    try:
+        rows = provisioning.plan(conn, company_id, up.getvalue(), generate=gen)
+    except ValueError as exc:
+        st.error(str(exc)); return
+    erros = sum(1 for r in rows if r.erro)
+    n_tec = sum(r.cria_tecnico for r in rows if not r.erro)
+    n_usr = sum(r.cria_usuario for r in rows if not r.erro)
+    st.dataframe(pd.DataFrame([{"Linha": r.linha, "Nome": r.nome, "Usuário": r.usuario,
+                                "Senha": "informada" if r.senha else ("temporária" if r.cria_usuario else "—"),
+                                "Situação": r.status} for r in rows]), use_container_width=True, hide_index=True)
+    if erros:
+        st.error(f"{erros} linha(s) com erro — corrija o arquivo e envie de novo."); return
+    if not (n_tec or n_usr):
+        st.info("Nada a cadastrar: todos já existem."); return
+    if st.button(f"Cadastrar {n_tec} técnico(s) e {n_usr} usuário(s)", type="primary"):
+        bar = st.progress(0.0, text="Calculando hashes das senhas...")
+        t0  = dt.datetime.now()
+        try:
+            senhas = provisioning.apply(conn, company_id, rows,
+                                        progress=lambda i, n: bar.progress(i / n, text=f"Hash das senhas: {i}/{n}"))
+        except sqlite3.IntegrityError as exc:
+            st.error(f"Nada foi gravado: {exc}"); return
+        st.session_state["bulk_result"] = {"tecnicos": n_tec, "usuarios": n_usr, "senhas": senhas,
+                                           "segundos": (dt.datetime.now() - t0).total_seconds()}
+        st.rerun()
+
+# ==============================
+# ADMIN — CORREÇÃO EM LOTE
+# ==============================
+def bulk_corrections(conn, company_id):
+    st.subheader("Correção em lote de lançamentos")
+    st.caption("Reajuste retroativo do valor unitário de um serviço ou troca de técnico/equipe/região de vários "
+               f"lançamentos de uma vez. Confira a prévia antes de aplicar; a gravação é feita em lotes de "
+               f"{corrections.BULK_CHUNK} para não travar quem está lançando.")
+    done = st.session_state.get("corr_result")
+    if done:
+        st.success(f"{done['linhas']} lançamento(s) corrigido(s) em {done['lotes']} lote(s) ({done['segundos']:.1f}s) • "
+                   f"receita R$ {done['antes']:,.2f} → R$ {done['depois']:,.2f} ({done['depois'] - done['antes']:+,.2f})")
+        if done["por_mes"]:
+            st.dataframe(pd.DataFrame([{"Mês": ym, "Lançamentos": m["linhas"], "Receita antes": m["antes"],
+                                        "Receita depois": m["depois"], "Diferença": m["depois"] - m["antes"]}
+                                       for ym, m in done["por_mes"].items()]).round(2), use_container_width=True, hide_index=True)
+        if st.button("Nova correção"): st.session_state.pop("corr_result"); st.rerun()
+        return
+
+    opts  = lambda table: dict(fetch_all(conn, f"SELECT id, name FROM {table} WHERE company_id=? AND is_active=1 ORDER BY name", (company_id,)))
+    techs, teams, regions, services = opts("technicians"), opts("teams"), opts("regions"), opts("service_types")
+    pick  = lambda label, names, none, key: st.selectbox(label, [None] + list(names), key=key,
+                                                        format_func=lambda i: none if i is None else names[i])
+    today = dt.date.today()
+    kind  = st.radio("Tipo de correção", list(corrections.KINDS), format_func=corrections.KINDS.get, horizontal=True, key="corr_kind")
+    with st.form("corr_form"):
+        c1, c2 = st.columns(2)
+        start  = c1.date_input("De", value=today.replace(day=1), key="corr_start")
+        end    = c2.date_input("Até", value=today, key="corr_end")
+        if kind == "preco":
+            c1, c2, c3 = st.columns(3)
+            svc  = c1.selectbox("Serviço", list(services), format_func=services.get, key="corr_svc")
+            unit = c2.number_input("Novo valor unitário (R$)", min_value=0.0, step=1.0, key="corr_unit")
+            only = c3.number_input("Só com valor atual (R$) — vazio = todos", min_value=0.0, step=1.0, value=None, key="corr_only")
+            corr = corrections.Correction("preco", start, end, service_id=svc, unit_cents=to_cents(unit),
+                                          only_cents=None if only is None else to_cents(only))
+        else:
+            st.markdown("**Origem**")
+            c1, c2, c3, c4 = st.columns(4)
+            with c1: o_tech   = pick("Técnico", techs, "(qualquer)", "corr_o_tech")
+            with c2: o_team   = pick("Equipe", teams, "(qualquer)", "corr_o_team")
+            with c3: o_region = pick("Região", regions, "(qualquer)", "corr_o_region")
+            with c4: o_svc    = pick("Serviço", services, "(todos)", "corr_o_svc")
+            st.markdown("**Destino**")
+            c1, c2, c3 = st.columns(3)
+            with c1: n_tech   = pick("Novo técnico", techs, "(manter)", "corr_n_tech")
+            with c2: n_team   = pick("Nova equipe", teams, "(manter)", "corr_n_team")
+            with c3: n_region = pick("Nova região", regions, "(manter)", "corr_n_region")
+            corr = corrections.Correction("mover", start, end, service_id=o_svc, tech_id=o_tech, team_id=o_team,
+                                          region_id=o_region, new_tech_id=n_tech, new_team_id=n_team, new_region_id=n_region)
+        if st.form_submit_button("Pré-visualizar"):
+            try: st.session_state["corr_plan"] = (corr, corrections.preview(conn, company_id, corr))
+            except ValueError as exc:
+                st.session_state.pop("corr_plan", None); st.error(str(exc))
+
+    plan = st.session_state.get("corr_plan")
+    if not plan: return
+    corr, prev = plan
+    if not prev["linhas"]:
+        st.info("Nenhum lançamento a corrigir com esses filtros."); return
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Lançamentos", prev["linhas"])
+    m2.metric("Receita antes", f"R$ {prev['antes']:,.2f}")
+    m3.metric("Receita depois", f"R$ {prev['depois']:,.2f}")
+    m4.metric("Diferença", f"R$ {prev['depois'] - prev['antes']:+,.2f}")
+    st.dataframe(pd.DataFrame(prev["por_mes"]).round(2), use_container_width=True, hide_index=True)
+    for label, rows in prev["por_dono"].items():
+        if rows: st.dataframe(pd.DataFrame(rows).round(2), use_container_width=True, hide_index=True)
+    with st.expander(f"Amostra ({len(prev['amostra'])} primeiro(s) lançamento(s))"):
+        st.dataframe(pd.DataFrame(prev["amostra"]).round(2), use_container_width=True, hide_index=True)
+    c1, c2 = st.columns(2)
+    if c1.button(f"Aplicar em {prev['linhas']} lançamento(s)", type="primary"):
+        bar = st.progress(0.0, text="Corrigindo...")
+        res = corrections.apply(conn, company_id, corr, notify=notify_dirty,
+                                progress=lambda i, n: bar.progress(i / n, text=f"Corrigindo: {i}/{n}"))
+        if any(ym < today.isoformat()[:7] for ym in res["por_mes"]):
+            get_forecaster().forget(company_id)          # histórico da projeção mudou
+        st.session_state.pop("corr_plan"); st.session_state["corr_result"] = res
+        st.rerun()
+    if c2.button("Cancelar"): st.session_state.pop("corr_plan"); st.rerun()
+
+# ==============================
+# CALENDÁRIO
+# ==============================
+def calendar_changed(conn, company_id, weekmask=None):
+    """Depois de editar dias da semana ou feriados: nova versão do calendário, metas dos meses fechados e projeção recalculadas."""
+    bump_version(conn, company_id, weekmask)
+    aggregates.invalidate(conn, company_id, "kpis")          # metas diárias dependem dos dias úteis
+    conn.commit()
+    get_forecaster().forget(company_id)                      # o ajuste usa os dias úteis do calendário
+
+# ==============================
+# ADMIN
+# ==============================
+def page_admin():
+    require_login()
+    u = get_user()
+    require_role({"admin"})
+    st.header("Administração")
+
+    tabs = st.tabs(["Técnicos","Equipes","Regiões","Serviços/Valores","Meta Mensal","Regras de Meta","Usuários","Calendário","Backup","Manutenção","Perfil","Anomalias","Correções"])
+    with tabs[0]: admin_table_editor("Técnicos", "technicians", u.company_id, "tech")
+    with tabs[1]: admin_table_editor("Equipes",  "teams",       u.company_id, "team")
+    with tabs[2]: admin_table_editor("Regiões",  "regions",     u.company_id, "reg")
+
+    with tabs[3]:
+        st.subheader("Serviços e Valores Padrão")
+        conn = get_conn()
+        df   = fetch_df(conn, "SELECT id, name, category, default_unit_cents / 100.0 AS default_unit_value, is_active FROM service_types WHERE company_id=? ORDER BY name", (u.company_id,))
+        if not df.empty: st.dataframe(df.drop(columns=["id"]), use_container_width=True, hide_index=True)
+        with st.form("svc_add"):
+            st.markdown("**Adicionar serviço**")
+            name = st.text_input("Nome do serviço")
+            cat  = st.selectbox("Categoria", ["ativacao","manutencao","outros"])
+            val  = st.number_input("Valor padrão (R$)", min_value=0.0, value=0.0, step=1.0)
+            ok   = st.form_submit_button("Adicionar", use_container_width=True)
+            if ok:
+                if not name.strip(): st.error("Informe um nome.")
+                else:
+                    try:
+                        conn.execute("INSERT INTO service_types(company_id, name, category, default_unit_cents, is_active) VALUES (?,?,?,?,1)",
+                                     (u.company_id, name.strip(), cat, to_cents(val)))
+                        conn.commit(); st.success("Serviço adicionado."); st.rerun()
+                    except sqlite3.IntegrityError:
+                        st.error("Já existe um serviço com esse nome.")
+
+    with tabs[4]:
+        st.subheader("Meta Mensal")
+        conn  = get_conn()
+        today = dt.date.today()
+        year  = st.number_input("Ano da meta", min_value=2020, max_value=2100, value=today.year,  step=1, key="gy")
+        month = st.number_input("Mês da meta", min_value=1,    max_value=12,   value=today.month, step=1, key="gm")
+        cur   = fetch_one(conn, "SELECT goal_value, goal_ativ_day, goal_manu_day FROM monthly_goals WHERE company_id=? AND year=? AND month=?",
+                          (u.company_id, int(year), int(month)))
+        total_uteis_adm = int(get_calendar(conn, u.company_id).month(int(year), int(month)).size)
+        st.info(f"📅 O mês {int(month):02d}/{int(year)} tem **{total_uteis_adm} dias úteis** (descontados feriados — ver aba Calendário).")
+
+        st.markdown("---")
+        st.markdown("**💰 Meta de Faturamento**")
+        goal = st.number_input("Meta total de receita (R$)", min_value=0.0,
+                               value=float(cur["goal_value"]) if cur else 0.0, step=100.0)
+
+        st.markdown("---")
+        st.markdown("**⚡ Meta de Ativações**")
+        col_a1, col_a2 = st.columns(2)
+        with col_a1:
+            n_tec_ativ = st.number_input("Nº de técnicos (ativação)", min_value=0, value=1, step=1)
+        with col_a2:
+            meta_ativ_por_tec = st.number_input("Meta por técnico/dia (ativação)", min_value=0.0, value=3.0, step=0.5)
+        goal_ativ = n_tec_ativ * meta_ativ_por_tec
+        st.markdown(f"**Meta diária: {goal_ativ:.0f} ativ/dia** ({n_tec_ativ} × {meta_ativ_por_tec:.1f}) → **{goal_ativ*total_uteis_adm:.0f} no mês**")
+
+        st.markdown("---")
+        st.markdown("**🔧 Meta de Manutenções**")
+        col_m1, col_m2 = st.columns(2)
+        with col_m1:
+            n_tec_manu = st.number_input("Nº de técnicos (manutenção)", min_value=0, value=0, step=1)
+        with col_m2:
+            meta_manu_por_tec = st.number_input("Meta por técnico/dia (manutenção)", min_value=0.0, value=4.0, step=0.5)
+        goal_manu = n_tec_manu * meta_manu_por_tec
+        if goal_manu > 0:
+            st.markdown(f"**Meta diária: {goal_manu:.0f} manu/dia** ({n_tec_manu} × {meta_manu_por_tec:.1f}) → **{goal_manu*total_uteis_adm:.0f} no mês**")
+        else:
+            st.markdown("_Sem meta de manutenção configurada para este mês._")
+
+        st.markdown("---")
+        if st.button("Salvar metas", type="primary"):
+            conn.execute("""INSERT INTO monthly_goals(company_id, year, month, goal_value, goal_ativ_day, goal_manu_day)
+                            VALUES (?,?,?,?,?,?)
+                            ON CONFLICT(company_id, year, month) DO UPDATE SET
+                                goal_value=excluded.goal_value,
+                                goal_ativ_day=excluded.goal_ativ_day,
+                                goal_manu_day=excluded.goal_manu_day""",
+                         (u.company_id, int(year), int(month), float(goal), float(goal_ativ), float(goal_manu)))
+            conn.commit(); st.success(f"Metas salvas! Ativ/dia: {goal_ativ:.0f} | Manu/dia: {goal_manu:.0f}")
+
+    with tabs[5]:
+        st.subheader("Regras de meta diária por técnico")
+        st.caption("Vale a regra mais específica (região > tipo de equipe > geral); entre iguais, a de início mais "
+                   "recente. Para mudar a meta no meio do mês, adicione uma regra nova a partir do dia da mudança.")
+        conn    = get_conn()
+        regs    = fetch_df(conn, "SELECT id, name FROM regions WHERE company_id=? ORDER BY name", (u.company_id,))
+        reg_map = dict(zip(regs["id"].tolist(), regs["name"].tolist())) if not regs.empty else {}
+        rules   = fetch_all(conn, """SELECT id, team_type, category, region_id, valid_from, valid_to, daily_target, alert_pct
+                                     FROM goal_rules WHERE company_id=? ORDER BY category, valid_from, id""", (u.company_id,))
+        if rules:
+            st.dataframe(pd.DataFrame([{
+                "Categoria": goals.CATEGORIES[r["category"]], "Equipe": goals.TEAM_TYPES[r["team_type"]],
+                "Região": reg_map.get(r["region_id"], "Todas"),
+                "Início": dt.date.fromisoformat(r["valid_from"]).strftime("%d/%m/%Y"),
+                "Fim": dt.date.fromisoformat(r["valid_to"]).strftime("%d/%m/%Y") if r["valid_to"] else "—",
+                "Meta/dia": r["daily_target"], "Alerta (%)": round(r["alert_pct"] * 100, 1)} for r in rules]),
+                use_container_width=True, hide_index=True)
+        st.caption("Hoje: " + goals.get_rules(conn, u.company_id).describe(dt.date.today()))
+
+        with st.form("rule_add"):
+            st.markdown("**Adicionar regra**")
+            c1, c2, c3 = st.columns(3)
+            r_cat  = c1.selectbox("Categoria", list(goals.CATEGORIES), format_func=goals.CATEGORIES.get)
+            r_team = c2.selectbox("Tipo de equipe", list(goals.TEAM_TYPES), format_func=goals.TEAM_TYPES.get)
+            r_reg  = c3.selectbox("Região", [None] + list(reg_map), format_func=lambda r: "Todas" if r is None else reg_map[r])
+            c1, c2, c3, c4 = st.columns(4)
+            r_from = c1.date_input("Vale a partir de", value=dt.date.today().replace(day=1))
+            r_to   = c2.date_input("Até (opcional)", value=None)
+            r_meta = c3.number_input("Meta por dia", min_value=0.0, value=4.0, step=0.5)
+            r_pct  = c4.number_input("Alerta a partir de (% da meta)", min_value=0.0, max_value=100.0,
+                                     value=goals.DEFAULT_ALERT_PCT * 100, step=0.5)
+            if st.form_submit_button("Adicionar", use_container_width=True):
+                if r_to and r_to < r_from: st.error("O fim da vigência deve ser posterior ao início.")
+                else:
+                    conn.execute("""INSERT INTO goal_rules(company_id, team_type, category, region_id, valid_from, valid_to,
+                                        daily_target, alert_pct, updated_at) VALUES (?,?,?,?,?,?,?,?,?)""",
+                                 (u.company_id, r_team, r_cat, r_reg, r_from.isoformat(), r_to.isoformat() if r_to else None,
+                                  float(r_meta), float(r_pct) / 100, dt.datetime.utcnow().isoformat()))
+                    aggregates.invalidate(conn, u.company_id, "kpis"); conn.commit()
+                    st.success("Regra adicionada."); st.rerun()
+        if rules:
+            del_r = st.selectbox("Remover regra", [r["id"] for r in rules], format_func=lambda i: next(
+                f"{goals.CATEGORIES[r['category']]} • {goals.TEAM_TYPES[r['team_type']]} • {reg_map.get(r['region_id'], 'Todas')} • "
+                f"desde {r['valid_from']} • {r['daily_target']:g}/dia" for r in rules if r["id"] == i))
+            if st.button("Remover", key="rule_del"):
+                conn.execute("DELETE FROM goal_rules WHERE company_id=? AND id=?", (u.company_id, int(del_r)))
+                aggregates.invalidate(conn, u.company_id, "kpis"); conn.commit()
+                st.success("Removida."); st.rerun()
+
+        st.divider()
+        teams = fetch_df(conn, "SELECT id, name, is_solo FROM teams WHERE company_id=? ORDER BY name", (u.company_id,))
+        if not teams.empty:
+            atuais = teams.loc[teams["is_solo"] == 1, "id"].tolist()
+            solos  = st.multiselect("Equipes individuais (dias contam como Solo)", teams["id"].tolist(), default=atuais,
+                                    format_func=dict(zip(teams["id"].tolist(), teams["name"].tolist())).get)
+            if sorted(solos) != sorted(atuais) and st.button("Salvar equipes individuais"):
+                conn.execute("UPDATE teams SET is_solo=0 WHERE company_id=?", (u.company_id,))
+                conn.executemany("UPDATE teams SET is_solo=1 WHERE company_id=? AND id=?", [(u.company_id, int(t)) for t in solos])
+                aggregates.invalidate(conn, u.company_id, "kpis"); conn.commit()
+                st.success("Equipes atualizadas."); st.rerun()
+
+    with tabs[6]:
+        st.subheader("Usuários e permissões")
+        conn = get_conn()
+        df   = fetch_df(conn, "SELECT id, username, role, is_active, created_at FROM users WHERE company_id=? ORDER BY id DESC", (u.company_id,))
+        if not df.empty: st.dataframe(df.drop(columns=["id"]), use_container_width=True, hide_index=True)
+
+        with st.form("user_add"):
+            st.markdown("**Adicionar usuário**")
+            st.caption("💡 Para técnico: use o username **igual ao nome do técnico** (ex: nome 'Enio' → usuário 'enio') e selecione a permissão **Técnico**.")
+            username = st.text_input("Usuário (login)")
+            role     = st.selectbox("Permissão", ["admin","operator","viewer","technician"],
+                                    format_func=lambda x: {"admin":"Administrador","operator":"Operador","viewer":"Visualização","technician":"Técnico"}[x])
+            password = st.text_input("Senha inicial", type="password")
+            ok       = st.form_submit_button("Criar usuário", use_container_width=True)
+            if ok:
+                if not username.strip() or not password: st.error("Informe usuário e senha.")
+                else:
+                    try:
+                        conn.execute("INSERT INTO users(company_id, username, password_hash, role, is_active, created_at) VALUES (?,?,?,?,1,?)",
+                                     (u.company_id, username.strip(), hash_password(password), role, dt.datetime.utcnow().isoformat()))
+                        conn.commit(); st.success("Usuário criado."); st.rerun()
+                    except sqlite3.IntegrityError:
+                        st.error("Usuário já existe.")
+
+        st.divider()
+        bulk_provisioning(conn, u.company_id)
+
+        st.divider()
+        st.subheader("Ações em usuários")
+        usernames = df["username"].tolist() if not df.empty else []
+        if not usernames:
+            st.info("Nenhum usuário cadastrado.")
+        else:
+            sel_user = st.selectbox("Selecione um usuário", usernames, key="sel_user_admin")
+            row = fetch_one(conn, "SELECT username, role, is_active FROM users WHERE company_id=? AND username=?",
+                            (u.company_id, sel_user))
+            if row:
+                is_active = int(row["is_active"]) == 1
+                role      = row["role"]
+                c1, c2    = st.columns(2)
+                if c1.button("Desativar usuário" if is_active else "Ativar usuário", use_container_width=True):
+                    conn.execute("UPDATE users SET is_active=? WHERE company_id=? AND username=?",
+                                 (0 if is_active else 1, u.company_id, sel_user))
+                    conn.commit(); st.success("Status atualizado."); st.rerun()
+                new_role = c2.selectbox("Permissão", ["admin","operator","viewer","technician"],
+                                        index=["admin","operator","viewer","technician"].index(role) if role in ["admin","operator","viewer","technician"] else 0,
+                                        format_func=lambda x: {"admin":"Administrador","operator":"Operador","viewer":"Visualização","technician":"Técnico"}[x])
+                if st.button("Salvar permissão", use_container_width=True):
+                    conn.execute("UPDATE users SET role=? WHERE company_id=? AND username=?",
+                                 (new_role, u.company_id, sel_user))
+                    conn.commit(); st.success("Permissão atualizada."); st.rerun()
+                st.divider()
+                st.markdown("**Resetar senha do usuário**")
+                new_pass  = st.text_input("Nova senha",          type="password", key="reset_pass")
+                new_pass2 = st.text_input("Confirmar nova senha", type="password", key="reset_pass2")
+                if st.button("Resetar senha", type="primary", use_container_width=True):
+                    if not new_pass or new_pass != new_pass2: st.error("As senhas não conferem.")
+                    else:
+                        update_user_password(u.company_id, sel_user, new_pass)
+                        st.success("Senha resetada com sucesso.")
+
+    with tabs[7]:
+        st.subheader("Calendário de dias úteis")
+        conn = get_conn()
+        row  = fetch_one(conn, "SELECT weekmask FROM company_calendar WHERE company_id=?", (u.company_id,))
+        mask = row["weekmask"] if row else DEFAULT_WEEKMASK
+        nomes_dias = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+        st.markdown("**Dias da semana trabalhados**")
+        cols = st.columns(7)
+        novo = "".join("1" if cols[i].checkbox(n, value=mask[i] == "1", key=f"cal_wd_{i}") else "0"
+                       for i, n in enumerate(nomes_dias))
+        if novo != mask and st.button("Salvar dias da semana"):
+            if "1" not in novo: st.error("Selecione ao menos um dia.")
+            else:
+                calendar_changed(conn, u.company_id, novo)
+                st.success("Dias da semana atualizados."); st.rerun()
+
+        st.divider()
+        cal_ano = st.number_input("Ano", min_value=2020, max_value=2040, value=dt.date.today().year, step=1, key="cal_y")
+        regs    = fetch_df(conn, "SELECT id, name FROM regions WHERE company_id=? ORDER BY name", (u.company_id,))
+        reg_map = dict(zip(regs["id"].tolist(), regs["name"].tolist())) if not regs.empty else {}
+        extras  = fetch_all(conn, """SELECT id, day, name, kind, region_id FROM calendar_holidays
+                                     WHERE company_id=? AND substr(day,1,4)=? ORDER BY day""", (u.company_id, f"{int(cal_ano):04d}"))
+        lista = [{"Data": d.strftime("%d/%m/%Y"), "Nome": n, "Tipo": "Nacional", "Região": "Todas"}
+                 for d, n in sorted(national_holidays(int(cal_ano)).items())]
+        lista += [{"Data": dt.date.fromisoformat(r["day"]).strftime("%d/%m/%Y"), "Nome": r["name"],
+                   "Tipo": HOLIDAY_KINDS[r["kind"]], "Região": reg_map.get(r["region_id"], "Todas")} for r in extras]
+        st.dataframe(pd.DataFrame(lista), use_container_width=True, hide_index=True)
+
+        with st.form("cal_add"):
+            st.markdown("**Adicionar feriado regional ou fechamento**")
+            st.caption("Datas de uma região valem para os lançamentos dessa região (meta diária dos técnicos); "
+                       "as de todas as regiões também contam nos dias úteis do Painel e na meta proporcional.")
+            h_day  = st.date_input("Data", value=dt.date.today())
+            h_name = st.text_input("Descrição")
+            h_kind = st.selectbox("Tipo", ["regional", "fechamento"], format_func=HOLIDAY_KINDS.get)
+            h_reg  = st.selectbox("Região", [None] + list(reg_map), format_func=lambda r: "Todas" if r is None else reg_map[r])
+            if st.form_submit_button("Adicionar", use_container_width=True):
+                if not h_name.strip(): st.error("Informe uma descrição.")
+                else:
+                    try:
+                        conn.execute("INSERT INTO calendar_holidays(company_id, day, name, kind, region_id) VALUES (?,?,?,?,?)",
+                                     (u.company_id, h_day.isoformat(), h_name.strip(), h_kind, h_reg))
+                        calendar_changed(conn, u.company_id)
+                        st.success("Data adicionada."); st.rerun()
+                    except sqlite3.IntegrityError:
+                        st.error("Já existe uma data cadastrada nesse dia.")
+        if extras:
+            del_h = st.selectbox("Remover data", [r["id"] for r in extras],
+                                 format_func=lambda i: next(f"{r['day']} — {r['name']}" for r in extras if r["id"] == i))
+            if st.button("Remover", key="cal_del"):
+                conn.execute("DELETE FROM calendar_holidays WHERE company_id=? AND id=?", (u.company_id, int(del_h)))
+                calendar_changed(conn, u.company_id)
+                st.success("Removido."); st.rerun()
+
+    with tabs[8]:
+        st.subheader("Backup do banco")
+        sched = get_backup_scheduler()
+        st.caption(f"Backup online automático a cada {sched.interval_h:g}h • mantém {backup.BACKUP_KEEP} cópias em `{sched.dest_dir}`")
+        if st.button("Fazer backup agora", type="primary"):
+            with st.spinner("Copiando banco..."):
+                try:
+                    r = sched.run_now()
+                    st.success(f"Backup concluído — {backup.format_report(r)}")
+                except Exception as exc:
+                    st.error(f"Falha no backup: {exc}")
+        if sched.last_error:
+            st.warning(f"Último erro: {sched.last_error}")
+        elif sched.last_report:
+            st.info(f"Último backup: {backup.format_report(sched.last_report)}")
+        arquivos = backup.list_backups(sched.dest_dir)
+        if arquivos:
+            st.dataframe(pd.DataFrame([{
+                "Arquivo": os.path.basename(f),
+                "Tamanho (MB)": round(os.path.getsize(f) / 1_048_576, 2),
+            } for f in arquivos]), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhum backup gerado ainda.")
+
+    with tabs[9]:
+        st.subheader("Manutenção do banco")
+        msched = get_maintenance_scheduler()
+        st.caption(f"ANALYZE/optimize + incremental_vacuum a cada {msched.interval_h:g}h, "
+                   f"somente após {msched.idle_s:.0f}s sem gravações")
+
+        def stats_df(s):
+            return {"Arquivo (MB)": round(s["file_bytes"] / 1_048_576, 2), "Páginas": s["page_count"],
+                    "Páginas livres": s["freelist_count"], "% livre": round(s["free_pct"], 1),
+                    "Tam. página": s["page_size"], "auto_vacuum": s["auto_vacuum"],
+                    "Estatísticas": "sim" if s["analyzed"] else "não"}
+
+        conn = get_conn()
+        st.dataframe(pd.DataFrame([stats_df(maintenance.db_stats(conn, DB_PATH))]), use_container_width=True, hide_index=True)
+        ocioso = int(dt.datetime.now().timestamp() - maintenance.last_write_ts(DB_PATH))
+        st.caption(f"Última gravação há {ocioso}s")
+        if st.button("Executar manutenção agora", type="primary"):
+            with st.spinner("Otimizando banco..."):
+                try: msched.run_now()
+                except Exception as exc: st.error(f"Falha na manutenção: {exc}")
+        if msched.last_error:
+            st.warning(f"Último erro: {msched.last_error}")
+        if msched.last_report:
+            r = msched.last_report
+            st.markdown(f"**Última execução** — {r['duration_s']:.2f}s • {r.get('relatorios', 0)} relatório(s) de fechamento gerado(s)")
+            st.dataframe(pd.DataFrame([{"Momento": "Antes", **stats_df(r["before"])},
+                                       {"Momento": "Depois", **stats_df(r["after"])}]),
+                         use_container_width=True, hide_index=True)
+
+        st.divider()
+        st.subheader("Agregados em segundo plano")
+        worker = get_recompute_worker()
+        pend   = worker.pending()
+        st.caption(f"Recalcula Painel/Indicadores {worker.debounce_s:g}s após a última gravação do mês • "
+                   f"{worker.processed} recálculos • {len(pend)} pendente(s)")
+        if worker.last_run:
+            cid, ym, took = worker.last_run
+            st.caption(f"Último recálculo: {ym} em {took * 1000:.0f} ms")
+        if worker.last_error:
+            st.warning(f"Último erro: {worker.last_error}")
+        hot = get_hot_store().stats()
+        st.caption(f"Mês corrente em memória: {hot['lancamentos']} lançamento(s) de {hot['empresas']} empresa(s) • "
+                   f"{hot['no_lugar']} gravação(ões) aplicadas no lugar • {hot['recargas']} recarga(s)")
+        ajuste = get_forecaster().get(conn, u.company_id)
+        st.caption(f"Projeção de fim de mês: ajustada em {ajuste.days} dia(s) de histórico • R² {ajuste.r2:.2f} • "
+                   f"desvio R$ {ajuste.sigma:,.0f}/dia (refeita na virada do mês)" if ajuste else
+                   "Projeção de fim de mês: histórico curto — o Painel usa o ritmo médio")
+
+        st.divider()
+        st.subheader("Espelho analítico (DuckDB)")
+        mirror = get_olap_mirror()
+        if mirror is None:
+            st.caption("Desligado — relatórios consultam o SQLite. Para ligar: ANALYTICS_ENGINE=duckdb (requer o pacote duckdb).")
+        else:
+            st.caption(f"Resumo, Análises, Ranking e relatórios de fechamento leem a cópia colunar em `{mirror.out_dir}`, "
+                       f"refeita a cada {mirror.refresh_s:g}s se houve gravação; meses alterados desde a cópia vão ao SQLite")
+            if st.button("Atualizar espelho agora"):
+                with st.spinner("Copiando para o DuckDB..."):
+                    try: mirror.run_now()
+                    except Exception as exc: st.error(f"Falha na cópia: {exc}")
+            if mirror.last_error:
+                st.warning(f"Último erro: {mirror.last_error}")
+            if mirror.last_report:
+                r = mirror.last_report
+                st.caption(f"Última cópia: {r['rows'].get('entries', 0):,} lançamentos, "
+                           f"{r['bytes'] / 1_048_576:.1f} MB em {r['duration_s']:.2f}s")
+
+    with tabs[10]:
+        st.subheader("Perfil por rerun")
+        prof = get_profiler()
+        st.caption("Mede cada rerun das páginas escolhidas (de todos os usuários) e guarda os "
+                   f"últimos {prof.records.maxlen}. Deixe desligado no uso normal.")
+        c1, c2 = st.columns(2)
+        prof.enabled = c1.toggle("Modo perfil ativo", value=prof.enabled)
+        prof.mode    = c2.radio("Profiler", list(profiling.MODES), format_func=profiling.MODES.get,
+                                index=list(profiling.MODES).index(prof.mode), horizontal=True)
+        prof.pages   = set(st.multiselect("Páginas (vazio = todas)", [p for p in PAGES if p != "Administração"],
+                                          default=sorted(prof.pages)))
+        records = list(prof.records)
+        if not records:
+            st.info("Nenhum perfil coletado ainda. Ative o modo e navegue até a página lenta.")
+        else:
+            st.dataframe(pd.DataFrame([{"Momento": r.started_at, "Página": r.page, "Usuário": r.user,
+                                        "Profiler": r.mode, "Duração (ms)": round(r.duration_s * 1000, 1)}
+                                       for r in records]), use_container_width=True, hide_index=True)
+            i = st.selectbox("Detalhar", range(len(records)),
+                             format_func=lambda i: f"{records[i].started_at} • {records[i].page} • {records[i].duration_s * 1000:.0f} ms")
+            rec = records[i]
+            st.dataframe(pd.DataFrame(rec.top).round(2), use_container_width=True, hide_index=True)
+            c1, c2 = st.columns(2)
+            c1.download_button("Baixar " + (".pstats" if rec.mode == "cprofile" else "pilhas colapsadas"),
+                               rec.data, file_name=rec.filename, mime="application/octet-stream")
+            if c2.button("Limpar perfis"):
+                prof.clear(); st.rerun()
+
+    with tabs[11]:
+        st.subheader("Lançamentos fora do padrão")
+        st.caption(f"Sinalizados na gravação quando |z| > {anomaly.ANOMALY_Z:g} em relação ao histórico do técnico "
+                   f"no serviço (mínimo {anomaly.ANOMALY_MIN_N} lançamentos). Só entram nas médias depois de aceitos.")
+        conn = get_conn()
+        fila = fetch_df(conn, """
+            SELECT f.entry_id, e.entry_date AS Data, t.name AS Tecnico, sv.name AS Servico,
+                   f.field, f.value AS Valor, f.mean AS Media, f.std AS Desvio, f.z,
+                   e.revenue_cents / 100.0 AS Receita
+            FROM entry_flags f
+            JOIN entries e        ON e.id = f.entry_id
+            JOIN technicians t    ON t.id = e.technician_id
+            JOIN service_types sv ON sv.id = e.service_type_id
+            WHERE f.company_id=? AND f.status='pendente'
+            ORDER BY f.created_at DESC LIMIT 500""", (u.company_id,))
+        if fila.empty:
+            st.success("Nenhum lançamento aguardando revisão.")
+        else:
+            fila["Campo"] = fila["field"].astype(str).map(anomaly.FIELDS)
+            st.dataframe(fila[["entry_id", "Data", "Tecnico", "Servico", "Campo", "Valor", "Media", "Desvio", "z", "Receita"]]
+                         .round(2).rename(columns={"entry_id": "ID"}), use_container_width=True, hide_index=True)
+            ids = list(dict.fromkeys(fila["entry_id"].tolist()))
+            sel = st.selectbox("Lançamento", ids, format_func=lambda i: f"ID {i} — " + " / ".join(
+                f"{r.Tecnico} {r.Servico} {r.Campo} {r.Valor:g}" for r in fila[fila["entry_id"] == i].itertuples()))
+            c1, c2 = st.columns(2)
+            if c1.button("✅ Valor correto (aceitar)"):
+                anomaly.accept(conn, u.company_id, int(sel), u.username); conn.commit()
+                st.success("Aceito."); st.rerun()
+            if c2.button("🗑️ Excluir lançamento"):
+                dia = fetch_one(conn, "SELECT entry_date FROM entries WHERE company_id=? AND id=?", (u.company_id, int(sel)))
+                anomaly.discard(conn, u.company_id, int(sel), u.username)
+                conn.execute("DELETE FROM entries WHERE company_id=? AND id=?", (u.company_id, int(sel)))
+                yms = mark_dirty(conn, u.company_id, [dia["entry_date"]]) if dia else []
+                change = hotstore.stage(conn, u.company_id, [int(sel)], yms)
+                conn.commit(); notify_dirty(u.company_id, yms, change)
+                st.success("Lançamento excluído."); st.rerun()
+
+    with tabs[12]:
+        bulk_corrections(get_conn(), u.company_id)
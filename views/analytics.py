@@ -0,0 +1,80 @@
+import threading
+import datetime as dt
+import streamlit as st
+import metrics
+import olap
+from core import get_conn, get_user, require_login
+from queries import CUBE_DIMS, cube, dims_stamp, period_version
+
+# ==============================
+# ANÁLISES — cubo região × equipe × serviço
+# ==============================
+_run = threading.local()                  # load_cube roda na thread da sessão: marca se o cache não tinha o cubo
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def load_cube(company_id: int, start: dt.date, end: dt.date, version: tuple, dims: str):
+    """Cubo do intervalo; `version` e `dims` entram só na chave do cache (lançamentos e cadastros)."""
+    _run.computed = True
+    return cube(olap.reader(get_conn(), company_id, start, end), company_id, start, end)
+
+def page_analytics():
+    require_login()
+    u     = get_user()
+    today = dt.date.today()
+    st.header("Análises")
+
+    c1, c2 = st.columns(2)
+    with c1: ini = st.date_input("De",  value=(today.replace(day=1) - dt.timedelta(days=330)).replace(day=1), key="cube_ini")
+    with c2: fim = st.date_input("Até", value=today, key="cube_fim")
+    if fim < ini: st.error("A data final deve ser posterior à inicial."); return
+
+    conn = get_conn()
+    _run.computed = False
+    df   = load_cube(u.company_id, ini, fim, period_version(conn, u.company_id, ini, fim), dims_stamp(conn, u.company_id))
+    metrics.cache_lookup("cubo", not _run.computed)
+    if df.empty: st.info("Sem dados para este período."); return
+
+    # ── Fatias ────────────────────────────────────────────────────────
+    f1, f2, f3, f4 = st.columns(4)
+    filtros = {}
+    for col, (label, dim) in zip([f1, f2, f3, f4], [("Região", "regiao"), ("Equipe", "equipe"),
+                                                     ("Categoria", "category"), ("Técnico", "tecnico")]):
+        with col: filtros[dim] = st.multiselect(label, sorted(df[dim].dropna().unique().tolist()), key=f"cube_f_{dim}")
+    for dim, vals in filtros.items():
+        if vals: df = df[df[dim].isin(vals)]
+    if df.empty: st.info("Nenhum dado para os filtros selecionados."); return
+
+    # ── Drill-down ────────────────────────────────────────────────────
+    nomes = {v: k for k, v in CUBE_DIMS.items()}
+    hier  = st.multiselect("Hierarquia de detalhamento", [d for d in CUBE_DIMS if d != "Mês"],
+                           default=["Região", "Equipe", "Técnico"], key="cube_hier")
+    metrica = st.radio("Métrica", ["Receita", "Quantidade"], horizontal=True, key="cube_metric")
+    valor   = "receita" if metrica == "Receita" else "qtd"
+    nivel, caminho = None, []
+    for i, label in enumerate(hier):
+        dim     = CUBE_DIMS[label]
+        membros = sorted(df[dim].dropna().unique().tolist())
+        escolha = st.selectbox(label, ["(todos)"] + membros, key=f"cube_drill_{i}_{label}")
+        if escolha == "(todos)":
+            nivel = dim; break
+        df = df[df[dim] == escolha]; caminho.append(escolha)
+    nivel = nivel or "tecnico"
+    if caminho: st.caption("Detalhando: " + " › ".join(caminho))
+
+    k1, k2, k3 = st.columns(3)
+    with k1: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Receita</div><div class='techno-value'>R$ {df['receita'].sum():,.2f}</div></div>", unsafe_allow_html=True)
+    with k2: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Serviços</div><div class='techno-value'>{df['qtd'].sum():.0f}</div></div>", unsafe_allow_html=True)
+    with k3: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>{nomes[nivel]}s</div><div class='techno-value'>{df[nivel].nunique()}</div></div>", unsafe_allow_html=True)
+
+    st.divider()
+    pivot = df.pivot_table(index=nivel, columns="mes", values=valor, aggfunc="sum", fill_value=0, observed=True)
+    pivot["Total"] = pivot.sum(axis=1)
+    pivot = pivot.sort_values("Total", ascending=False)
+    pivot.index.name = nomes[nivel]
+    st.subheader(f"📊 {metrica} por {nomes[nivel].lower()} e mês")
+    st.dataframe(pivot.round(2), use_container_width=True)
+
+    st.subheader(f"🧩 {metrica} por {nomes[nivel].lower()} e categoria")
+    por_cat = df.pivot_table(index=nivel, columns="category", values=valor, aggfunc="sum", fill_value=0, observed=True)
+    por_cat.index.name = nomes[nivel]
+    st.dataframe(por_cat.round(2), use_container_width=True)
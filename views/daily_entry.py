@@ -0,0 +1,148 @@
+import datetime as dt
+import streamlit as st
+import anomaly
+import hotstore
+from core import fetch_one, get_conn, get_user, notify_dirty, require_login, require_role, to_cents
+from frames import fetch_df
+from queries import mark_dirty
+
+# ==============================
+# LANÇAMENTO DIÁRIO
+# ==============================
+def page_daily_entry():
+    require_login()
+    u = get_user()
+    require_role({"admin", "operator"})
+    st.header("Lançamento Diário")
+    aviso = st.session_state.pop("entry_flash", None)
+    if aviso: st.warning(aviso)
+
+    conn     = get_conn()
+    techs    = fetch_df(conn, "SELECT id, name FROM technicians WHERE company_id=? AND is_active=1 ORDER BY name", (u.company_id,))
+    teams    = fetch_df(conn, "SELECT id, name FROM teams WHERE company_id=? AND is_active=1 ORDER BY name", (u.company_id,))
+    regions  = fetch_df(conn, "SELECT id, name FROM regions WHERE company_id=? AND is_active=1 ORDER BY name", (u.company_id,))
+    services = fetch_df(conn, "SELECT id, name, category, default_unit_cents / 100.0 AS default_unit_value FROM service_types WHERE company_id=? AND is_active=1 ORDER BY name", (u.company_id,))
+
+    if techs.empty:
+        st.warning("Cadastre pelo menos 1 técnico em Administração → Técnicos.")
+        return
+
+    entry_date = st.date_input("Data", value=dt.date.today())
+
+    with st.form("entry_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            tech_name   = st.selectbox("Técnico", techs["name"].tolist())
+            team_name   = st.selectbox("Equipe", teams["name"].tolist() if not teams.empty else ["Solo"])
+            region_name = st.selectbox("Região", regions["name"].tolist() if not regions.empty else ["Geral"])
+        with col2:
+            service_name = st.selectbox("Tipo de Serviço", services["name"].tolist())
+            quantity     = st.number_input("Quantidade", min_value=0.0, value=1.0, step=1.0)
+            default_unit = float(services.loc[services["name"] == service_name, "default_unit_value"].iloc[0])
+            unit_value   = st.number_input("Valor Unitário (R$)", min_value=0.0, value=default_unit, step=1.0)
+        notes     = st.text_area("Observação (opcional)")
+        submitted = st.form_submit_button("Salvar", use_container_width=True)
+        if submitted:
+            tech_id    = int(techs.loc[techs["name"] == tech_name, "id"].iloc[0])
+            team_id    = int(teams.loc[teams["name"] == team_name, "id"].iloc[0]) if not teams.empty else None
+            region_id  = int(regions.loc[regions["name"] == region_name, "id"].iloc[0]) if not regions.empty else None
+            service_id = int(services.loc[services["name"] == service_name, "id"].iloc[0])
+            cur = conn.execute("""INSERT INTO entries(company_id, entry_date, technician_id, team_id, region_id,
+                                service_type_id, quantity, unit_cents, notes, created_at)
+                            VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                         (u.company_id, entry_date.isoformat(), tech_id, team_id, region_id, service_id,
+                          float(quantity), to_cents(unit_value), notes.strip() if notes else None,
+                          dt.datetime.utcnow().isoformat()))
+            flags = anomaly.record(conn, u.company_id, cur.lastrowid, tech_id, service_id, float(quantity), float(unit_value))
+            if flags: st.session_state["entry_flash"] = f"Lançamento salvo, mas fora do padrão do técnico — enviado para revisão: {anomaly.describe(flags)}"
+            yms = mark_dirty(conn, u.company_id, [entry_date])
+            change = hotstore.stage(conn, u.company_id, [cur.lastrowid], yms)
+            conn.commit(); notify_dirty(u.company_id, yms, change)
+            st.success("Lançamento salvo!"); st.rerun()
+
+    st.subheader("Lançamentos do dia")
+    df = fetch_df(conn, """
+        SELECT e.id, e.entry_date AS Data, t.name AS Tecnico, tm.name AS Equipe,
+               r.name AS Regiao, st.name AS Servico,
+               e.quantity AS Qtd, e.unit_cents / 100.0 AS ValorUnit,
+               e.revenue_cents, e.revenue_cents / 100.0 AS Receita,
+               COALESCE(e.notes,'') AS Observacao
+        FROM entries e
+        JOIN technicians t    ON t.id  = e.technician_id
+        LEFT JOIN teams tm    ON tm.id = e.team_id
+        LEFT JOIN regions r   ON r.id  = e.region_id
+        JOIN service_types st ON st.id = e.service_type_id
+        WHERE e.company_id=? AND e.entry_date=?
+        ORDER BY e.id DESC
+    """, (u.company_id, entry_date.isoformat()))
+
+    if df.empty:
+        st.info("Nenhum lançamento para esta data ainda.")
+        return
+
+    st.dataframe(df.drop(columns=["id", "revenue_cents"]), use_container_width=True, hide_index=True)
+    total_rev = int(df["revenue_cents"].sum()) / 100
+    total_srv = df["Qtd"].sum()
+    st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Totais do dia</div>"
+                f"<div class='techno-value'>{total_srv:.0f} serviços • R$ {total_rev:,.2f}</div></div>", unsafe_allow_html=True)
+
+    with st.expander("✏️ Editar lançamento"):
+        edit_id = st.selectbox("Selecione o lançamento para editar", df["id"].tolist(),
+                               format_func=lambda x: f"ID {x} — {df.loc[df['id']==x,'Tecnico'].values[0]} | {df.loc[df['id']==x,'Servico'].values[0]} | Qtd {df.loc[df['id']==x,'Qtd'].values[0]:.0f}")
+        row_edit = fetch_one(conn, """SELECT e.*, e.unit_cents / 100.0 AS unit_value, t.name as tech_name, tm.name as team_name,
+                   r.name as region_name, st.name as service_name
+            FROM entries e JOIN technicians t ON t.id=e.technician_id
+            LEFT JOIN teams tm ON tm.id=e.team_id LEFT JOIN regions r ON r.id=e.region_id
+            JOIN service_types st ON st.id=e.service_type_id
+            WHERE e.id=? AND e.company_id=?""", (int(edit_id), u.company_id))
+        if row_edit:
+            with st.form("edit_entry_form"):
+                ec1, ec2 = st.columns(2)
+                with ec1:
+                    e_tech = st.selectbox("Técnico", techs["name"].tolist(),
+                                          index=techs["name"].tolist().index(row_edit["tech_name"]) if row_edit["tech_name"] in techs["name"].tolist() else 0)
+                    e_team_list = teams["name"].tolist() if not teams.empty else ["Solo"]
+                    e_team = st.selectbox("Equipe", e_team_list,
+                                          index=e_team_list.index(row_edit["team_name"]) if row_edit["team_name"] in e_team_list else 0)
+                    e_region_list = regions["name"].tolist() if not regions.empty else ["Geral"]
+                    e_region = st.selectbox("Região", e_region_list,
+                                            index=e_region_list.index(row_edit["region_name"]) if row_edit["region_name"] in e_region_list else 0)
+                with ec2:
+                    e_svc_list = services["name"].tolist()
+                    e_service = st.selectbox("Tipo de Serviço", e_svc_list,
+                                             index=e_svc_list.index(row_edit["service_name"]) if row_edit["service_name"] in e_svc_list else 0)
+                    e_qty  = st.number_input("Quantidade", min_value=0.0, value=float(row_edit["quantity"]), step=1.0)
+                    e_unit = st.number_input("Valor Unitário (R$)", min_value=0.0, value=float(row_edit["unit_value"]), step=1.0)
+                e_notes   = st.text_area("Observação", value=row_edit["notes"] or "")
+                save_edit = st.form_submit_button("💾 Salvar alterações", use_container_width=True)
+                if save_edit:
+                    e_tech_id    = int(techs.loc[techs["name"] == e_tech, "id"].iloc[0])
+                    e_team_id    = int(teams.loc[teams["name"] == e_team, "id"].iloc[0]) if not teams.empty else None
+                    e_region_id  = int(regions.loc[regions["name"] == e_region, "id"].iloc[0]) if not regions.empty else None
+                    e_service_id = int(services.loc[services["name"] == e_service, "id"].iloc[0])
+                    anomaly.forget(conn, u.company_id, int(edit_id), row_edit["technician_id"], row_edit["service_type_id"],
+                                   row_edit["quantity"], row_edit["unit_value"])
+                    conn.execute("""UPDATE entries SET technician_id=?, team_id=?, region_id=?,
+                                        service_type_id=?, quantity=?, unit_cents=?, notes=?
+                                    WHERE id=? AND company_id=?""",
+                                 (e_tech_id, e_team_id, e_region_id, e_service_id,
+                                  float(e_qty), to_cents(e_unit), e_notes.strip() if e_notes else None,
+                                  int(edit_id), u.company_id))
+                    flags = anomaly.record(conn, u.company_id, int(edit_id), e_tech_id, e_service_id, float(e_qty), float(e_unit))
+                    if flags: st.session_state["entry_flash"] = f"Alteração salva, mas fora do padrão — enviada para revisão: {anomaly.describe(flags)}"
+                    yms = mark_dirty(conn, u.company_id, [row_edit["entry_date"]])
+                    change = hotstore.stage(conn, u.company_id, [int(edit_id)], yms)
+                    conn.commit(); notify_dirty(u.company_id, yms, change)
+                    st.success("Atualizado!"); st.rerun()
+
+    with st.expander("🗑️ Excluir lançamento"):
+        del_id = st.selectbox("Selecione o ID para excluir", df["id"].tolist(), format_func=lambda x: f"ID {x}")
+        if st.button("Excluir", type="secondary"):
+            old = fetch_one(conn, "SELECT technician_id, service_type_id, quantity, unit_cents / 100.0 FROM entries WHERE company_id=? AND id=?",
+                            (u.company_id, int(del_id)))
+            if old: anomaly.forget(conn, u.company_id, int(del_id), *tuple(old))
+            conn.execute("DELETE FROM entries WHERE company_id=? AND id=?", (u.company_id, int(del_id)))
+            yms = mark_dirty(conn, u.company_id, [entry_date])
+            change = hotstore.stage(conn, u.company_id, [int(del_id)], yms)
+            conn.commit(); notify_dirty(u.company_id, yms, change)
+            st.success("Excluído."); st.rerun()
@@ -0,0 +1,289 @@
+import json
+import math
+import datetime as dt
+import streamlit as st
+from aggregates import get_aggregate
+from core import get_forecaster, get_hot_store, get_page_loader, get_recompute_worker, get_user, require_login
+from pageload import SECTION_TIMEOUT_S
+from workcal import get_calendar
+
+# ==============================
+# DASHBOARD — LEITURAS (threads do pool de leitura, conexão somente leitura)
+# ==============================
+def _load_mes(conn, hot, company_id, today):
+    """Totais do mês corrente (colunas em memória — hotstore) e metas do mês."""
+    goal = conn.execute("SELECT goal_value, goal_ativ_day, goal_manu_day FROM monthly_goals WHERE company_id=? AND year=? AND month=?",
+                        (company_id, today.year, today.month)).fetchone()
+    return {"agg": hot.dashboard(company_id), "goal": tuple(map(float, goal)) if goal else (0.0, 0.0, 0.0)}
+
+def _load_calendario(conn, forecaster, company_id, today):
+    """Dias úteis do mês e o ajuste da projeção (forecast.py)."""
+    return {"cal": get_calendar(conn, company_id).month_stats(today.year, today.month, today),
+            "ajuste": forecaster.get(conn, company_id, today)}
+
+def _load_evolucao(conn, company_id, today):
+    """Receita (agregado pré-calculado) e meta dos últimos 6 meses; o mês corrente vem da seção 'mes'."""
+    meses = []
+    for i in range(5, -1, -1):
+        m, y = today.month - i, today.year
+        while m <= 0:
+            m += 12; y -= 1
+        meses.append((y, m))
+    metas = {(y, m): float(v) for y, m, v in conn.execute(
+        "SELECT year, month, goal_value FROM monthly_goals WHERE company_id=? AND year * 100 + month BETWEEN ? AND ?",
+        (company_id, meses[0][0] * 100 + meses[0][1], today.year * 100 + today.month))}
+    misses   = []
+    receitas = {(y, m): float(get_aggregate(conn, company_id, f"{y:04d}-{m:02d}", "dashboard", misses)["receita"])
+                for y, m in meses[:-1]}
+    return {"meses": meses, "metas": metas, "receitas": receitas, "misses": misses}
+
+# ==============================
+# DASHBOARD — SEÇÕES (thread da sessão)
+# ==============================
+def _projecao(today, data):
+    """Projeção: modelo por dia da semana e técnicos em campo (forecast.py); None sem histórico (usa ritmo médio)."""
+    ajuste = data.get("calendario", {}).get("ajuste")
+    return ajuste.project(data["mes"]["agg"]["receita"], today.day) if ajuste else None
+
+def _gauge_html(pct, cor, titulo, status, label):
+    arco = min(max(pct, 0), 100)
+    circ = math.pi * 70
+    dash_val = arco / 100 * circ
+    dash_rem = circ - dash_val
+    return f"""
+    <div style="background:#1a1a2e;border-radius:18px;padding:20px 16px 12px;text-align:center;border:1px solid rgba(255,255,255,0.08);">
+        <div style="font-size:0.9rem;color:#ccc;margin-bottom:8px;font-weight:600;">{titulo}</div>
+        <svg viewBox="0 0 180 100" width="200" height="115">
+            <path d="M 20 90 A 70 70 0 0 1 160 90" fill="none" stroke="#2a2a3e" stroke-width="16" stroke-linecap="round"/>
+            <path d="M 20 90 A 70 70 0 0 1 160 90" fill="none" stroke="{cor}" stroke-width="16" stroke-linecap="round"
+                  stroke-dasharray="{dash_val:.1f} {dash_rem:.1f}"/>
+            <text x="90" y="82" text-anchor="middle" font-size="22" font-weight="700" fill="white">{pct:.0f}%</text>
+        </svg>
+        <div style="font-size:0.85rem;font-weight:600;color:{cor};margin-top:4px;">{status}</div>
+        <div style="font-size:0.75rem;color:#aaa;margin-top:6px;line-height:1.5;">{label}</div>
+    </div>"""
+
+def _cards(today, data):
+    agg = data["mes"]["agg"]
+    total_services, total_revenue = agg["por_dia"].get(today.isoformat(), [0, 0])
+    m_revenue  = agg["receita"]
+    goal_value = data["mes"]["goal"][0]
+
+    c1, c2, c3, c4 = st.columns(4)
+    with c1: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Serviços hoje</div><div class='techno-value'>{total_services:.0f}</div></div>", unsafe_allow_html=True)
+    with c2: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Receita hoje</div><div class='techno-value'>R$ {total_revenue:,.2f}</div></div>", unsafe_allow_html=True)
+    with c3: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Receita do mês</div><div class='techno-value'>R$ {m_revenue:,.2f}</div></div>", unsafe_allow_html=True)
+    with c4:
+        if goal_value > 0:
+            pct = m_revenue / goal_value * 100
+            st.markdown(f"<div class='techno-card'><div class='techno-kpi'>% Meta Faturamento</div><div class='techno-value'>{pct:.0f}%</div></div>", unsafe_allow_html=True)
+        else:
+            st.markdown("<div class='techno-card'><div class='techno-kpi'>Meta do mês</div><div class='techno-value'>—</div></div>", unsafe_allow_html=True)
+
+def _gauges(today, data):
+    agg = data["mes"]["agg"]
+    m_revenue = agg["receita"]
+    goal_value, goal_ativ_day, goal_manu_day = data["mes"]["goal"]
+    cal_mes              = data["calendario"]["cal"]
+    total_uteis          = cal_mes["total"]
+    dias_restantes_uteis = cal_mes["restantes"]
+    dias_trabalhados     = agg["dias"]
+    projecao             = _projecao(today, data)
+
+    # Gauge 1 — Faturamento
+    if goal_value > 0 and total_uteis > 0:
+        meta_dia_fat     = goal_value / total_uteis
+        receita_esperada = meta_dia_fat * max(dias_trabalhados, 1)
+        pct_fat          = min(m_revenue / receita_esperada * 100, 200) if receita_esperada > 0 else 0
+        ritmo_atual      = m_revenue / dias_trabalhados if dias_trabalhados > 0 else 0
+        projecao_fim     = projecao["projecao"] if projecao else m_revenue + ritmo_atual * dias_restantes_uteis
+        faixa            = (f" ({projecao_fim / goal_value * 100:.0f}% da meta)<br>"
+                            f"Faixa 90%: R$ {projecao['min']:,.0f} – R$ {projecao['max']:,.0f}") if projecao else ""
+        if pct_fat >= 95:   cor_fat, status_fat = "#2ecc71", "No alvo 🟢"
+        elif pct_fat >= 75: cor_fat, status_fat = "#f39c12", "Atenção 🟠"
+        else:               cor_fat, status_fat = "#e74c3c", "Abaixo 🔴"
+        label_fat = (f"R$ {m_revenue:,.0f} / R$ {receita_esperada:,.0f} esperado<br>"
+                     f"Projeção fim do mês: R$ {projecao_fim:,.0f}{faixa}<br>"
+                     f"Dias trabalhados: {dias_trabalhados} | Meta/dia: R$ {meta_dia_fat:,.0f}")
+    else:
+        pct_fat, cor_fat, status_fat = 0, "#555", "Meta não configurada"
+        label_fat = "Configure a meta em Administração → Meta Mensal"
+
+    # Gauge 2 — Ativações
+    if goal_ativ_day > 0:
+        ativ_total = float(agg["por_categoria"].get("ativacao", 0))
+        media_ativ = ativ_total / dias_trabalhados if dias_trabalhados > 0 else 0
+        pct_ativ   = min(media_ativ / goal_ativ_day * 100, 200)
+        if pct_ativ >= 95:   cor_ativ, status_ativ = "#2ecc71", "No alvo 🟢"
+        elif pct_ativ >= 75: cor_ativ, status_ativ = "#f39c12", "Atenção 🟠"
+        else:                cor_ativ, status_ativ = "#e74c3c", "Abaixo 🔴"
+        label_ativ = (f"Média atual: {media_ativ:.1f}/dia | Meta: {goal_ativ_day:.1f}/dia<br>"
+                      f"Total acumulado: {ativ_total:.0f} ativações<br>"
+                      f"Dias trabalhados: {dias_trabalhados} de {total_uteis} úteis")
+    else:
+        pct_ativ, cor_ativ, status_ativ = 0, "#555", "Meta não configurada"
+        label_ativ = "Configure a meta em Administração → Meta Mensal"
+
+    # Gauge 3 — Manutenções
+    if goal_manu_day > 0:
+        manu_total = float(agg["por_categoria"].get("manutencao", 0))
+        media_manu = manu_total / dias_trabalhados if dias_trabalhados > 0 else 0
+        pct_manu   = min(media_manu / goal_manu_day * 100, 200)
+        if pct_manu >= 95:   cor_manu, status_manu = "#2ecc71", "No alvo 🟢"
+        elif pct_manu >= 75: cor_manu, status_manu = "#f39c12", "Atenção 🟠"
+        else:                cor_manu, status_manu = "#e74c3c", "Abaixo 🔴"
+        label_manu = (f"Média atual: {media_manu:.1f}/dia | Meta: {goal_manu_day:.1f}/dia<br>"
+                      f"Total acumulado: {manu_total:.0f} manutenções<br>"
+                      f"Dias trabalhados: {dias_trabalhados} de {total_uteis} úteis")
+    else:
+        pct_manu, cor_manu, status_manu = 0, "#555", "Meta não configurada"
+        label_manu = "Configure a meta em Administração → Meta Mensal"
+
+    g1, g2, g3 = st.columns(3)
+    with g1: st.markdown(_gauge_html(pct_fat,  cor_fat,  "💰 Meta de Faturamento", status_fat,  label_fat),  unsafe_allow_html=True)
+    with g2: st.markdown(_gauge_html(pct_ativ, cor_ativ, "⚡ Meta de Ativações",   status_ativ, label_ativ), unsafe_allow_html=True)
+    with g3: st.markdown(_gauge_html(pct_manu, cor_manu, "🔧 Meta de Manutenções", status_manu, label_manu), unsafe_allow_html=True)
+
+def _evolucao(today, data):
+    ev       = data["evolucao"]
+    projecao = _projecao(today, data)
+    meses_labels  = []
+    meses_valores = []
+    meses_metas   = []
+    meses_proj    = []
+    meses_faixa   = []
+    for y, m in ev["meses"]:
+        atual = (y, m) == (today.year, today.month)
+        val   = data["mes"]["agg"]["receita"] if atual else ev["receitas"][(y, m)]
+        meses_labels.append(f"{m:02d}/{y}")
+        meses_valores.append(round(val, 2))
+        meses_metas.append(round(ev["metas"].get((y, m), 0.0), 2))
+        atual = atual and projecao is not None
+        meses_proj.append(round(projecao["projecao"], 2) if atual else None)
+        meses_faixa.append([round(projecao["min"], 2), round(projecao["max"], 2)] if atual else None)
+
+    chart_evolucao = f"""
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
+    <div style="background:#1a1a2e;border-radius:16px;padding:24px;">
+      <canvas id="chartEvolucao" height="80"></canvas>
+    </div>
+    <script>
+    new Chart(document.getElementById('chartEvolucao').getContext('2d'), {{
+      type: 'bar',
+      data: {{
+        labels: {json.dumps(meses_labels)},
+        datasets: [
+          {{
+            label: 'Faturamento (R$)',
+            data: {json.dumps(meses_valores)},
+            backgroundColor: 'rgba(126,45,127,0.75)',
+            borderColor: '#A64D9A',
+            borderWidth: 2,
+            borderRadius: 8,
+          }},
+          {{
+            label: 'Faixa da projeção 90% (R$)',
+            data: {json.dumps(meses_faixa)},
+            backgroundColor: 'rgba(46,204,113,0.18)',
+            borderColor: 'rgba(46,204,113,0.6)',
+            borderWidth: 1,
+            borderRadius: 8,
+            borderSkipped: false,
+          }},
+          {{
+            label: 'Projeção fim do mês (R$)',
+            data: {json.dumps(meses_proj)},
+            type: 'line',
+            showLine: false,
+            borderColor: '#2ecc71',
+            pointBackgroundColor: '#2ecc71',
+            pointStyle: 'rectRot',
+            pointRadius: 7,
+          }},
+          {{
+            label: 'Meta (R$)',
+            data: {json.dumps(meses_metas)},
+            type: 'line',
+            borderColor: '#FFC107',
+            backgroundColor: 'transparent',
+            borderWidth: 2,
+            borderDash: [6,3],
+            pointBackgroundColor: '#FFC107',
+            pointRadius: 5,
+            fill: false,
+            tension: 0.3,
+          }}
+        ]
+      }},
+      options: {{
+        responsive: true,
+        plugins: {{
+          legend: {{ labels: {{ color:'#fff', font:{{ size:13 }} }} }},
+          tooltip: {{
+            callbacks: {{
+              label: ctx => {{
+                const brl = v => 'R$ ' + v.toLocaleString('pt-BR', {{minimumFractionDigits:2}});
+                const r = ctx.raw;
+                return ctx.dataset.label + ': ' + (Array.isArray(r) ? brl(r[0]) + ' – ' + brl(r[1]) : brl(ctx.parsed.y));
+              }}
+            }}
+          }}
+        }},
+        scales: {{
+          x: {{ ticks:{{ color:'#ccc', font:{{ size:13 }} }}, grid:{{ color:'rgba(255,255,255,0.05)' }} }},
+          y: {{ beginAtZero:true, ticks:{{ color:'#ccc', font:{{ size:13 }},
+                callback: v => 'R$ ' + v.toLocaleString('pt-BR') }},
+                grid:{{ color:'rgba(255,255,255,0.08)' }} }}
+        }}
+      }}
+    }});
+    </script>
+    """
+    st.components.v1.html(chart_evolucao, height=360)
+
+# ==============================
+# DASHBOARD
+# ==============================
+# seção da página → (leituras obrigatórias, leituras opcionais, desenho)
+SECTIONS = {
+    "cards":    (("mes",),               (),              _cards),
+    "gauges":   (("mes", "calendario"),  (),              _gauges),
+    "evolucao": (("mes", "evolucao"),    ("calendario",), _evolucao),
+}
+
+def page_dashboard():
+    require_login()
+    u     = get_user()
+    today = dt.date.today()
+    st.header("Painel")
+
+    # Placeholders na ordem final; cada seção é desenhada assim que as leituras dela chegam (pageload.py)
+    slots = {"cards": st.empty()}
+    st.divider()
+    slots["gauges"] = st.empty()
+    st.divider()
+    st.subheader("📈 Evolução do Faturamento — Últimos 6 Meses")
+    slots["evolucao"] = st.empty()
+    for slot in slots.values(): slot.caption("⏳ Carregando...")
+
+    hot, forecaster, cid = get_hot_store(), get_forecaster(), u.company_id
+    loads = {
+        "mes":        lambda conn: _load_mes(conn, hot, cid, today),
+        "calendario": lambda conn: _load_calendario(conn, forecaster, cid, today),
+        "evolucao":   lambda conn: _load_evolucao(conn, cid, today),
+    }
+    data, failed, todo = {}, {}, dict(SECTIONS)
+    for sec in get_page_loader().load("Painel", loads, {"evolucao": 2 * SECTION_TIMEOUT_S}):
+        if sec.ok: data[sec.name] = sec.value
+        else:      failed[sec.name] = sec.error
+        for name, (need, want, draw) in list(todo.items()):
+            if any(n in failed for n in need):
+                slots[name].warning("Não foi possível carregar esta seção (" + "; ".join(failed[n] for n in need if n in failed)
+                                    + "). Atualize a página.")
+            elif all(n in data for n in need) and all(w in data or w in failed for w in want):
+                with slots[name].container(): draw(today, data)
+            else:
+                continue
+            del todo[name]
+    if data.get("evolucao", {}).get("misses"):       # agregados desatualizados: o worker grava (leitura aqui é somente leitura)
+        get_recompute_worker().notify(cid, data["evolucao"]["misses"])
@@ -0,0 +1,102 @@
+import calendar
+import datetime as dt
+import pandas as pd
+import streamlit as st
+from aggregates import get_aggregate
+from core import get_conn, get_hot_store, get_user, require_login
+from goals import get_rules
+from views.perf import _render_cards
+
+# ==============================
+# INDICADORES — visão gestão (todos)
+# ==============================
+def page_technician_kpis():
+    require_login()
+    u     = get_user()
+    today = dt.date.today()
+    st.header("Indicadores dos Técnicos")
+
+    year  = st.number_input("Ano", min_value=2020, max_value=2100, value=today.year,  step=1, key="iy")
+    month = st.number_input("Mês", min_value=1,    max_value=12,   value=today.month, step=1, key="im")
+    ym    = f"{int(year):04d}-{int(month):02d}"
+
+    conn = get_conn()
+    hot       = get_hot_store()
+    perf_data = hot.kpis(conn, u.company_id, ym) if hot.is_open(ym) else get_aggregate(conn, u.company_id, ym, "kpis")
+    if not perf_data: st.info("Sem dados para este mês."); return
+
+    st.subheader("🚦 Desempenho por Técnico")
+    fim_mes = dt.date(int(year), int(month), calendar.monthrange(int(year), int(month))[1])
+    st.caption(get_rules(conn, u.company_id).describe(min(today, fim_mes)))
+    _render_cards(perf_data, show_receita=True)
+
+    st.divider()
+    st.subheader("📊 Comparativo — Ativação & Manutenção por Técnico")
+
+    import json
+    nomes       = [p["Tecnico"]                 for p in perf_data]
+    medias_ativ = [round(p["MediaAtiv"], 2)     for p in perf_data]
+    metas_ativ  = [round(p["MetaAtivMedia"], 2) for p in perf_data]
+    medias_manu = [round(p["MediaManu"], 2)     for p in perf_data]
+    metas_manu  = [round(p["MetaManuMedia"], 2) for p in perf_data]
+    def hc(p, k):
+        c = p[k]
+        return "#2ecc71" if c=="kpi-green" else "#f39c12" if c=="kpi-orange" else "#e74c3c"
+    cores_ativ = [hc(p,"CorAtiv") for p in perf_data]
+    cores_manu_rgba = ["rgba(100,160,255,0.85)" if p["CorManu"]=="kpi-green" else "rgba(255,150,50,0.85)" if p["CorManu"]=="kpi-orange" else "rgba(220,60,60,0.85)" for p in perf_data]
+    cores_manu_border = ["#64a0ff" if p["CorManu"]=="kpi-green" else "#ff9632" if p["CorManu"]=="kpi-orange" else "#dc3c3c" for p in perf_data]
+
+    chart_html = f"""
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
+    <div style="background:#1a1a2e;border-radius:16px;padding:24px;">
+      <canvas id="kpiUnified" height="100"></canvas>
+    </div>
+    <script>
+    new Chart(document.getElementById('kpiUnified').getContext('2d'), {{
+      type:'bar',
+      data:{{
+        labels:{json.dumps(nomes)},
+        datasets:[
+          {{ label:'⚡ Ativação média/dia', data:{json.dumps(medias_ativ)},
+             backgroundColor:{json.dumps(cores_ativ)}, borderColor:{json.dumps(cores_ativ)},
+             borderWidth:2, borderRadius:6, barPercentage:0.4, categoryPercentage:0.8 }},
+          {{ label:'🔧 Manutenção média/dia', data:{json.dumps(medias_manu)},
+             backgroundColor:{json.dumps(cores_manu_rgba)}, borderColor:{json.dumps(cores_manu_border)},
+             borderWidth:2, borderRadius:6, barPercentage:0.4, categoryPercentage:0.8 }},
+          {{ label:'Meta Ativação', data:{json.dumps(metas_ativ)}, type:'line',
+             borderColor:'#FFC107', backgroundColor:'transparent', borderWidth:2,
+             borderDash:[6,3], pointBackgroundColor:'#FFC107', pointRadius:5, fill:false, tension:0.3 }},
+          {{ label:'Meta Manutenção', data:{json.dumps(metas_manu)}, type:'line',
+             borderColor:'#a78bfa', backgroundColor:'transparent', borderWidth:2,
+             borderDash:[4,4], pointBackgroundColor:'#a78bfa', pointRadius:5, fill:false, tension:0.3 }}
+        ]
+      }},
+      options:{{
+        responsive:true, interaction:{{mode:'index',intersect:false}},
+        plugins:{{ legend:{{ labels:{{ color:'#fff', font:{{ size:12 }}, padding:16 }} }},
+                   tooltip:{{ callbacks:{{ label: ctx => ctx.dataset.label+': '+ctx.parsed.y.toFixed(2) }} }} }},
+        scales:{{
+          x:{{ ticks:{{ color:'#ccc', font:{{ size:13 }} }}, grid:{{ color:'rgba(255,255,255,0.05)' }} }},
+          y:{{ beginAtZero:true, ticks:{{ color:'#ccc', font:{{ size:13 }} }}, grid:{{ color:'rgba(255,255,255,0.08)' }} }}
+        }}
+      }}
+    }});
+    </script>"""
+    st.components.v1.html(chart_html, height=400)
+
+    st.divider()
+    st.subheader("📋 Tabela Detalhada")
+    df_show = pd.DataFrame([{
+        "Técnico":          p["Tecnico"],
+        "Status Ativ":      p["SemAtiv"]+" "+p["StAtiv"],
+        "Média Ativ/Dia":   round(p["MediaAtiv"],2),
+        "Meta Ativ/Dia":    round(p["MetaAtivMedia"],1),
+        "% Meta Ativ":      f"{p['PctAtiv']:.0f}%",
+        "Status Manu":      p["SemManu"]+" "+p["StManu"],
+        "Média Manu/Dia":   round(p["MediaManu"],2),
+        "Meta Manu/Dia":    round(p["MetaManuMedia"],1),
+        "% Meta Manu":      f"{p['PctManu']:.0f}%",
+        "Dias Trabalhados": p["DiasTrabalh"],
+        "Receita (R$)":     round(p["ReceitaGerada"],2),
+    } for p in perf_data])
+    st.dataframe(df_show, use_container_width=True, hide_index=True)
@@ -0,0 +1,13 @@
+import streamlit as st
+from kpi import card_html
+from kpi import _calc_perf_tecnico  # noqa: F401 — reexportado para views/tech_self
+
+# ==============================
+# INDICADORES — cards
+# ==============================
+def _render_cards(perf_data, show_receita=True):
+    n_cols = min(len(perf_data), 3)
+    cols   = st.columns(n_cols)
+    for i, p in enumerate(perf_data):
+        with cols[i % n_cols]:
+            st.markdown(card_html(p, show_receita), unsafe_allow_html=True)
@@ -0,0 +1,88 @@
+import datetime as dt
+import pandas as pd
+import streamlit as st
+import olap
+from core import get_conn, get_user, require_login
+from queries import technician_trend, trend_bounds
+
+# ==============================
+# INDICADORES — ranking e tendência (vários meses)
+# ==============================
+def page_technician_ranking():
+    require_login()
+    u     = get_user()
+    today = dt.date.today()
+    st.header("Ranking e Tendência dos Técnicos")
+
+    c1, c2, c3 = st.columns(3)
+    with c1: year  = st.number_input("Ano",  min_value=2020, max_value=2100, value=today.year,  step=1, key="ry")
+    with c2: month = st.number_input("Mês",  min_value=1,    max_value=12,   value=today.month, step=1, key="rm")
+    with c3: n     = st.slider("Meses", min_value=2, max_value=24, value=6, key="rn")
+    criterio = st.radio("Classificar por", ["Receita", "Produtividade (serviços/dia)"], horizontal=True)
+    pos, dpos = ("pos_receita", "dpos_receita") if criterio == "Receita" else ("pos_prod", "dpos_prod")
+
+    ini, fim, _ = trend_bounds(int(year), int(month), int(n))
+    df = technician_trend(olap.reader(get_conn(), u.company_id, ini, fim), u.company_id, int(year), int(month), int(n))
+    if df.empty: st.info("Sem dados para o período."); return
+
+    ultimo = str(df["mes"].astype(str).max())
+    atual  = df[df["mes"] == ultimo].sort_values(pos)
+
+    def seta(v, fmt="{:+.2f}"):
+        if pd.isna(v): return "—"
+        return ("▲ " if v > 0 else "▼ " if v < 0 else "= ") + fmt.format(v)
+
+    st.subheader(f"🏆 Ranking — {ultimo[5:]}/{ultimo[:4]}")
+    st.dataframe(pd.DataFrame({
+        "Posição":         atual[pos].to_numpy(),
+        "Δ Posição":       [seta(v, "{:+.0f}") for v in atual[dpos]],
+        "Técnico":         atual["tecnico"].astype(str).to_numpy(),
+        "Ativ/Dia":        atual["ativ_dia"].round(2).to_numpy(),
+        "Δ Ativ/Dia":      [seta(v) for v in atual["d_ativ_dia"]],
+        "Ativ/Dia (3m)":   atual["ativ_dia_3m"].round(2).to_numpy(),
+        "Manu/Dia":        atual["manu_dia"].round(2).to_numpy(),
+        "Δ Manu/Dia":      [seta(v) for v in atual["d_manu_dia"]],
+        "Manu/Dia (3m)":   atual["manu_dia_3m"].round(2).to_numpy(),
+        "Receita (R$)":    atual["receita"].round(2).to_numpy(),
+        "Δ Receita (R$)":  [seta(v, "{:+,.0f}") for v in atual["d_receita"]],
+        "Dias":            atual["dias"].to_numpy(),
+    }), use_container_width=True, hide_index=True)
+
+    st.divider()
+    st.subheader("📈 Evolução da posição (top 10 do último mês)")
+    top    = atual["tecnico"].astype(str).head(10).tolist()
+    pivot  = df.pivot_table(index="mes", columns="tecnico", values=pos, aggfunc="first", observed=True)
+    meses  = [str(m) for m in pivot.index]
+    cores  = ["#A64D9A", "#FFC107", "#2ecc71", "#64a0ff", "#e74c3c", "#a78bfa", "#f39c12", "#1abc9c", "#ff6b81", "#cccccc"]
+    import json
+    datasets = [{"label": t, "data": [None if pd.isna(v) else int(v) for v in pivot[t]] if t in pivot else [],
+                 "borderColor": cores[i % len(cores)], "backgroundColor": cores[i % len(cores)],
+                 "tension": 0.3, "spanGaps": True, "pointRadius": 4}
+                for i, t in enumerate(top)]
+    chart_rank = f"""
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
+    <div style="background:#1a1a2e;border-radius:16px;padding:24px;">
+      <canvas id="chartRank" height="100"></canvas>
+    </div>
+    <script>
+    new Chart(document.getElementById('chartRank').getContext('2d'), {{
+      type:'line',
+      data:{{ labels:{json.dumps([f"{m[5:]}/{m[:4]}" for m in meses])}, datasets:{json.dumps(datasets)} }},
+      options:{{
+        responsive:true,
+        plugins:{{ legend:{{ labels:{{ color:'#fff', font:{{ size:12 }} }} }} }},
+        scales:{{
+          x:{{ ticks:{{ color:'#ccc' }}, grid:{{ color:'rgba(255,255,255,0.05)' }} }},
+          y:{{ reverse:true, ticks:{{ color:'#ccc', precision:0 }}, grid:{{ color:'rgba(255,255,255,0.08)' }},
+               title:{{ display:true, text:'Posição', color:'#ccc' }} }}
+        }}
+      }}
+    }});
+    </script>"""
+    st.components.v1.html(chart_rank, height=380)
+
+    st.subheader("📋 Médias móveis de 3 meses por técnico")
+    m3 = df.assign(prod_3m=df["ativ_dia_3m"] + df["manu_dia_3m"]).pivot_table(
+        index="tecnico", columns="mes", values="prod_3m", aggfunc="first", observed=True)
+    m3.index.name = "Técnico"
+    st.dataframe(m3.round(2), use_container_width=True)
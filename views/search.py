@@ -0,0 +1,44 @@
+import html
+import time
+import datetime as dt
+import streamlit as st
+from core import get_conn, get_user, require_login
+from queries import HL_END, HL_START, search_notes
+
+# ==============================
+# BUSCA NAS OBSERVAÇÕES
+# ==============================
+MAX_RESULTS = 100
+
+def _highlight(trecho: str) -> str:
+    return html.escape(trecho or "").replace(HL_START, "<mark>").replace(HL_END, "</mark>")
+
+def page_search_notes():
+    require_login()
+    u     = get_user()
+    today = dt.date.today()
+    st.header("Busca nas Observações")
+    st.caption('Todas as palavras precisam aparecer. Use "aspas" para frase exata e * para prefixo '
+               '(ex.: cto-12*). Acentos e maiúsculas são ignorados.')
+
+    c1, c2 = st.columns([2, 1])
+    texto = c1.text_input("Buscar", placeholder="cliente, circuito, causa da falha…")
+    rng   = c2.date_input("Intervalo", value=(today - dt.timedelta(days=365), today))
+    if not isinstance(rng, (tuple, list)) or len(rng) != 2:
+        st.info("Selecione a data inicial e a final."); return
+    if not texto.strip(): return
+
+    t0 = time.perf_counter()
+    df = search_notes(get_conn(), u.company_id, texto, rng[0], rng[1], MAX_RESULTS)
+    ms = (time.perf_counter() - t0) * 1000
+    if df.empty:
+        st.info(f"Nenhuma observação encontrada ({ms:.0f} ms)."); return
+    mais = f" (mostrando os {MAX_RESULTS} mais relevantes)" if len(df) == MAX_RESULTS else ""
+    st.caption(f"{len(df)} resultado(s){mais} • {ms:.0f} ms")
+
+    for r in df.itertuples():
+        st.markdown(
+            f"<div class='techno-card' style='margin-bottom:8px;'>"
+            f"<div class='techno-kpi'>{r.Data:%d/%m/%Y} • {html.escape(str(r.Tecnico))} • {html.escape(str(r.Servico))}"
+            f" • {r.Qtd:g} un • R$ {r.Receita:,.2f} • #{r.id}</div>"
+            f"<div>{_highlight(r.Trecho)}</div></div>", unsafe_allow_html=True)
@@ -0,0 +1,127 @@
+import datetime as dt
+import pandas as pd
+import streamlit as st
+import olap
+import reports
+from core import get_conn, get_user, require_login
+from queries import GRANULARITIES, period_bounds, period_summary, prorated_goal
+
+# ==============================
+# RESUMO MENSAL
+# ==============================
+PERIODOS = {"Semana": "semana", "Mês": "mes", "Trimestre": "trimestre", "Ano": "ano", "Personalizado": "custom"}
+DETALHE   = {"semana": "dia", "mes": "semana", "trimestre": "mes", "ano": "mes", "custom": "mes"}
+
+def _period_label(granularity, p):
+    if granularity == "dia":       return dt.date.fromisoformat(p).strftime("%d/%m/%Y")
+    if granularity == "semana":    return "Sem. " + dt.date.fromisoformat(p).strftime("%d/%m/%Y")
+    if granularity == "mes":       return f"{p[5:7]}/{p[:4]}"
+    if granularity == "trimestre": return f"{p[5:]}/{p[:4]}"
+    return p
+
+def _report_downloads(conn, company_id, ym):
+    """Relatório de fechamento (HTML autocontido / PDF) servido do cache em disco."""
+    st.subheader(f"📄 Relatório de fechamento — {reports.month_label(ym)}")
+    nome = f"relatorio-{ym}"
+    if reports.cached_report(conn, company_id, ym):
+        data = reports.get_report(conn, company_id, ym)
+    elif st.button("Gerar relatório do mês"):
+        with st.spinner("Gerando relatório..."):
+            data = reports.get_report(conn, company_id, ym)
+    else:
+        st.caption("Ainda não gerado para a versão atual dos dados do mês."); return
+    c1, c2 = st.columns(2)
+    c1.download_button("⬇️ Baixar HTML", data, f"{nome}.html", "text/html")
+    if reports.weasyprint is None:
+        c2.caption("PDF indisponível neste servidor (pacote weasyprint).")
+    elif reports.cached_report(conn, company_id, ym, "pdf"):
+        c2.download_button("⬇️ Baixar PDF", reports.get_report(conn, company_id, ym, "pdf"), f"{nome}.pdf", "application/pdf")
+    elif c2.button("Gerar PDF"):
+        with st.spinner("Gerando PDF..."):
+            reports.get_report(conn, company_id, ym, "pdf")
+        st.rerun()
+
+def page_monthly_summary():
+    require_login()
+    u     = get_user()
+    today = dt.date.today()
+    st.header("Resumo por Período")
+
+    tipo = PERIODOS[st.radio("Período", list(PERIODOS), index=1, horizontal=True)]
+    if tipo == "semana":
+        ref = st.date_input("Semana de", value=today)
+        start, end = period_bounds("semana", ref)
+    elif tipo == "mes":
+        year  = st.number_input("Ano", min_value=2020, max_value=2100, value=today.year,  step=1)
+        month = st.number_input("Mês", min_value=1,    max_value=12,   value=today.month, step=1)
+        start, end = period_bounds("mes", dt.date(int(year), int(month), 1))
+    elif tipo == "trimestre":
+        year = st.number_input("Ano", min_value=2020, max_value=2100, value=today.year, step=1)
+        tri  = st.selectbox("Trimestre", [1, 2, 3, 4], index=(today.month - 1) // 3, format_func=lambda t: f"T{t}")
+        start, end = period_bounds("trimestre", dt.date(int(year), tri * 3, 1))
+    elif tipo == "ano":
+        year = st.number_input("Ano", min_value=2020, max_value=2100, value=today.year, step=1)
+        start, end = period_bounds("ano", dt.date(int(year), 1, 1))
+    else:
+        rng = st.date_input("Intervalo", value=(today.replace(day=1), today))
+        if not isinstance(rng, (tuple, list)) or len(rng) != 2:
+            st.info("Selecione a data inicial e a final."); return
+        start, end = rng
+
+    gran_opts = list(GRANULARITIES)
+    gran = st.selectbox("Detalhar por", gran_opts, index=gran_opts.index(DETALHE[tipo]),
+                        format_func=lambda g: {"dia": "Dia", "semana": "Semana", "mes": "Mês",
+                                               "trimestre": "Trimestre", "ano": "Ano"}[g])
+    st.caption(f"{start.strftime('%d/%m/%Y')} a {end.strftime('%d/%m/%Y')}")
+
+    conn = get_conn()
+    res  = period_summary(olap.reader(conn, u.company_id, start, end), u.company_id, start, end, gran)
+    if not res["periods"]: st.info("Sem dados para este período."); return
+
+    qtd, rec   = res["totals"]["qtd"], res["totals"]["receita"]
+    total_ativ = qtd.get("ativacao", 0.0)
+    total_manu = qtd.get("manutencao", 0.0)
+    total_srv  = qtd.get("total", 0.0)
+    rec_ativ   = rec.get("ativacao", 0.0)
+    rec_manu   = rec.get("manutencao", 0.0)
+    rec_total  = rec.get("total", 0.0)
+    n_dias     = res["totals"]["dias"]
+
+    goal_value = prorated_goal(conn, u.company_id, start, end)
+    pct        = (rec_total / goal_value * 100.0) if goal_value > 0 else None
+    avg_daily  = rec_total / n_dias if n_dias > 0 else 0.0
+
+    c1, c2, c3 = st.columns(3)
+    with c1: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Total ativações</div><div class='techno-value'>{total_ativ:.0f}</div></div>", unsafe_allow_html=True)
+    with c2: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Total manutenções</div><div class='techno-value'>{total_manu:.0f}</div></div>", unsafe_allow_html=True)
+    with c3: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Total serviços</div><div class='techno-value'>{total_srv:.0f}</div></div>", unsafe_allow_html=True)
+    st.divider()
+    c4, c5, c6 = st.columns(3)
+    with c4: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Receita ativações</div><div class='techno-value'>R$ {rec_ativ:,.2f}</div></div>", unsafe_allow_html=True)
+    with c5: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Receita manutenções</div><div class='techno-value'>R$ {rec_manu:,.2f}</div></div>", unsafe_allow_html=True)
+    with c6: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Receita bruta do período</div><div class='techno-value'>R$ {rec_total:,.2f}</div></div>", unsafe_allow_html=True)
+    st.divider()
+    cA, cB, cC = st.columns(3)
+    with cA: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Meta de receita (proporcional)</div><div class='techno-value'>R$ {goal_value:,.2f}</div></div>", unsafe_allow_html=True)
+    with cB:
+        v = f"{pct:.0f}%" if pct is not None else "—"
+        st.markdown(f"<div class='techno-card'><div class='techno-kpi'>% meta atingida</div><div class='techno-value'>{v}</div></div>", unsafe_allow_html=True)
+    with cC: st.markdown(f"<div class='techno-card'><div class='techno-kpi'>Receita média diária</div><div class='techno-value'>R$ {avg_daily:,.2f}</div></div>", unsafe_allow_html=True)
+
+    if len(res["periods"]) > 1:
+        st.divider()
+        st.subheader("📋 Detalhamento")
+        st.dataframe(pd.DataFrame([{
+            "Período":          _period_label(gran, p["period"]),
+            "Ativações":        round(p["qtd"].get("ativacao", 0.0)),
+            "Manutenções":      round(p["qtd"].get("manutencao", 0.0)),
+            "Serviços":         round(p["qtd"].get("total", 0.0)),
+            "Receita Ativ (R$)": round(p["receita"].get("ativacao", 0.0), 2),
+            "Receita Manu (R$)": round(p["receita"].get("manutencao", 0.0), 2),
+            "Receita (R$)":     round(p["receita"].get("total", 0.0), 2),
+            "Dias":             p["dias"],
+        } for p in res["periods"]]), use_container_width=True, hide_index=True)
+
+    if tipo == "mes" and end < today.replace(day=1):
+        st.divider()
+        _report_downloads(conn, u.company_id, f"{start:%Y-%m}")
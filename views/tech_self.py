@@ -0,0 +1,102 @@
+import datetime as dt
+import streamlit as st
+from core import fetch_one, get_conn, get_hot_store, get_user, require_login
+from goals import get_rules
+from views.perf import _calc_perf_tecnico, _render_cards
+
+# ==============================
+# INDICADORES — visão técnico (próprio)
+# ==============================
+def page_meu_indicador():
+    """Tela exclusiva para role=technician: vê só os próprios indicadores, sem receita."""
+    require_login()
+    u     = get_user()
+    today = dt.date.today()
+    conn  = get_conn()
+
+    # Descobre o nome do técnico pelo username (case-insensitive)
+    tech_row = fetch_one(conn,
+        "SELECT name FROM technicians WHERE company_id=? AND LOWER(name)=LOWER(?)",
+        (u.company_id, u.username))
+
+    if not tech_row:
+        st.warning(f"Nenhum técnico encontrado com o nome '{u.username}'. Peça ao administrador para verificar o cadastro.")
+        return
+
+    tech_name = tech_row["name"]
+    st.header(f"Meus Indicadores — {tech_name}")
+    st.caption(get_rules(conn, u.company_id).describe(today))
+
+    # Seletor: mês atual ou anterior
+    opcoes_mes = []
+    for i in range(2):
+        m = today.month - i
+        y = today.year
+        if m <= 0: m += 12; y -= 1
+        opcoes_mes.append((f"{m:02d}/{y}", y, m))
+
+    sel = st.radio("Mês", [o[0] for o in opcoes_mes], horizontal=True)
+    _, sel_y, sel_m = next(o for o in opcoes_mes if o[0] == sel)
+    ym = f"{sel_y:04d}-{sel_m:02d}"
+
+    p = _calc_perf_tecnico(conn, u.company_id, ym, tech_name, get_hot_store().kpis)
+
+    if p["DiasTrabalh"] == 0:
+        st.info("Sem lançamentos para este mês.")
+        return
+
+    # Card único sem receita
+    _render_cards([p], show_receita=False)
+
+    st.divider()
+
+    # Mini gráfico dos 2 últimos meses
+    import json
+    hist_labels, hist_ativ, hist_manu, hist_meta_ativ, hist_meta_manu = [], [], [], [], []
+    for i in range(1, -1, -1):
+        m = today.month - i
+        y = today.year
+        if m <= 0: m += 12; y -= 1
+        ym_h = f"{y:04d}-{m:02d}"
+        ph   = _calc_perf_tecnico(conn, u.company_id, ym_h, tech_name, get_hot_store().kpis)
+        hist_labels.append(f"{m:02d}/{y}")
+        hist_ativ.append(round(ph["MediaAtiv"], 2))
+        hist_manu.append(round(ph["MediaManu"], 2))
+        hist_meta_ativ.append(round(ph["MetaAtivMedia"], 2))
+        hist_meta_manu.append(round(ph["MetaManuMedia"], 2))
+
+    chart_tec = f"""
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
+    <div style="background:#1a1a2e;border-radius:16px;padding:24px;">
+      <canvas id="chartTec" height="120"></canvas>
+    </div>
+    <script>
+    new Chart(document.getElementById('chartTec').getContext('2d'), {{
+      type:'bar',
+      data:{{
+        labels:{json.dumps(hist_labels)},
+        datasets:[
+          {{ label:'⚡ Média Ativ/Dia', data:{json.dumps(hist_ativ)},
+             backgroundColor:'rgba(46,204,113,0.75)', borderColor:'#2ecc71', borderWidth:2, borderRadius:8 }},
+          {{ label:'🔧 Média Manu/Dia', data:{json.dumps(hist_manu)},
+             backgroundColor:'rgba(100,160,255,0.75)', borderColor:'#64a0ff', borderWidth:2, borderRadius:8 }},
+          {{ label:'Meta Ativ', data:{json.dumps(hist_meta_ativ)}, type:'line',
+             borderColor:'#FFC107', backgroundColor:'transparent', borderWidth:2,
+             borderDash:[6,3], pointBackgroundColor:'#FFC107', pointRadius:5, fill:false }},
+          {{ label:'Meta Manu', data:{json.dumps(hist_meta_manu)}, type:'line',
+             borderColor:'#a78bfa', backgroundColor:'transparent', borderWidth:2,
+             borderDash:[4,4], pointBackgroundColor:'#a78bfa', pointRadius:5, fill:false }}
+        ]
+      }},
+      options:{{
+        responsive:true,
+        plugins:{{ legend:{{ labels:{{ color:'#fff', font:{{ size:12 }} }} }} }},
+        scales:{{
+          x:{{ ticks:{{ color:'#ccc' }}, grid:{{ color:'rgba(255,255,255,0.05)' }} }},
+          y:{{ beginAtZero:true, ticks:{{ color:'#ccc' }}, grid:{{ color:'rgba(255,255,255,0.08)' }} }}
+        }}
+      }}
+    }});
+    </script>"""
+    st.subheader("📊 Evolução — Mês Atual vs Anterior")
+    st.components.v1.html(chart_tec, height=380)
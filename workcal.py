@@ -0,0 +1,141 @@
+"""Calendário de dias úteis por empresa (seg–sáb por padrão, feriados e fechamentos).
+
+Os dias úteis são contados com numpy.busday_count sobre um busdaycalendar
+montado uma vez por empresa/versão; os números de cada mês ficam em cache
+dentro do próprio calendário. Cada região tem o seu busdaycalendar (datas da
+empresa + as da região), escolhido pela região do lançamento.
+"""
+import datetime as dt
+import numpy as np
+import metrics
+
+DEFAULT_WEEKMASK = "1111110"          # seg..dom — domingo não é útil
+YEARS            = range(2020, 2041)  # janela dos feriados nacionais pré-calculados
+
+HOLIDAY_KINDS = {"nacional": "Nacional", "regional": "Regional", "fechamento": "Fechamento"}
+
+# ==============================
+# FERIADOS NACIONAIS
+# ==============================
+def _pascoa(year: int) -> dt.date:
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+def national_holidays(year: int) -> dict:
+    """Feriados nacionais (e Carnaval/Corpus Christi, que param as operações)."""
+    p = _pascoa(year)
+    out = {
+        dt.date(year, 1, 1):   "Confraternização Universal",
+        dt.date(year, 4, 21):  "Tiradentes",
+        dt.date(year, 5, 1):   "Dia do Trabalho",
+        dt.date(year, 9, 7):   "Independência",
+        dt.date(year, 10, 12): "Nossa Senhora Aparecida",
+        dt.date(year, 11, 2):  "Finados",
+        dt.date(year, 11, 15): "Proclamação da República",
+        dt.date(year, 12, 25): "Natal",
+        p - dt.timedelta(days=48): "Carnaval",
+        p - dt.timedelta(days=47): "Carnaval",
+        p - dt.timedelta(days=2):  "Sexta-feira Santa",
+        p + dt.timedelta(days=60): "Corpus Christi",
+    }
+    if year >= 2024:
+        out[dt.date(year, 11, 20)] = "Consciência Negra"
+    return out
+
+# ==============================
+# CALENDÁRIO
+# ==============================
+class BusinessCalendar:
+    def __init__(self, weekmask=DEFAULT_WEEKMASK, extra_holidays=(), regional=None):
+        """extra_holidays: datas da empresa toda; regional: região → datas só daquela região."""
+        self.extra    = list(extra_holidays)
+        self.regional = regional or {}
+        days = [d for y in YEARS for d in national_holidays(y)]
+        days.extend(self.extra)
+        self.weekmask = weekmask
+        self.cal      = np.busdaycalendar(weekmask=weekmask, holidays=np.array(days, dtype="datetime64[D]"))
+        self._months  = {}
+        self._regions = {}
+
+    def region(self, region_id) -> "BusinessCalendar":
+        """Calendário da região (empresa + feriados da região); o da empresa se a região não tem datas próprias."""
+        if region_id not in self.regional: return self
+        if region_id not in self._regions:
+            self._regions[region_id] = BusinessCalendar(self.weekmask, self.extra + self.regional[region_id])
+        return self._regions[region_id]
+
+    def is_workday_many(self, days, regions) -> np.ndarray:
+        """Dia útil de cada lançamento no calendário da sua região (region -1/None = empresa)."""
+        days    = np.asarray(days, dtype="datetime64[D]")
+        regions = np.asarray([-1 if r is None else r for r in regions], dtype=np.int64)
+        out     = np.zeros(len(days), dtype=bool)
+        for rid in np.unique(regions):
+            sel      = regions == rid
+            out[sel] = np.is_busday(days[sel], busdaycal=self.region(int(rid)).cal)
+        return out
+
+    def count(self, start: dt.date, end: dt.date) -> int:
+        """Dias úteis em [start, end] (ambos inclusive)."""
+        if end < start: return 0
+        return int(np.busday_count(start, end + dt.timedelta(days=1), busdaycal=self.cal))
+
+    def count_many(self, starts, ends) -> np.ndarray:
+        """Versão vetorizada de count: arrays de inícios e fins inclusivos."""
+        s = np.asarray(starts, dtype="datetime64[D]")
+        e = np.asarray(ends,   dtype="datetime64[D]") + np.timedelta64(1, "D")
+        return np.where(e > s, np.busday_count(s, e, busdaycal=self.cal), 0)
+
+    def is_workday(self, day: dt.date) -> bool:
+        return bool(np.is_busday(np.datetime64(day, "D"), busdaycal=self.cal))
+
+    def month(self, year: int, month: int) -> np.ndarray:
+        """Dias úteis do mês como datetime64[D] (cache por mês)."""
+        key = (year, month)
+        if key not in self._months:
+            first = np.datetime64(f"{year:04d}-{month:02d}", "M")
+            days  = np.arange(first, first + 1, dtype="datetime64[D]")
+            self._months[key] = days[np.is_busday(days, busdaycal=self.cal)]
+        return self._months[key]
+
+    def month_stats(self, year: int, month: int, today: dt.date) -> dict:
+        days    = self.month(year, month)
+        t       = np.datetime64(today, "D")
+        return {"total": int(days.size),
+                "passados": int((days <= t).sum()),
+                "restantes": int((days > t).sum())}
+
+_CACHE = {}
+
+def get_calendar(conn, company_id: int, region_id: int = None) -> BusinessCalendar:
+    """Calendário da empresa (ou da região); reconstruído só quando a versão gravada muda."""
+    row      = conn.execute("SELECT weekmask, version FROM company_calendar WHERE company_id=?", (company_id,)).fetchone()
+    weekmask = row[0] if row else DEFAULT_WEEKMASK
+    version  = row[1] if row else 0
+    key      = (company_id, version)
+    cal      = _CACHE.get(key)
+    hit      = cal is not None and cal.weekmask == weekmask
+    metrics.cache_lookup("calendario", hit)
+    if not hit:
+        extra, regional = [], {}
+        for day, region in conn.execute("SELECT day, region_id FROM calendar_holidays WHERE company_id=?", (company_id,)).fetchall():
+            (extra if region is None else regional.setdefault(region, [])).append(dt.date.fromisoformat(day))
+        cal = BusinessCalendar(weekmask, extra, regional)
+        for k in [k for k in _CACHE if k[0] == company_id]: _CACHE.pop(k)
+        _CACHE[key] = cal
+    return cal.region(region_id)
+
+def bump_version(conn, company_id: int, weekmask: str = None):
+    """Marca o calendário da empresa como alterado (chamar após editar feriados/dias)."""
+    conn.execute("""INSERT INTO company_calendar(company_id, weekmask, version) VALUES (?,?,1)
+                    ON CONFLICT(company_id) DO UPDATE SET version=version+1,
+                        weekmask=COALESCE(?, weekmask)""",
+                 (company_id, weekmask or DEFAULT_WEEKMASK, weekmask))